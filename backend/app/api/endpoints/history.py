@@ -1,10 +1,12 @@
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 import json
 
 from app.api import deps
+from app.api.pagination import decode_cursor, set_next_cursor
 from app.models import (
     User,
     ShoppingItem,
@@ -15,6 +17,7 @@ from app.schemas import (
     ShoppingListHistory as ShoppingListHistorySchema,
     ShoppingListRestore,
 )
+from app.services.purchase_event_service import PurchaseEventService
 
 router = APIRouter()
 
@@ -22,6 +25,7 @@ router = APIRouter()
 @router.get("", response_model=List[ShoppingListHistorySchema])
 def get_purchase_history(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
     start_date: Optional[datetime] = Query(None),
@@ -30,6 +34,7 @@ def get_purchase_history(
     search: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
 ):
     """Get shopping list history for the user's households"""
 
@@ -57,11 +62,32 @@ def get_purchase_history(
             ShoppingListHistory.shopping_list_name.ilike(f"%{search}%")
         )
 
-    # Order by completion date descending
-    query = query.order_by(ShoppingListHistory.completed_at.desc())
+    # Order by completion date descending (id breaks ties for stable pages)
+    query = query.order_by(
+        ShoppingListHistory.completed_at.desc(), ShoppingListHistory.id.desc()
+    )
+
+    # Keyset pagination when a cursor is given, OFFSET otherwise
+    after = decode_cursor(cursor, ["completed_at", "id"], ["completed_at"])
+    if after:
+        query = query.filter(
+            tuple_(ShoppingListHistory.completed_at, ShoppingListHistory.id)
+            < tuple_(after["completed_at"], after["id"])
+        )
+    else:
+        query = query.offset(skip)
 
     # Execute query
-    history_records = query.offset(skip).limit(limit).all()
+    history_records = query.limit(limit).all()
+
+    if history_records:
+        last = history_records[-1]
+        set_next_cursor(
+            response,
+            len(history_records),
+            limit,
+            {"completed_at": last.completed_at, "id": last.id},
+        )
 
     # Convert to response model
     result = []
@@ -88,6 +114,17 @@ def get_purchase_history(
     return result
 
 
+@router.post("/rebuild-purchase-events")
+def rebuild_purchase_events(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """Rebuild the purchase events table from shopping history (backfill)"""
+    events = PurchaseEventService(db).backfill()
+
+    return {"message": "Purchase events rebuilt", "events": events}
+
+
 @router.post("/{history_id}/restore-item")
 def restore_single_item(
     history_id: int,
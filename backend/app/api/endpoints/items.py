@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session, aliased
 from sqlalchemy import func
 
@@ -7,6 +7,7 @@ from app import models
 from app import schemas
 from app.api import deps
 from app.api.deps import get_current_user
+from app.api.pagination import decode_cursor, set_next_cursor
 
 from app.models import User, ShoppingItem, ShoppingList
 
@@ -53,8 +54,10 @@ def create_shopping_item(
 @router.get("/{list_id}", response_model=List[schemas.ShoppingItemInDB])
 def get_shopping_items(
     list_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -79,11 +82,20 @@ def get_shopping_items(
             purchased_by_user, ShoppingItem.purchased_by_id == purchased_by_user.id
         )
         .filter(ShoppingItem.shopping_list_id == list_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .order_by(ShoppingItem.id)
     )
 
+    # Keyset pagination when a cursor is given, OFFSET otherwise
+    after = decode_cursor(cursor, ["id"])
+    if after:
+        items_query = items_query.filter(ShoppingItem.id > after["id"])
+    else:
+        items_query = items_query.offset(skip)
+
+    items_query = items_query.limit(limit).all()
+    if items_query:
+        set_next_cursor(response, len(items_query), limit, {"id": items_query[-1].id})
+
     # Convert to response with usernames
     result = []
     for item in items_query:
@@ -5,6 +5,7 @@ from typing import Optional
 from fastapi import HTTPException
 from app.api import deps
 from app.services.prediction_service import PredictionService
+from app.services.incremental_rules import IncrementalRuleService
 from app.schemas import PredictionsResponse
 from app.models import ShoppingList
 
@@ -17,6 +18,10 @@ def get_predictions(
         None, description="Shopping list to get predictions for"
     ),
     limit: int = Query(10, ge=1, le=20, description="Maximum number of predictions"),
+    user_lat: Optional[float] = Query(
+        None, ge=-90, le=90, description="Price predictions near this point"
+    ),
+    user_lon: Optional[float] = Query(None, ge=-180, le=180),
     current_user=Depends(deps.get_current_user),
     db: Session = Depends(deps.get_db),
 ):
@@ -35,7 +40,11 @@ def get_predictions(
 
     prediction_service = PredictionService(db)
     return prediction_service.get_predictions(
-        user=current_user, shopping_list_id=shopping_list_id, limit=limit
+        user=current_user,
+        shopping_list_id=shopping_list_id,
+        limit=limit,
+        user_lat=user_lat,
+        user_lon=user_lon,
     )
 
 
@@ -55,5 +64,34 @@ def generate_association_rules(
     return {
         "message": "Association rules generated successfully",
         "households_processed": result["households_processed"],
+        "households_failed": result["households_failed"],
+        "households_timed_out": result["households_timed_out"],
+        "global_failed": result["global_failed"],
+        "global_timed_out": result["global_timed_out"],
         "total_rules_generated": result["total_rules_generated"],
     }
+
+
+@router.post("/refresh-rules")
+def refresh_dirty_rules(
+    current_user=Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db),
+):
+    """Re-derive rules of households with new completions (scheduled task)"""
+    rules = IncrementalRuleService(db)
+    rules.expire_window()
+    result = rules.refresh_dirty()
+
+    return {"message": "Association rules refreshed", **result}
+
+
+@router.post("/rebuild-itemset-counts")
+def rebuild_itemset_counts(
+    current_user=Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db),
+):
+    """Recount itemsets from shopping history and mark every household for a
+    full rule refresh"""
+    rows = IncrementalRuleService(db).rebuild_counts()
+
+    return {"message": "Itemset counts rebuilt", "rows": rows}
@@ -9,24 +9,46 @@ from fastapi import (
     File,
     Form,
     Query,
+    Response,
 )
-from sqlalchemy import func, desc
-from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, desc, tuple_
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional
 
 from app.core.database import get_db
-from app.services.price_service import PriceService
+from app.services.price_service import PriceService, comparison_cache
+from app.services.search_service import SearchService
+from app.services.autocomplete_service import autocomplete_service
+from app.services.store_stats_service import StoreStatsService
+from app.services.price_rollup_service import PriceRollupService
+from app.services.price_index_service import PriceIndexService
+from app.services.best_price_service import BestPriceService
+from app.services.item_resolution_service import ItemResolutionService
 from app.schemas import (
     Chain,
-    Store,
+    StoreWithStats,
     Item,
     ItemWithPrice,
     ItemSearchParams,
+    AutocompleteSuggestion,
+    ItemResolutionCandidate,
     PriceComparisonResponse,
+    BulkPriceLookupRequest,
+    BulkPriceLookupResponse,
+    BestPriceLookupRequest,
+    BestPriceEntry,
     ShoppingListPriceComparison,
+    BasketSplitResponse,
+    UnitPriceEquivalent,
+    PriceHistoryPoint,
+    ChainPriceTrend,
+    ChainBasketIndexEntry,
 )
 from app.api.deps import get_current_user
-from app.models import User, ShoppingList
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.models import User, ShoppingList, StorePriceStats
 
 router = APIRouter()
 
@@ -65,39 +87,121 @@ async def upload_price_data(
 
 @router.get("/chains", response_model=List[Chain])
 def get_chains(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Get all available chains."""
     from app.models import Chain as ChainModel
 
-    chains = db.query(ChainModel).offset(skip).limit(limit).all()
+    query = db.query(ChainModel).order_by(ChainModel.id)
+
+    after = decode_cursor(cursor, ["id"])
+    if after:
+        query = query.filter(ChainModel.id > after["id"])
+    else:
+        query = query.offset(skip)
+
+    chains = query.limit(limit).all()
+    if chains:
+        set_next_cursor(response, len(chains), limit, {"id": chains[-1].id})
     return chains
 
 
-@router.get("/stores", response_model=List[Store])
+# Store listing sort columns from store_price_stats, with the value used for
+# stores that have no stats row yet
+STORE_SORT_DEFAULTS = {
+    "active_item_count": 0,
+    "price_coverage": 0.0,
+    "last_price_update": datetime(1970, 1, 1, tzinfo=timezone.utc),
+}
+
+
+@router.get("/stores", response_model=List[StoreWithStats])
 def get_stores(
+    response: Response,
     chain_id: Optional[str] = None,
+    min_active_items: Optional[int] = Query(
+        None, ge=0, description="Only stores with at least this many active prices"
+    ),
+    sort_by: str = Query(
+        "id", pattern="^(id|active_item_count|price_coverage|last_price_update)$"
+    ),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get stores, optionally filtered by chain."""
+    """Get stores with their price stats, optionally filtered by chain and
+    sorted by a stats column (descending)."""
     from app.models import Store as StoreModel
 
-    query = db.query(StoreModel)
+    query = (
+        db.query(StoreModel)
+        .outerjoin(StorePriceStats)
+        .options(contains_eager(StoreModel.price_stats))
+    )
     if chain_id:
         query = query.filter(StoreModel.chain_id == chain_id)
-
-    stores = query.offset(skip).limit(limit).all()
+    if min_active_items is not None:
+        query = query.filter(StorePriceStats.active_item_count >= min_active_items)
+
+    if sort_by == "id":
+        query = query.order_by(StoreModel.id)
+        after = decode_cursor(cursor, ["id"])
+        if after:
+            query = query.filter(StoreModel.id > after["id"])
+    else:
+        sort_column = func.coalesce(
+            getattr(StorePriceStats, sort_by), STORE_SORT_DEFAULTS[sort_by]
+        )
+        query = query.order_by(desc(sort_column), desc(StoreModel.id))
+        after = decode_cursor(
+            cursor,
+            [sort_by, "id"],
+            datetime_keys=(
+                ["last_price_update"] if sort_by == "last_price_update" else ()
+            ),
+        )
+        if after:
+            query = query.filter(
+                tuple_(sort_column, StoreModel.id) < (after[sort_by], after["id"])
+            )
+    if not after:
+        query = query.offset(skip)
+
+    stores = query.limit(limit).all()
+    if stores:
+        last_key = {"id": stores[-1].id}
+        if sort_by != "id":
+            stats = stores[-1].price_stats
+            value = getattr(stats, sort_by) if stats else None
+            last_key[sort_by] = (
+                value if value is not None else STORE_SORT_DEFAULTS[sort_by]
+            )
+        set_next_cursor(response, len(stores), limit, last_key)
     return stores
 
 
+@router.post("/stores/stats/refresh", response_model=dict)
+def refresh_store_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Recompute store_price_stats for every store."""
+    refreshed = StoreStatsService(db).refresh()
+    db.commit()
+
+    return {"message": "Store stats refreshed", "stores_updated": refreshed}
+
+
 @router.get("/items/search", response_model=List[ItemWithPrice])
 def search_items(
+    response: Response,
     query: Optional[str] = None,
     chain_id: Optional[str] = None,
     store_id: Optional[str] = None,
@@ -105,6 +209,7 @@ def search_items(
     max_price: Optional[float] = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -119,8 +224,48 @@ def search_items(
         limit=limit,
     )
 
-    price_service = PriceService(db)
-    return price_service.search_items(search_params)
+    after = decode_cursor(cursor, ["rank", "price_count", "id"])
+
+    search_service = SearchService(db)
+    items, last_key = search_service.search_items_page(search_params, after)
+    set_next_cursor(response, len(items), limit, last_key)
+    return items
+
+
+@router.get("/items/autocomplete", response_model=List[AutocompleteSuggestion])
+def autocomplete_items(
+    q: str = Query(..., min_length=1, description="Prefix typed by the user"),
+    limit: int = Query(10, ge=1, le=20),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Type-ahead suggestions from the in-memory catalog prefix index."""
+    suggestions = autocomplete_service.suggest(db, q, limit)
+    return [suggestion._asdict() for suggestion in suggestions]
+
+
+@router.get("/items/resolve", response_model=List[ItemResolutionCandidate])
+def resolve_item_name(
+    name: str = Query(..., min_length=1, description="Free-text item name"),
+    limit: int = Query(5, ge=1, le=5),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Ranked catalog items a free-text shopping item name may refer to."""
+    candidates = ItemResolutionService(db).candidates(name, limit)
+    return [candidate._asdict() for candidate in candidates]
+
+
+@router.post("/items/search-index/rebuild", response_model=dict)
+def rebuild_search_index(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Recompute the normalized search columns for every catalog item."""
+    search_service = SearchService(db)
+    updated = search_service.rebuild_search_index()
+
+    return {"message": "Search index rebuilt", "items_updated": updated}
 
 
 @router.get("/items/{item_code}", response_model=Item)
@@ -158,6 +303,129 @@ def compare_item_prices(
     return comparison
 
 
+@router.post("/items/prices", response_model=BulkPriceLookupResponse)
+def bulk_price_lookup(
+    request: BulkPriceLookupRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Current prices of many items at once, optionally limited to some
+    stores or chains. Rows are returned as parallel arrays."""
+    return PriceService(db).bulk_price_lookup(
+        request.item_codes, request.store_ids, request.chain_ids
+    )
+
+
+@router.post("/items/best-prices", response_model=List[BestPriceEntry])
+def get_best_prices(
+    request: BestPriceLookupRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Cheapest current price for each item, near the user when a location
+    is given. Items without any price are omitted."""
+    if (request.user_lat is None) != (request.user_lon is None):
+        raise HTTPException(
+            status_code=400,
+            detail="user_lat and user_lon must be provided together",
+        )
+
+    best = BestPriceService(db).cheapest(
+        request.item_codes, request.user_lat, request.user_lon, request.radius_km
+    )
+    return list(best.values())
+
+
+@router.post("/best-prices/rebuild", response_model=dict)
+def rebuild_best_prices(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Re-rank the best-price index for every item."""
+    rows = BestPriceService(db).rebuild()
+
+    return {"message": "Best-price index rebuilt", "rows": rows}
+
+
+@router.get("/items/{item_code}/history", response_model=List[PriceHistoryPoint])
+def get_item_price_history(
+    item_code: str,
+    start: Optional[date] = Query(None, description="Default: 90 days before end"),
+    end: Optional[date] = Query(None, description="Default: today"),
+    bucket: str = Query("day", pattern="^(day|week)$"),
+    group_by: str = Query("none", pattern="^(none|chain|store)$"),
+    chain_id: Optional[str] = None,
+    store_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Downsampled price history (min/avg/max per day or week) for an item."""
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    rollups = PriceRollupService(db)
+    return rollups.item_history(
+        item_code, start, end, bucket, group_by, chain_id, store_id
+    )
+
+
+@router.get("/items/{item_code}/trends", response_model=List[ChainPriceTrend])
+def get_item_price_trends(
+    item_code: str,
+    days: int = Query(90, ge=1, le=365),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Per-chain price trend for an item over the last ``days`` days,
+    cheapest chain first."""
+    return PriceRollupService(db).chain_trends(item_code, days)
+
+
+@router.post("/rollups/rebuild", response_model=dict)
+def rebuild_price_rollups(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Rebuild the daily price rollups from all stored prices."""
+    rows = PriceRollupService(db).rebuild()
+
+    return {"message": "Price rollups rebuilt", "rows": rows}
+
+
+@router.get("/items/{item_code}/equivalents", response_model=List[UnitPriceEquivalent])
+def get_unit_price_equivalents(
+    item_code: str,
+    limit: int = Query(10, ge=1, le=50),
+    chain_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Similar products in the same unit, ranked by price per kg/liter/unit."""
+    price_service = PriceService(db)
+    equivalents = price_service.get_unit_price_equivalents(item_code, limit, chain_id)
+
+    if equivalents is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+        )
+
+    return equivalents
+
+
+@router.post("/unit-prices/rebuild", response_model=dict)
+def rebuild_unit_prices(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Recompute normalized unit prices for every stored price."""
+    price_service = PriceService(db)
+    updated = price_service.rebuild_unit_prices()
+
+    return {"message": "Unit prices rebuilt", "prices_updated": updated}
+
+
 @router.get("/popular-items", response_model=List[ItemWithPrice])
 def get_popular_items(
     limit: int = 20,
@@ -218,22 +486,8 @@ def get_popular_items(
     return result
 
 
-# Update existing endpoint
-@router.get(
-    "/shopping-lists/{list_id}/compare", response_model=ShoppingListPriceComparison
-)
-def compare_shopping_list_prices(
-    list_id: int,
-    user_lat: Optional[float] = Query(None, description="User latitude (-90 to 90)"),
-    user_lon: Optional[float] = Query(None, description="User longitude (-180 to 180)"),
-    radius_km: Optional[float] = Query(
-        None, ge=1, le=100, description="Search radius in kilometers"
-    ),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Compare shopping list prices with optional location filtering"""
-    # Verify user has access to this shopping list
+def _check_list_access(list_id: int, current_user: User, db: Session) -> None:
+    """Raise 404/403 unless the list exists and the user is in its household."""
     shopping_list = db.query(ShoppingList).filter(ShoppingList.id == list_id).first()
 
     if not shopping_list:
@@ -243,7 +497,11 @@ def compare_shopping_list_prices(
     if not any(h.id == shopping_list.household_id for h in current_user.households):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Validate location parameters (all or none)
+
+def _validate_location(
+    user_lat: Optional[float], user_lon: Optional[float], radius_km: Optional[float]
+) -> None:
+    """Location parameters come all together or not at all."""
     if any(param is not None for param in [user_lat, user_lon, radius_km]):
         if any(param is None for param in [user_lat, user_lon, radius_km]):
             raise HTTPException(
@@ -261,9 +519,29 @@ def compare_shopping_list_prices(
                 status_code=400, detail="Longitude must be between -180 and 180"
             )
 
+
+# Update existing endpoint
+@router.get(
+    "/shopping-lists/{list_id}/compare", response_model=ShoppingListPriceComparison
+)
+def compare_shopping_list_prices(
+    list_id: int,
+    user_lat: Optional[float] = Query(None, description="User latitude (-90 to 90)"),
+    user_lon: Optional[float] = Query(None, description="User longitude (-180 to 180)"),
+    radius_km: Optional[float] = Query(
+        None, ge=1, le=100, description="Search radius in kilometers"
+    ),
+    limit: int = Query(5, ge=1, le=50, description="Number of stores to return"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Compare shopping list prices with optional location filtering"""
+    _check_list_access(list_id, current_user, db)
+    _validate_location(user_lat, user_lon, radius_km)
+
     price_service = PriceService(db)
     comparison = price_service.compare_shopping_list_prices(
-        list_id, user_lat, user_lon, radius_km
+        list_id, user_lat, user_lon, radius_km, limit
     )
 
     if not comparison:
@@ -272,3 +550,124 @@ def compare_shopping_list_prices(
         )
 
     return comparison
+
+
+@router.get("/shopping-lists/{list_id}/compare/stream")
+def stream_shopping_list_comparison(
+    list_id: int,
+    user_lat: Optional[float] = Query(None, description="User latitude (-90 to 90)"),
+    user_lon: Optional[float] = Query(None, description="User longitude (-180 to 180)"),
+    radius_km: Optional[float] = Query(
+        None, ge=1, le=100, description="Search radius in kilometers"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Stop after this many stores (default: all)"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream the comparison as NDJSON: one summary line, then one line per
+    store, best first, so clients can render results as they arrive."""
+    _check_list_access(list_id, current_user, db)
+    _validate_location(user_lat, user_lon, radius_km)
+
+    price_service = PriceService(db)
+    lines = price_service.stream_shopping_list_comparison(
+        list_id, user_lat, user_lon, radius_km, limit
+    )
+
+    if lines is None:
+        raise HTTPException(
+            status_code=404, detail="Could not generate price comparison"
+        )
+
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.get("/comparison-cache/stats", response_model=dict)
+def get_comparison_cache_stats(
+    current_user: User = Depends(get_current_user),
+):
+    """Hit/miss counters of the shopping-list comparison cache."""
+    return comparison_cache.stats()
+
+
+@router.get(
+    "/shopping-lists/{list_id}/optimize-split", response_model=BasketSplitResponse
+)
+def optimize_shopping_list_split(
+    list_id: int,
+    max_stores: int = Query(2, ge=1, le=5, description="Maximum stores to visit"),
+    extra_store_penalty: float = Query(
+        0.0, ge=0, description="Cost added for every store beyond the first"
+    ),
+    user_lat: Optional[float] = Query(None, description="User latitude (-90 to 90)"),
+    user_lon: Optional[float] = Query(None, description="User longitude (-180 to 180)"),
+    max_distance_km: Optional[float] = Query(
+        None, ge=1, le=100, description="Only consider stores within this distance"
+    ),
+    mode: str = Query(
+        "auto",
+        pattern="^(auto|exact|greedy)$",
+        description="exact branch-and-bound, fast greedy, or auto by problem size",
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Cheapest way to buy a shopping list across up to max_stores stores"""
+    _check_list_access(list_id, current_user, db)
+
+    if (user_lat is None) != (user_lon is None):
+        raise HTTPException(
+            status_code=400, detail="user_lat and user_lon must be provided together"
+        )
+    if max_distance_km is not None and user_lat is None:
+        raise HTTPException(
+            status_code=400, detail="max_distance_km requires user_lat and user_lon"
+        )
+    if user_lat is not None:
+        if not (-90 <= user_lat <= 90):
+            raise HTTPException(
+                status_code=400, detail="Latitude must be between -90 and 90"
+            )
+        if not (-180 <= user_lon <= 180):
+            raise HTTPException(
+                status_code=400, detail="Longitude must be between -180 and 180"
+            )
+
+    price_service = PriceService(db)
+    return price_service.optimize_basket_split(
+        list_id,
+        max_stores=max_stores,
+        extra_store_penalty=extra_store_penalty,
+        user_lat=user_lat,
+        user_lon=user_lon,
+        max_distance_km=max_distance_km,
+        mode=mode,
+    )
+
+
+@router.get("/price-index", response_model=List[ChainBasketIndexEntry])
+def get_price_index(
+    day: Optional[date] = Query(None, description="Default: latest computed day"),
+    chain_id: Optional[str] = None,
+    city: Optional[str] = None,
+    min_coverage: float = Query(0.0, ge=0.0, le=1.0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Standard basket cost per chain and city, cheapest first (by cost
+    scaled to the whole basket)."""
+    return PriceIndexService(db).get_index(day, chain_id, city, min_coverage)
+
+
+@router.post("/price-index/rebuild", response_model=dict)
+def rebuild_price_index(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Re-select the default basket and recompute today's price index from
+    current prices."""
+    groups = PriceIndexService(db).build(refresh_basket=True)
+
+    return {"message": "Price index rebuilt", "groups": groups}
@@ -12,6 +12,8 @@ from app.schemas import (
     ShoppingListUpdate,
 )
 from app.models import ShoppingListHistory
+from app.services.incremental_rules import IncrementalRuleService
+from app.services.purchase_event_service import PurchaseEventService
 import json
 
 router = APIRouter()
@@ -261,12 +263,22 @@ def complete_shopping_list(
         completed_by_id=current_user.id,
     )
 
+    db.add(history_record)
+    db.flush()
+
+    # Normalized purchase events for statistics and predictions
+    PurchaseEventService(db).record(history_record, items_data)
+
+    # Queue the purchase for incremental association rules
+    IncrementalRuleService(db).record_transaction(
+        history_record.id, history_record.household_id
+    )
+
     # Remove all items from the shopping list (keep the list itself)
     for item in items:
         db.delete(item)
 
     # Save changes
-    db.add(history_record)
     db.commit()
 
     return {
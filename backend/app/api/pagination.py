@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+
+# Listings return plain arrays for backwards compatibility, so the cursor for
+# the next page travels in a response header instead of the body
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode the sort key of the last row into an opaque cursor."""
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], keys: List[str], datetime_keys: Sequence[str] = ()
+) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by ``encode_cursor`` for the given sort keys.
+
+    Sort keys are numeric except ``datetime_keys``; a cursor whose values
+    have other types is rejected before it reaches a query.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, dict) or set(values) != set(keys):
+            raise ValueError("cursor keys do not match this listing")
+        for key in keys:
+            value = values[key]
+            if key in datetime_keys:
+                if not isinstance(value, str):
+                    raise TypeError(f"'{key}' must be a timestamp")
+                values[key] = datetime.fromisoformat(value)
+            elif isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(f"'{key}' must be a number")
+        return values
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}"
+        )
+
+
+def set_next_cursor(
+    response: Response, page_size: int, limit: int, values: Dict[str, Any]
+) -> None:
+    """Expose the next-page cursor when the page came back full."""
+    if page_size >= limit and values:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
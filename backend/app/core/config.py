@@ -15,11 +15,56 @@ class Settings(BaseSettings):
     APRIORI_GENERATION_INTERVAL_HOURS: int = 24
     APRIORI_STARTUP_DELAY_MINUTES: int = 60 * 24
     APRIORI_ERROR_RETRY_MINUTES: int = 60
+    # Frequent itemset miner for association rules: apriori, fpgrowth or
+    # eclat. All produce the same itemsets
+    ASSOCIATION_MINING_ENGINE: str = "eclat"
+    # A household's rules are regenerated in the background at most this
+    # often when predictions come up short
+    PREDICTION_RULES_REFRESH_COOLDOWN_MINUTES: int = 30
+    # Nightly rule generation: worker processes (0 = one per CPU) and the
+    # mining time allowed per household, and for the global rules over all
+    # households, before it is skipped
+    RULE_GENERATION_WORKERS: int = 0
+    RULE_GENERATION_HOUSEHOLD_BUDGET_SECONDS: int = 60
+    RULE_GENERATION_GLOBAL_BUDGET_SECONDS: int = 600
+    # How often rules of households with newly completed lists are
+    # re-derived from the incremental itemset counts
+    RULE_REFRESH_INTERVAL_MINUTES: int = 15
+    # Decoded rule indexes (one per household, plus the global rules) kept
+    # in memory for matching
+    RULE_INDEX_CACHE_SIZE: int = 512
+    # Half-life of the recency-weighted purchase frequency in household
+    # item features
+    PURCHASE_RECENCY_HALF_LIFE_DAYS: float = 30.0
 
     DATA_IMPORT_INTERVAL_HOURS: int = 24
     DATA_IMPORT_STARTUP_DELAY_MINUTES: int = 10
     DATA_IMPORT_ERROR_RETRY_MINUTES: int = 60
 
+    # Multi-store basket split: exact search gives up after this budget and
+    # returns the best split found so far
+    BASKET_SPLIT_TIME_BUDGET_MS: int = 250
+
+    # Shopping-list comparison cache: max entries, and the precision user
+    # coordinates are rounded to before keying (3 decimals ~ 100m)
+    COMPARISON_CACHE_SIZE: int = 1024
+    COMPARISON_CACHE_LOCATION_DECIMALS: int = 3
+    # Per-store basket totals cached per list version, shared by all locations
+    STORE_TOTALS_CACHE_SIZE: int = 256
+
+    # Chain x city basket price index. The basket is this list of item codes;
+    # when empty, the PRICE_INDEX_DEFAULT_BASKET_SIZE most widely stocked
+    # items are used instead
+    PRICE_INDEX_BASKET_ITEM_CODES: List[str] = []
+    PRICE_INDEX_DEFAULT_BASKET_SIZE: int = 50
+
+    # Best-price index: cheapest stores kept per item, nationwide and per
+    # lat/lon grid cell of this many degrees (0.1 ~ 10km)
+    BEST_PRICE_TOP_K: int = 5
+    BEST_PRICE_GEOCELL_DEGREES: float = 0.1
+    # Radius of "cheapest near me" when the caller does not give one
+    BEST_PRICE_NEARBY_RADIUS_KM: float = 10.0
+
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
@@ -2,9 +2,16 @@
 from .user import User, user_households
 from .household import Household, HouseholdInvitation
 from .shopping import ShoppingList, ShoppingItem, ShoppingListHistory
-from .catalog import Chain, Store, Item, ItemPrice
-from .purchase import PurchaseHistory
-from .association_rules import AssociationRule
+from .catalog import Chain, Store, StorePriceStats, Item, ItemPrice
+from .purchase import PurchaseEvent, HouseholdItemFeatures
+from .association_rules import (
+    AssociationRule,
+    ItemsetCount,
+    PendingItemsetTransaction,
+    HouseholdRuleState,
+)
+from .price_rollup import ItemPriceDaily, ChainPriceDaily
+from .price_index import ChainBasketIndex, ItemBestPrice
 
 # Make all models available when importing from models
 __all__ = [
@@ -17,8 +24,17 @@ __all__ = [
     "ShoppingListHistory",
     "Chain",
     "Store",
+    "StorePriceStats",
     "Item",
     "ItemPrice",
-    "PurchaseHistory",
+    "PurchaseEvent",
+    "HouseholdItemFeatures",
     "AssociationRule",
+    "ItemsetCount",
+    "PendingItemsetTransaction",
+    "HouseholdRuleState",
+    "ItemPriceDaily",
+    "ChainPriceDaily",
+    "ChainBasketIndex",
+    "ItemBestPrice",
 ]
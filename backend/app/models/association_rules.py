@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, Float, DateTime, Text, Index
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    Float,
+    Date,
+    DateTime,
+    String,
+    Text,
+    Index,
+)
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -22,3 +32,53 @@ class AssociationRule(Base):
         Index("idx_rules_household", "household_id"),
         Index("idx_rules_created", "created_at"),
     )
+
+
+class ItemsetCount(Base):
+    """How many of a household's completed lists on one day contained an
+    itemset (1-3 item codes, sorted and comma-joined).
+
+    Size 0 (empty itemset) counts the transactions themselves. Global rules
+    sum the rows of every household. Day buckets let the 90-day window slide
+    by dropping old rows.
+    """
+
+    __tablename__ = "itemset_counts"
+
+    household_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    itemset = Column(String(160), primary_key=True)
+    size = Column(SmallInteger, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("idx_itemset_counts_day", "day"),)
+
+
+class PendingItemsetTransaction(Base):
+    """A completed list whose itemsets are not counted yet.
+
+    Completing a list only adds a row here; the rule refresh counts the
+    queued lists' purchase events in bulk and deletes their rows.
+    """
+
+    __tablename__ = "pending_itemset_transactions"
+
+    history_id = Column(Integer, primary_key=True)
+    household_id = Column(Integer, nullable=False)
+
+
+class HouseholdRuleState(Base):
+    """Tracks which households need their rules re-derived.
+
+    The global rule set has no row: it is stale whenever any household is.
+    """
+
+    __tablename__ = "household_rule_state"
+
+    household_id = Column(Integer, primary_key=True)
+    dirty_version = Column(Integer, nullable=False, default=0)
+    # NULL when the household's rules are current
+    dirty_since = Column(DateTime(timezone=True), nullable=True)
+    rules_refreshed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (Index("idx_household_rule_state_dirty", "dirty_since"),)
@@ -47,9 +47,37 @@ class Store(Base):
     # Relationships
     chain = relationship("Chain", back_populates="stores")
     item_prices = relationship("ItemPrice", back_populates="store")
+    price_stats = relationship("StorePriceStats", back_populates="store", uselist=False)
 
     # Composite unique constraint for chain_id + store_id
-    __table_args__ = (Index("idx_chain_store", "chain_id", "store_id"),)
+    __table_args__ = (
+        Index("idx_chain_store", "chain_id", "store_id"),
+        # Keyset pagination of stores within a chain
+        Index("idx_stores_chain_id_id", "chain_id", "id"),
+    )
+
+
+class StorePriceStats(Base):
+    """Per-store price summary maintained by the importer, so listings and
+    comparisons never have to aggregate item_prices."""
+
+    __tablename__ = "store_price_stats"
+
+    store_id = Column(
+        Integer, ForeignKey("stores.id", ondelete="CASCADE"), primary_key=True
+    )
+    active_item_count = Column(Integer, nullable=False, default=0)
+    last_price_update = Column(DateTime(timezone=True), nullable=True)
+    # Share of catalog items this store has an active price for (0-1)
+    price_coverage = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Relationships
+    store = relationship("Store", back_populates="price_stats")
+
+    __table_args__ = (Index("idx_store_price_stats_active_items", "active_item_count"),)
 
 
 class Item(Base):
@@ -68,6 +96,9 @@ class Item(Base):
     is_weighted = Column(Boolean, default=False)
     qty_in_package = Column(Float, nullable=True)
     allow_discount = Column(Boolean, default=True)
+    # Normalized (niqqud/final letters/punctuation stripped) text used for search
+    normalized_name = Column(String(255), nullable=True)
+    search_text = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -75,6 +106,21 @@ class Item(Base):
     shopping_items = relationship("ShoppingItem", back_populates="item")
     prices = relationship("ItemPrice", back_populates="item")
 
+    # Trigram index for substring/fuzzy search, pattern index for prefix search
+    __table_args__ = (
+        Index(
+            "idx_items_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_items_normalized_name_prefix",
+            "normalized_name",
+            postgresql_ops={"normalized_name": "text_pattern_ops"},
+        ),
+    )
+
 
 class ItemPrice(Base):
     __tablename__ = "item_prices"
@@ -84,6 +130,10 @@ class ItemPrice(Base):
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
     price = Column(Float, nullable=False)
     unit_price = Column(Float, nullable=True)
+    # Price per kg / liter / unit, computed at import from the item's package
+    # size so differently sized products can be compared
+    normalized_unit = Column(String(10), nullable=True)
+    price_per_unit = Column(Float, nullable=True)
     item_status = Column(Integer, default=1)  # 1 = active, 0 = inactive
     price_update_date = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -98,4 +148,5 @@ class ItemPrice(Base):
         Index("idx_item_store", "item_code", "store_id"),
         Index("idx_price_update_date", "price_update_date"),
         Index("idx_item_status", "item_status"),
+        Index("idx_item_prices_unit_price", "normalized_unit", "price_per_unit"),
     )
@@ -0,0 +1,60 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    String,
+    ForeignKey,
+    Date,
+    DateTime,
+    Index,
+    func,
+)
+
+from app.core.database import Base
+
+
+class ChainBasketIndex(Base):
+    """Daily cost of the standard price-index basket per chain and city.
+
+    Written by the price index batch job after imports. ``basket_cost`` sums,
+    over the basket items the group prices, each item's average current price
+    across the group's stores; ``coverage`` says how much of the basket that is.
+    """
+
+    __tablename__ = "chain_basket_index"
+
+    day = Column(Date, primary_key=True)
+    chain_id = Column(String(50), ForeignKey("chains.chain_id"), primary_key=True)
+    # Empty string for stores without a city, so it can be part of the key
+    city = Column(String(100), primary_key=True)
+    store_count = Column(Integer, nullable=False)
+    basket_size = Column(Integer, nullable=False)
+    items_priced = Column(Integer, nullable=False)
+    coverage = Column(Float, nullable=False)
+    basket_cost = Column(Float, nullable=False)
+    min_basket_cost = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_chain_basket_index_city_day", "city", "day"),)
+
+
+class ItemBestPrice(Base):
+    """The K cheapest stores currently selling an item, nationwide (empty
+    geocell) and within each lat/lon grid cell.
+
+    Refreshed for the items of every imported price file; "cheapest near me"
+    lookups read a handful of cells instead of sorting every price.
+    """
+
+    __tablename__ = "item_best_prices"
+
+    item_code = Column(String(50), ForeignKey("items.item_code"), primary_key=True)
+    geocell = Column(String(32), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    store_id = Column(
+        Integer, ForeignKey("stores.id", ondelete="CASCADE"), nullable=False
+    )
+    price = Column(Float, nullable=False)
+    price_update_date = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("idx_item_best_prices_geocell", "geocell", "item_code"),)
@@ -0,0 +1,65 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    String,
+    ForeignKey,
+    Date,
+    DateTime,
+    Index,
+    func,
+)
+
+from app.core.database import Base
+
+
+class ItemPriceDaily(Base):
+    """Daily aggregate of the active prices in effect for an item at a store,
+    including days on which the price did not change.
+
+    Maintained by the importer; history queries read this instead of
+    item_prices. Averages are kept as sum + count so they can be re-bucketed.
+    """
+
+    __tablename__ = "item_price_daily"
+
+    item_code = Column(String(50), ForeignKey("items.item_code"), primary_key=True)
+    store_id = Column(
+        Integer, ForeignKey("stores.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    price_sum = Column(Float, nullable=False)
+    price_count = Column(Integer, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("idx_item_price_daily_item_day", "item_code", "day"),
+        Index("idx_item_price_daily_store_day", "store_id", "day"),
+    )
+
+
+class ChainPriceDaily(Base):
+    """Daily aggregate of an item's prices across all stores of a chain,
+    derived from item_price_daily at the end of each import."""
+
+    __tablename__ = "chain_price_daily"
+
+    item_code = Column(String(50), ForeignKey("items.item_code"), primary_key=True)
+    chain_id = Column(String(50), ForeignKey("chains.chain_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    price_sum = Column(Float, nullable=False)
+    price_count = Column(Integer, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("idx_chain_price_daily_item_day", "item_code", "day"),
+        Index("idx_chain_price_daily_chain_day", "chain_id", "day"),
+    )
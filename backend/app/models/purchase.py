@@ -1,12 +1,73 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    String,
+    ForeignKey,
+    DateTime,
+    Index,
+    func,
+)
 
 from app.core.database import Base
 
 
-class PurchaseHistory(Base):
-    __tablename__ = "purchase_history"
-    id = Column(Integer, primary_key=True, index=True)
-    household_id = Column(Integer, ForeignKey("households.id"))
-    item_name = Column(String, index=True)
-    purchase_date = Column(DateTime(timezone=True), server_default=func.now())
-    frequency = Column(Integer, default=1)  # How often purchased
+class PurchaseEvent(Base):
+    """One purchased item of a completed shopping list.
+
+    A normalized copy of ``ShoppingListHistory.items_data`` that purchase
+    statistics and the predictor can filter and aggregate through indexes.
+    """
+
+    __tablename__ = "purchase_events"
+
+    id = Column(Integer, primary_key=True)
+    history_id = Column(
+        Integer,
+        ForeignKey("shopping_list_history.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    household_id = Column(Integer, ForeignKey("households.id"), nullable=False)
+    item_code = Column(String(50), nullable=True)  # Government item code
+    item_name = Column(String(255), nullable=False)  # As entered on the list
+    normalized_name = Column(String(255), nullable=False)
+    quantity = Column(Float, nullable=False, default=1)
+    price = Column(Float, nullable=True)  # Price per item
+    completed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Transactions and frequent items of a household's recent lists
+        Index(
+            "idx_purchase_events_household_completed", "household_id", "completed_at"
+        ),
+        # Per-item purchase stats
+        Index(
+            "idx_purchase_events_household_item",
+            "household_id",
+            "item_code",
+            "completed_at",
+        ),
+        Index("idx_purchase_events_household_name", "household_id", "normalized_name"),
+        Index("idx_purchase_events_history", "history_id"),
+    )
+
+
+class HouseholdItemFeatures(Base):
+    """Purchase statistics of one item in one household, kept current as
+    lists are completed so predictions never aggregate raw history."""
+
+    __tablename__ = "household_item_features"
+
+    household_id = Column(Integer, ForeignKey("households.id"), primary_key=True)
+    item_code = Column(String(50), primary_key=True)
+    item_name = Column(String(255), nullable=False)  # Latest name entered
+    # Completed lists containing the item
+    purchase_count = Column(Integer, nullable=False)
+    avg_quantity = Column(Float, nullable=False)
+    first_purchased = Column(DateTime(timezone=True), nullable=False)
+    last_purchased = Column(DateTime(timezone=True), nullable=False)
+    # Mean days between consecutive purchases; NULL until bought twice
+    mean_interval_days = Column(Float, nullable=True)
+    # Purchases decayed by PURCHASE_RECENCY_HALF_LIFE_DAYS, as of last_purchased
+    recency_weight = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Boolean,
     func,
     Text,
+    Index,
 )
 from sqlalchemy.orm import relationship
 
@@ -61,6 +62,9 @@ class ShoppingItem(Base):
         "Item", back_populates="shopping_items", foreign_keys=[item_code]
     )
 
+    # Keyset pagination of a list's items
+    __table_args__ = (Index("idx_shopping_items_list_id", "shopping_list_id", "id"),)
+
     def __repr__(self):
         return f"<ShoppingItem(id={self.id}, name='{self.name}', quantity={self.quantity})>"
 
@@ -79,3 +83,13 @@ class ShoppingListHistory(Base):
     shopping_list = relationship("ShoppingList", back_populates="history")
     completed_by = relationship("User")
     household = relationship("Household")
+
+    # Keyset pagination of a household's history, newest first
+    __table_args__ = (
+        Index(
+            "idx_history_household_completed",
+            "household_id",
+            "completed_at",
+            "id",
+        ),
+    )
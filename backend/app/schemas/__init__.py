@@ -54,6 +54,8 @@ from .catalog import (
     StoreCreate,
     Store,
     StoreWithChain,
+    StorePriceStats,
+    StoreWithStats,
     ItemBase,
     ItemCreate,
     Item,
@@ -62,10 +64,22 @@ from .catalog import (
     ItemPrice,
     ItemWithPrice,
     ItemSearchParams,
+    AutocompleteSuggestion,
+    ItemResolutionCandidate,
     PriceComparisonResponse,
+    PriceHistoryPoint,
+    ChainPriceTrend,
+    ChainBasketIndexEntry,
+    BulkPriceLookupRequest,
+    BulkPriceLookupResponse,
+    BestPriceLookupRequest,
+    BestPriceEntry,
     ShoppingListPriceComparison,
     StoreComparison,
     ItemPriceBreakdown,
+    BasketSplitStore,
+    UnitPriceEquivalent,
+    BasketSplitResponse,
 )
 
 # History schemas
@@ -140,6 +154,8 @@ __all__ = [
     "StoreCreate",
     "Store",
     "StoreWithChain",
+    "StorePriceStats",
+    "StoreWithStats",
     "ItemBase",
     "ItemCreate",
     "Item",
@@ -148,10 +164,22 @@ __all__ = [
     "ItemPrice",
     "ItemWithPrice",
     "ItemSearchParams",
+    "AutocompleteSuggestion",
+    "ItemResolutionCandidate",
     "PriceComparisonResponse",
+    "PriceHistoryPoint",
+    "ChainPriceTrend",
+    "ChainBasketIndexEntry",
+    "BulkPriceLookupRequest",
+    "BulkPriceLookupResponse",
+    "BestPriceLookupRequest",
+    "BestPriceEntry",
     "ShoppingListPriceComparison",
     "StoreComparison",
     "ItemPriceBreakdown",
+    "BasketSplitStore",
+    "UnitPriceEquivalent",
+    "BasketSplitResponse",
     # History
     "HistoryItem",
     "HistoryStats",
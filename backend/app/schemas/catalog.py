@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 
 class ChainBase(BaseModel):
@@ -48,6 +48,20 @@ class StoreWithChain(Store):
     chain: Chain
 
 
+class StorePriceStats(BaseModel):
+    active_item_count: int
+    last_price_update: Optional[datetime] = None
+    price_coverage: float
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StoreWithStats(Store):
+    price_stats: Optional[StorePriceStats] = None
+
+
 class ItemBase(BaseModel):
     item_code: str = Field(..., description="Government item code")
     item_type: int
@@ -115,12 +129,118 @@ class ItemSearchParams(BaseModel):
     offset: int = Field(default=0, ge=0)
 
 
+class AutocompleteSuggestion(BaseModel):
+    item_code: str
+    name: str
+    manufacturer_name: Optional[str] = None
+    popularity: int = 0
+
+
+class ItemResolutionCandidate(BaseModel):
+    item_code: str
+    name: str
+    score: float
+
+
+# Most item codes one bulk price lookup may ask for
+BULK_PRICE_LOOKUP_MAX_ITEMS = 500
+
+
+class BulkPriceLookupRequest(BaseModel):
+    item_codes: List[str] = Field(
+        ..., min_length=1, max_length=BULK_PRICE_LOOKUP_MAX_ITEMS
+    )
+    store_ids: Optional[List[int]] = None
+    chain_ids: Optional[List[str]] = None
+
+
+class BulkPriceLookupResponse(BaseModel):
+    """Latest active price per (item, store), as parallel arrays."""
+
+    item_codes: List[str]
+    store_ids: List[int]
+    prices: List[float]
+    price_update_dates: List[datetime]
+    missing_item_codes: List[str] = Field(
+        default_factory=list, description="Requested codes with no price found"
+    )
+
+
+class BestPriceLookupRequest(BaseModel):
+    item_codes: List[str] = Field(
+        ..., min_length=1, max_length=BULK_PRICE_LOOKUP_MAX_ITEMS
+    )
+    user_lat: Optional[float] = Field(None, ge=-90, le=90)
+    user_lon: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(None, gt=0, le=50)
+
+
+class BestPriceEntry(BaseModel):
+    item_code: str
+    store_id: int
+    store_name: Optional[str] = None
+    chain_name: str
+    price: float
+    distance_km: Optional[float] = None
+    is_nearby: bool = Field(
+        False, description="False when no store near the user sells the item"
+    )
+
+
 class PriceComparisonResponse(BaseModel):
     item: Item
     prices: List[ItemPrice]
     stores: List[Store]
 
 
+class PriceHistoryPoint(BaseModel):
+    bucket_start: date
+    group_id: Optional[str] = Field(None, description="Chain or store id")
+    group_name: Optional[str] = None
+    min_price: float
+    avg_price: float
+    max_price: float
+    samples: int
+
+
+class ChainPriceTrend(BaseModel):
+    chain_id: str
+    chain_name: str
+    avg_price: float
+    min_price: float
+    max_price: float
+    first_day: date
+    first_avg_price: float
+    last_day: date
+    last_avg_price: float
+    change_pct: Optional[float] = Field(
+        None, description="Last vs first daily average in the window, in percent"
+    )
+    days_observed: int
+
+
+class ChainBasketIndexEntry(BaseModel):
+    day: date
+    chain_id: str
+    chain_name: str
+    city: Optional[str] = None
+    store_count: int
+    basket_size: int
+    items_priced: int
+    coverage: float = Field(..., description="Share of the basket priced here")
+    basket_cost: float = Field(
+        ..., description="Sum of average prices of the priced basket items"
+    )
+    min_basket_cost: float = Field(
+        ..., description="Same basket at the cheapest store for each item"
+    )
+    full_basket_cost: float = Field(
+        ...,
+        description="basket_cost scaled to the whole basket (by average "
+        "priced item); groups are ranked on it",
+    )
+
+
 class ShoppingListPriceComparison(BaseModel):
     shopping_list_id: int
     shopping_list_name: str
@@ -150,3 +270,39 @@ class ItemPriceBreakdown(BaseModel):
     unit_price: Optional[float]
     total_price: Optional[float]
     is_available: bool
+
+
+class UnitPriceEquivalent(BaseModel):
+    item_code: str
+    name: str
+    manufacturer_name: Optional[str] = None
+    normalized_unit: str = Field(..., description="kg, l or unit")
+    price_per_unit: float = Field(..., description="Best current price per unit")
+    price: float = Field(..., description="Package price at that store")
+    store_id: int
+    store_count: int
+    is_reference: bool = False
+
+
+class BasketSplitStore(BaseModel):
+    store_id: int
+    store_name: str
+    chain_name: str
+    city: Optional[str]
+    distance_km: Optional[float] = None
+    subtotal: float
+    items: List[ItemPriceBreakdown]
+
+
+class BasketSplitResponse(BaseModel):
+    shopping_list_id: int
+    shopping_list_name: str
+    mode: str = Field(..., description="Solver used: exact or greedy")
+    is_optimal: bool
+    total_price: float = Field(..., description="Price of all covered items")
+    extra_store_penalty: float
+    objective: float = Field(..., description="total_price plus store penalties")
+    stores: List[BasketSplitStore]
+    missing_items: List[str]
+    candidate_stores: int
+    computation_ms: float
@@ -6,6 +6,7 @@ from enum import Enum
 
 class PredictionReason(str, Enum):
     APRIORI_ASSOCIATION = "apriori_association"
+    REPLENISHMENT_CYCLE = "replenishment_cycle"
 
 
 class ItemPrediction(BaseModel):
@@ -21,6 +22,7 @@ class ItemPrediction(BaseModel):
     current_price: Optional[float]
     store_name: Optional[str]
     chain_name: Optional[str]
+    store_distance_km: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -30,3 +32,6 @@ class PredictionsResponse(BaseModel):
     shopping_list_id: Optional[int]
     predictions: List[ItemPrediction]
     generated_at: datetime
+    # True while rules for these households are being regenerated; asking
+    # again shortly may return more predictions
+    rules_refreshing: bool = False
@@ -0,0 +1,181 @@
+# backend/app/services/autocomplete_service.py
+
+import heapq
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Item, ItemPrice
+from app.services.background_job import BackgroundJob
+from app.services.search_service import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+# Prefixes matching more index keys than this have their top results
+# precomputed, so no lookup ever scans more than this many keys
+PRECOMPUTE_RANGE_THRESHOLD = 1000
+MAX_SUGGESTIONS = 20
+
+
+class AutocompleteEntry(NamedTuple):
+    item_code: str
+    name: str
+    manufacturer_name: Optional[str]
+    popularity: int
+
+
+class AutocompleteIndex:
+    """Immutable sorted-array prefix index over normalized names and manufacturers.
+
+    Every word suffix of the item name is indexed ("קוקה קולה" is found by both
+    "קוק" and "קול"), as is the manufacturer name. Lookups are two binary
+    searches plus a scan of the matching key range.
+    """
+
+    def __init__(self, entries: List[AutocompleteEntry]):
+        self.entries = entries
+
+        keyed: List[Tuple[str, int]] = []
+        for entry_id, entry in enumerate(entries):
+            words = normalize_search_text(entry.name).split()
+            for start in range(len(words)):
+                keyed.append((" ".join(words[start:]), entry_id))
+
+            manufacturer = normalize_search_text(entry.manufacturer_name)
+            if manufacturer:
+                keyed.append((manufacturer, entry_id))
+
+        keyed.sort()
+        self._keys = [key for key, _ in keyed]
+        self._entry_ids = [entry_id for _, entry_id in keyed]
+
+        self._precomputed: Dict[str, List[int]] = {}
+        self._precompute_large_prefixes()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 10) -> List[AutocompleteEntry]:
+        """Return up to ``limit`` entries matching the prefix, most popular first."""
+        prefix = normalize_search_text(query)
+        if not prefix:
+            return []
+
+        if prefix in self._precomputed and limit <= MAX_SUGGESTIONS:
+            entry_ids = self._precomputed[prefix]
+        else:
+            lo, hi = self._key_range(prefix)
+            entry_ids = self._top_entries(range(lo, hi), limit)
+
+        return [self.entries[entry_id] for entry_id in entry_ids[:limit]]
+
+    def _key_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _top_entries(self, positions, limit: int) -> List[int]:
+        """Most popular distinct entries for a range of key positions."""
+        entry_ids = {self._entry_ids[position] for position in positions}
+        return heapq.nlargest(
+            limit, entry_ids, key=lambda entry_id: self.entries[entry_id].popularity
+        )
+
+    def _precompute_large_prefixes(self) -> None:
+        """Walk the prefix tree breadth first, expanding only large ranges.
+
+        A prefix's range is contained in its parent's, so every prefix over
+        the threshold is reached through parents that are over it as well.
+        """
+        large = [("", 0, len(self._keys))]
+        length = 0
+        while large:
+            length += 1
+            children = []
+            for _, parent_lo, parent_hi in large:
+                lo = parent_lo
+                while lo < parent_hi:
+                    key = self._keys[lo]
+                    if len(key) < length:
+                        lo += 1
+                        continue
+                    prefix = key[:length]
+                    hi = bisect_left(self._keys, prefix + "\uffff", lo, parent_hi)
+                    if hi - lo > PRECOMPUTE_RANGE_THRESHOLD:
+                        self._precomputed[prefix] = self._top_entries(
+                            range(lo, hi), MAX_SUGGESTIONS
+                        )
+                        children.append((prefix, lo, hi))
+                    lo = hi
+            large = children
+
+
+class AutocompleteService:
+    """Holds the process-wide autocomplete index and swaps it on reload."""
+
+    def __init__(self):
+        self._index: Optional[AutocompleteIndex] = None
+        self._lock = threading.Lock()
+        self._reload_job = BackgroundJob("autocomplete-reload", self._reload)
+
+    def get_index(self, db: Session) -> AutocompleteIndex:
+        """Return the current index, building it on first use."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self.build_index(db)
+        return self._index
+
+    def suggest(self, db: Session, query: str, limit: int = 10):
+        return self.get_index(db).search(query, limit)
+
+    def build_index(self, db: Session) -> AutocompleteIndex:
+        """Load names, manufacturers and popularity (active price count)."""
+        rows = (
+            db.query(
+                Item.item_code,
+                Item.name,
+                Item.manufacturer_name,
+                func.count(ItemPrice.id).label("popularity"),
+            )
+            .outerjoin(
+                ItemPrice,
+                (ItemPrice.item_code == Item.item_code) & (ItemPrice.item_status == 1),
+            )
+            .group_by(Item.id)
+            .all()
+        )
+
+        index = AutocompleteIndex(
+            [
+                AutocompleteEntry(
+                    item_code=row.item_code,
+                    name=row.name,
+                    manufacturer_name=row.manufacturer_name,
+                    popularity=row.popularity,
+                )
+                for row in rows
+            ]
+        )
+        logger.info(f"Built autocomplete index with {len(index)} items")
+        return index
+
+    def schedule_reload(self) -> None:
+        """Rebuild the index in the background after an import.
+
+        Requests keep being served from the previous index until the new one
+        is swapped in. Requests arriving while a reload is running trigger
+        exactly one more rebuild once it finishes.
+        """
+        self._reload_job.schedule()
+
+    def _reload(self, db: Session, _key) -> None:
+        self._index = self.build_index(db)
+
+
+# Global instance
+autocomplete_service = AutocompleteService()
@@ -0,0 +1,68 @@
+# backend/app/services/background_job.py
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Marks that no key is running; None is a valid key
+_IDLE = object()
+
+
+class BackgroundJob:
+    """Runs ``run(db, key)`` off the request path in one daemon thread,
+    coalescing repeated requests.
+
+    A key scheduled while it is already pending is queued only once. A key
+    scheduled while it is running is queued again, so whatever changed
+    during the run is picked up by exactly one more run. Keys run in the
+    order they were first scheduled, each with its own session.
+    """
+
+    def __init__(self, name: str, run: Callable[[Session, Hashable], None]):
+        self.name = name
+        self._run_job = run
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._running: Hashable = _IDLE
+        self._worker_active = False
+
+    def schedule(self, key: Hashable = None) -> None:
+        with self._lock:
+            self._pending[key] = None
+            if self._worker_active:
+                return
+            self._worker_active = True
+
+        threading.Thread(target=self._work, name=self.name, daemon=True).start()
+
+    def is_scheduled(self, key: Hashable = None) -> bool:
+        """Whether ``key`` is pending or running."""
+        with self._lock:
+            return key in self._pending or self._running == key
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._worker_active = False
+                    return
+                key, _ = self._pending.popitem(last=False)
+                self._running = key
+
+            db = SessionLocal()
+            try:
+                self._run_job(db, key)
+            except Exception as e:
+                target = f" for {key}" if key is not None else ""
+                logger.error(f"Background job {self.name} failed{target}: {e}")
+            finally:
+                db.close()
+                with self._lock:
+                    self._running = _IDLE
@@ -4,6 +4,7 @@ from typing import Optional
 
 from app.core.database import SessionLocal
 from app.services.prediction_service import PredictionService
+from app.services.incremental_rules import IncrementalRuleService
 from app.services.data_import_service import DataImportService
 from app.core.config import settings
 
@@ -26,8 +27,8 @@ class BackgroundTaskService:
         )
         self.is_running = True
 
-        # Start Apriori rule generation task
-        # self.apriori_task = asyncio.create_task(self._periodic_apriori_generation())
+        # Start association rule refresh task (dirty households only)
+        # self.apriori_task = asyncio.create_task(self._periodic_rule_refresh())
 
         # Start data import task
         # self.data_import_task = asyncio.create_task(self._periodic_data_import())
@@ -80,6 +81,37 @@ class BackgroundTaskService:
                 retry_delay = settings.APRIORI_ERROR_RETRY_MINUTES * 60
                 await asyncio.sleep(retry_delay)
 
+    async def _periodic_rule_refresh(self):
+        """Re-derive rules for households that completed lists since the
+        last pass, instead of regenerating every household nightly"""
+        while self.is_running:
+            try:
+                await self._refresh_dirty_rules()
+                await asyncio.sleep(settings.RULE_REFRESH_INTERVAL_MINUTES * 60)
+
+            except asyncio.CancelledError:
+                logger.info("Rule refresh task cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in periodic rule refresh: {e}")
+                retry_delay = settings.APRIORI_ERROR_RETRY_MINUTES * 60
+                await asyncio.sleep(retry_delay)
+
+    async def _refresh_dirty_rules(self):
+        """Refresh dirty households' rules in background thread"""
+
+        def _sync_refresh():
+            db = SessionLocal()
+            try:
+                rules = IncrementalRuleService(db)
+                rules.expire_window()
+                return rules.refresh_dirty()
+            finally:
+                db.close()
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, _sync_refresh)
+
     async def _generate_apriori_rules(self):
         """Generate Apriori rules in background thread"""
 
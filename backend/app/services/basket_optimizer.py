@@ -0,0 +1,274 @@
+# backend/app/services/basket_optimizer.py
+
+import time
+from dataclasses import dataclass, field
+from math import comb
+from typing import List, Optional
+
+import numpy as np
+
+EXACT = "exact"
+GREEDY = "greedy"
+AUTO = "auto"
+
+# Above this many store subsets, auto mode skips straight to greedy
+EXACT_SUBSET_LIMIT = 500_000
+
+
+@dataclass
+class BasketSplitSolution:
+    """Stores to visit (row indices into the price matrix) and, per item, the
+    chosen store row or -1 when none of the visited stores sells it."""
+
+    stores: List[int]
+    assignment: np.ndarray
+    total_price: float
+    missing: np.ndarray
+    mode: str
+    is_optimal: bool
+    nodes_explored: int = 0
+    elapsed_ms: float = field(default=0.0)
+
+
+class BasketSplitOptimizer:
+    """Cheapest way to buy a basket across up to ``max_stores`` stores.
+
+    Works on a dense ``stores x items`` matrix of unit prices (``nan`` where a
+    store doesn't sell an item). Each visited store beyond the first costs
+    ``extra_store_penalty``. Covering more items always beats a lower price:
+    an item nobody in the chosen set sells costs more than any full basket.
+    """
+
+    def __init__(
+        self,
+        prices: np.ndarray,
+        quantities: np.ndarray,
+        max_stores: int,
+        extra_store_penalty: float = 0.0,
+    ):
+        self.max_stores = max(1, max_stores)
+        self.penalty = float(extra_store_penalty)
+
+        line_costs = prices * quantities[np.newaxis, :]
+        available = np.isfinite(line_costs)
+        self.available = available
+        self.missing = ~available.any(axis=0)
+
+        # Cost of leaving an item uncovered outweighs any priced basket
+        finite_max = np.where(available, line_costs, 0.0).max(axis=0)
+        self.uncovered_cost = (
+            float(finite_max.sum()) + self.penalty * self.max_stores + 1.0
+        )
+        self.costs = np.where(available, line_costs, self.uncovered_cost)
+
+    def solve(
+        self, mode: str = AUTO, time_budget_ms: Optional[float] = None
+    ) -> BasketSplitSolution:
+        started = time.perf_counter()
+
+        if mode == AUTO:
+            subsets = sum(
+                comb(len(self.costs), k) for k in range(1, self.max_stores + 1)
+            )
+            mode = EXACT if subsets <= EXACT_SUBSET_LIMIT else GREEDY
+
+        if len(self.costs) == 0:
+            solution = BasketSplitSolution(
+                stores=[],
+                assignment=np.full(self.costs.shape[1], -1),
+                total_price=0.0,
+                missing=self.missing,
+                mode=mode,
+                is_optimal=True,
+            )
+        elif mode == EXACT:
+            solution = self._branch_and_bound(started, time_budget_ms)
+        else:
+            solution = self._greedy()
+
+        solution.elapsed_ms = (time.perf_counter() - started) * 1000
+        return solution
+
+    def _objective(self, line_minimums: np.ndarray, store_count: int) -> float:
+        return float(line_minimums.sum()) + self.penalty * (store_count - 1)
+
+    def _greedy(self) -> BasketSplitSolution:
+        return self._solution(self._greedy_stores(), GREEDY, is_optimal=False)
+
+    def _greedy_stores(self) -> List[int]:
+        """Start from the best single store, then keep adding whichever store
+        lowers the objective the most, until ``max_stores`` or no gain."""
+        single_totals = self.costs.sum(axis=1)
+        chosen = [int(np.argmin(single_totals))]
+        current = self.costs[chosen[0]].copy()
+        best = self._objective(current, 1)
+
+        while len(chosen) < self.max_stores:
+            candidate_totals = np.minimum(current, self.costs).sum(axis=1)
+            candidate_totals[chosen] = np.inf
+            store = int(np.argmin(candidate_totals))
+            objective = float(candidate_totals[store]) + self.penalty * len(chosen)
+            if objective >= best:
+                break
+            chosen.append(store)
+            current = np.minimum(current, self.costs[store])
+            best = objective
+
+        return self._improve_by_swaps(chosen, best)
+
+    def _improve_by_swaps(self, chosen: List[int], best: float) -> List[int]:
+        """Local search: replace one chosen store with any other store while
+        that lowers the objective."""
+        improved = True
+        while improved and len(chosen) > 1:
+            improved = False
+            for position in range(len(chosen)):
+                others = chosen[:position] + chosen[position + 1 :]
+                rest = self.costs[others].min(axis=0)
+                totals = np.minimum(rest, self.costs).sum(axis=1)
+                totals[chosen] = np.inf
+                store = int(np.argmin(totals))
+                objective = self._objective(totals[store], len(chosen))
+                if objective < best - 1e-9:
+                    chosen = others[:position] + [store] + others[position:]
+                    best = objective
+                    improved = True
+        return chosen
+
+    def _branch_and_bound(
+        self, started: float, time_budget_ms: Optional[float]
+    ) -> BasketSplitSolution:
+        """Depth-first search over store subsets, seeded with the greedy
+        solution.
+
+        Stores are ordered by single-store cost and a subset is only extended
+        with later stores. At each node all one-store extensions are scored
+        in one vectorized step; an extension is expanded further only if its
+        lower bound (every line at its cheapest over all still-allowed
+        stores, plus one more store penalty) beats the incumbent.
+        """
+        best_stores = self._greedy_stores()
+        best_value = self._objective(
+            self.costs[best_stores].min(axis=0), len(best_stores)
+        )
+
+        candidates = self._undominated_stores()
+        order = candidates[np.argsort(self.costs[candidates].sum(axis=1))]
+        ordered_costs = self.costs[order]
+        store_count = len(order)
+
+        # suffix_minimums[i] = per-item minimum over stores order[i:]
+        suffix_minimums = np.minimum.accumulate(ordered_costs[::-1], axis=0)[::-1]
+
+        deadline = (
+            started + time_budget_ms / 1000 if time_budget_ms is not None else None
+        )
+        nodes = 0
+        timed_out = False
+        # Root: the empty subset, whose extensions are the single stores
+        stack = [(-1, [], None)]
+
+        while stack:
+            nodes += 1
+            if deadline is not None and time.perf_counter() > deadline:
+                timed_out = True
+                break
+
+            position, chosen, current = stack.pop()
+            first = position + 1
+            if first >= store_count:
+                continue
+
+            if current is None:
+                extended = ordered_costs
+            else:
+                extended = np.minimum(current, ordered_costs[first:])
+            size = len(chosen) + 1
+            values = extended.sum(axis=1) + self.penalty * (size - 1)
+
+            best_offset = int(np.argmin(values))
+            if values[best_offset] < best_value:
+                best_value = float(values[best_offset])
+                best_stores = [int(order[p]) for p in chosen] + [
+                    int(order[first + best_offset])
+                ]
+
+            if size >= self.max_stores or first + 1 >= store_count:
+                continue
+
+            # Two lower bounds for extending child (first + offset) with later
+            # stores; the last store has nothing after it and is never expanded.
+            # First: every line at its cheapest over all still-allowed stores.
+            bounds = (
+                np.minimum(extended[:-1], suffix_minimums[first + 1 :]).sum(axis=1)
+                + self.penalty * size
+            )
+            if current is not None:
+                # Second: savings are subadditive and only shrink as stores are
+                # added, so t more stores save at most the t largest savings
+                # any single later store offers over the current subset
+                line_totals = extended.sum(axis=1)
+                savings = np.sort(current.sum() - line_totals[1:])[::-1]
+                remaining = self.max_stores - size
+                best_saving = max(
+                    savings[:t].sum() - self.penalty * t
+                    for t in range(1, min(remaining, len(savings)) + 1)
+                )
+                bounds = np.maximum(bounds, values[:-1] - best_saving)
+                # A store that lowers no line only adds a penalty; the same
+                # supersets without it are reached through its siblings
+                bounds[line_totals[:-1] >= current.sum()] = np.inf
+            promising = np.flatnonzero(bounds < best_value)
+            for offset in promising[::-1]:
+                stack.append(
+                    (first + offset, chosen + [first + offset], extended[offset])
+                )
+
+        solution = self._solution(best_stores, EXACT, is_optimal=not timed_out)
+        solution.nodes_explored = nodes
+        return solution
+
+    def _undominated_stores(self) -> np.ndarray:
+        """Drop stores that are never cheaper than some other single store.
+
+        With ties, the lower row index is kept, so exactly one of a set of
+        identical stores survives.
+        """
+        store_count = len(self.costs)
+        if store_count > 2000:
+            return np.arange(store_count)
+
+        keep = np.ones(store_count, dtype=bool)
+        for store in range(store_count):
+            no_worse = (self.costs <= self.costs[store]).all(axis=1)
+            strictly_better = (self.costs < self.costs[store]).any(axis=1)
+            identical_earlier = ~strictly_better & (np.arange(store_count) < store)
+            no_worse[store] = False
+            if (no_worse & (strictly_better | identical_earlier)).any():
+                keep[store] = False
+        return np.flatnonzero(keep)
+
+    def _solution(
+        self, stores: List[int], mode: str, is_optimal: bool
+    ) -> BasketSplitSolution:
+        store_costs = self.costs[stores]
+        cheapest = store_costs.argmin(axis=0)
+        assignment = np.asarray(stores)[cheapest]
+        # Items none of the chosen stores sells only carry the uncovered
+        # placeholder cost; they are missing, not bought anywhere
+        missing = ~self.available[stores].any(axis=0)
+        assignment[missing] = -1
+
+        # Only stores that actually supply something are worth the trip
+        used = [store for store in stores if (assignment == store).any()]
+        line_minimums = store_costs.min(axis=0)
+        total_price = float(line_minimums[~missing].sum())
+
+        return BasketSplitSolution(
+            stores=used,
+            assignment=assignment,
+            total_price=total_price,
+            missing=missing,
+            mode=mode,
+            is_optimal=is_optimal,
+        )
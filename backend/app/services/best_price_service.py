@@ -0,0 +1,226 @@
+# backend/app/services/best_price_service.py
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    cast,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+)
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Chain, ItemBestPrice, ItemPrice, Store
+from app.schemas import BestPriceEntry
+from app.services.current_prices import latest_active_prices
+from app.services.geo import geocell, geocells_within, haversine_km
+
+# Geocell of the nationwide ranking
+GLOBAL_CELL = ""
+
+
+class BestPriceService:
+    """Maintains item_best_prices and answers batched cheapest-price lookups."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh_store_items(self, store: Store, item_codes: Iterable[str]) -> None:
+        """Re-rank the items whose price changed at ``store``.
+
+        Only the rankings that store takes part in are recomputed: the
+        nationwide one and the one of its own geocell. Runs in the caller's
+        transaction.
+        """
+        item_codes = sorted(set(item_codes))
+        if not item_codes:
+            return
+
+        geocells = [GLOBAL_CELL]
+        if store.latitude is not None and store.longitude is not None:
+            geocells.append(
+                geocell(
+                    store.latitude,
+                    store.longitude,
+                    settings.BEST_PRICE_GEOCELL_DEGREES,
+                )
+            )
+
+        self.db.flush()
+        self.db.query(ItemBestPrice).filter(
+            ItemBestPrice.item_code.in_(item_codes),
+            ItemBestPrice.geocell.in_(geocells),
+        ).delete(synchronize_session=False)
+        self._insert_ranked(ItemPrice.item_code.in_(item_codes), geocells[1:])
+
+    def rebuild(self) -> int:
+        """Re-rank every item, e.g. after store locations changed."""
+        self.db.query(ItemBestPrice).delete(synchronize_session=False)
+        inserted = self._insert_ranked(literal(True))
+        self.db.commit()
+        return inserted
+
+    def _insert_ranked(self, condition, geocells: Optional[List[str]] = None) -> int:
+        """Rank the current prices of the items matching ``condition``,
+        nationwide and per geocell (only ``geocells`` when given)."""
+        cell_degrees = settings.BEST_PRICE_GEOCELL_DEGREES
+        # || rather than concat(), which would skip NULLs and turn stores
+        # without coordinates into a ":" cell
+        cell = (
+            cast(cast(func.floor(Store.latitude / cell_degrees), Integer), String)
+            + literal(":")
+            + cast(cast(func.floor(Store.longitude / cell_degrees), Integer), String)
+        )
+        current = latest_active_prices(
+            select(
+                ItemPrice.item_code,
+                ItemPrice.store_id,
+                ItemPrice.price,
+                ItemPrice.price_update_date,
+                cell.label("geocell"),
+            )
+            .join(Store, Store.id == ItemPrice.store_id)
+            .where(condition)
+        ).subquery()
+
+        inserted = 0
+        for partition, ranking_cell, where in [
+            ([current.c.item_code], literal(GLOBAL_CELL), literal(True)),
+            (
+                [current.c.item_code, current.c.geocell],
+                current.c.geocell,
+                (
+                    current.c.geocell.isnot(None)
+                    if geocells is None
+                    else current.c.geocell.in_(geocells)
+                ),
+            ),
+        ]:
+            rank = (
+                func.row_number()
+                .over(
+                    partition_by=partition,
+                    order_by=[current.c.price, current.c.store_id],
+                )
+                .label("rank")
+            )
+            ranked = (
+                select(
+                    current.c.item_code,
+                    ranking_cell.label("geocell"),
+                    rank,
+                    current.c.store_id,
+                    current.c.price,
+                    current.c.price_update_date,
+                )
+                .where(where)
+                .subquery()
+            )
+            statement = insert(ItemBestPrice).from_select(
+                [
+                    "item_code",
+                    "geocell",
+                    "rank",
+                    "store_id",
+                    "price",
+                    "price_update_date",
+                ],
+                select(ranked).where(ranked.c.rank <= settings.BEST_PRICE_TOP_K),
+            )
+            inserted += self.db.execute(statement).rowcount
+
+        return inserted
+
+    def cheapest(
+        self,
+        item_codes: Iterable[str],
+        user_lat: Optional[float] = None,
+        user_lon: Optional[float] = None,
+        radius_km: Optional[float] = None,
+    ) -> Dict[str, BestPriceEntry]:
+        """Cheapest current price for each item, in one query.
+
+        With a location, the cheapest store within ``radius_km`` wins; items
+        with no nearby price fall back to the nationwide best, marked with
+        ``is_nearby=False``. Items with no price at all are left out.
+        """
+        item_codes = sorted(set(item_codes))
+        if not item_codes:
+            return {}
+
+        located = user_lat is not None and user_lon is not None
+        cells = []
+        if located:
+            radius_km = radius_km or settings.BEST_PRICE_NEARBY_RADIUS_KM
+            cells = geocells_within(
+                user_lat, user_lon, radius_km, settings.BEST_PRICE_GEOCELL_DEGREES
+            )
+
+        rows = (
+            self.db.query(
+                ItemBestPrice.item_code,
+                ItemBestPrice.geocell,
+                ItemBestPrice.store_id,
+                ItemBestPrice.price,
+                Store.name.label("store_name"),
+                Store.latitude,
+                Store.longitude,
+                Chain.name.label("chain_name"),
+            )
+            .join(Store, Store.id == ItemBestPrice.store_id)
+            .join(Chain, Chain.chain_id == Store.chain_id)
+            .filter(
+                ItemBestPrice.item_code.in_(item_codes),
+                or_(
+                    and_(ItemBestPrice.geocell == GLOBAL_CELL, ItemBestPrice.rank == 1),
+                    ItemBestPrice.geocell.in_(cells),
+                ),
+            )
+            .all()
+        )
+
+        distances = np.full(len(rows), np.nan)
+        if located and rows:
+            distances = haversine_km(
+                user_lat,
+                user_lon,
+                np.array([np.nan if r.latitude is None else r.latitude for r in rows]),
+                np.array(
+                    [np.nan if r.longitude is None else r.longitude for r in rows]
+                ),
+            )
+
+        nearby = {}
+        nationwide = {}
+        for row, distance in zip(rows, distances):
+            distance = None if np.isnan(distance) else round(float(distance), 2)
+            if row.geocell == GLOBAL_CELL:
+                nationwide[row.item_code] = (row, distance)
+            elif distance is not None and distance <= radius_km:
+                best = nearby.get(row.item_code)
+                if best is None or (row.price, distance) < (best[0].price, best[1]):
+                    nearby[row.item_code] = (row, distance)
+
+        results = {}
+        for item_code in item_codes:
+            match = nearby.get(item_code) or nationwide.get(item_code)
+            if match is None:
+                continue
+            row, distance = match
+            results[item_code] = BestPriceEntry(
+                item_code=item_code,
+                store_id=row.store_id,
+                store_name=row.store_name,
+                chain_name=row.chain_name,
+                price=row.price,
+                distance_km=distance,
+                is_nearby=item_code in nearby,
+            )
+        return results
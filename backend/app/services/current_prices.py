@@ -0,0 +1,23 @@
+# backend/app/services/current_prices.py
+
+from sqlalchemy import desc
+
+from app.models import ItemPrice
+
+
+def latest_active_prices(query):
+    """Restrict a query over item_prices to the latest active price row of
+    each (item, store).
+
+    Works on both ``Session.query()`` and ``select()``; callers add their
+    own columns, joins and filters.
+    """
+    return (
+        query.filter(ItemPrice.item_status == 1)
+        .distinct(ItemPrice.item_code, ItemPrice.store_id)
+        .order_by(
+            ItemPrice.item_code,
+            ItemPrice.store_id,
+            desc(ItemPrice.price_update_date),
+        )
+    )
@@ -0,0 +1,43 @@
+# backend/app/services/geo.py
+
+import math
+from typing import List
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(
+    lat: float, lon: float, lats: np.ndarray, lons: np.ndarray
+) -> np.ndarray:
+    """Great-circle distance from one point to many, in kilometers."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def geocell(lat: float, lon: float, cell_degrees: float) -> str:
+    """Id of the lat/lon grid cell containing a point, e.g. '320:348'."""
+    return f"{math.floor(lat / cell_degrees)}:{math.floor(lon / cell_degrees)}"
+
+
+def geocells_within(
+    lat: float, lon: float, radius_km: float, cell_degrees: float
+) -> List[str]:
+    """Ids of every grid cell that may hold points within ``radius_km``."""
+    lat_cells = math.ceil(radius_km / (cell_degrees * KM_PER_DEGREE))
+    lon_km = cell_degrees * KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01)
+    lon_cells = math.ceil(radius_km / lon_km)
+
+    row, col = math.floor(lat / cell_degrees), math.floor(lon / cell_degrees)
+    return [
+        f"{row + d_row}:{col + d_col}"
+        for d_row in range(-lat_cells, lat_cells + 1)
+        for d_col in range(-lon_cells, lon_cells + 1)
+    ]
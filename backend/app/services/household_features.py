@@ -0,0 +1,248 @@
+# backend/app/services/household_features.py
+
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import case, extract, func, insert as sql_insert
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import HouseholdItemFeatures, PurchaseEvent
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+
+
+def _half_life_seconds() -> float:
+    return settings.PURCHASE_RECENCY_HALF_LIFE_DAYS * SECONDS_PER_DAY
+
+
+@dataclass
+class ItemFeatureSet:
+    """Features of a household's items as parallel arrays, combined across
+    households when a user belongs to several."""
+
+    item_codes: List[str]
+    item_names: List[str]
+    purchase_count: np.ndarray
+    avg_quantity: np.ndarray
+    last_purchased: List[datetime]
+    days_since_last: np.ndarray
+    # NaN where an item was bought only once
+    mean_interval_days: np.ndarray
+    # Decayed to the time of loading
+    recency_weight: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.item_codes)
+
+
+class HouseholdFeatureService:
+    """Maintains and reads household x item purchase features.
+
+    Every statistic is updatable from the previous row and one new purchase:
+    the mean inter-purchase interval is (last - first) / (count - 1), and the
+    recency weight is an exponentially decayed count stored as of the last
+    purchase.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, events: Iterable[dict]) -> int:
+        """Fold one completed list's purchase event rows into the features,
+        in the caller's transaction."""
+        purchases: Dict[tuple, dict] = {}
+        for event in events:
+            if not event.get("item_code"):
+                continue
+            key = (event["household_id"], event["item_code"])
+            purchase = purchases.get(key)
+            if purchase is None:
+                purchases[key] = {
+                    "household_id": event["household_id"],
+                    "item_code": event["item_code"],
+                    "item_name": event["item_name"],
+                    "purchase_count": 1,
+                    "avg_quantity": event["quantity"],
+                    "first_purchased": event["completed_at"],
+                    "last_purchased": event["completed_at"],
+                    "mean_interval_days": None,
+                    "recency_weight": 1.0,
+                }
+            else:
+                # An item listed twice in one list is one purchase
+                purchase["avg_quantity"] += event["quantity"]
+        if not purchases:
+            return 0
+
+        features = HouseholdItemFeatures
+        statement = insert(features).values(list(purchases.values()))
+        new = statement.excluded
+        gap_seconds = extract("epoch", new.last_purchased - features.last_purchased)
+        decay = func.power(0.5, func.abs(gap_seconds) / _half_life_seconds())
+        first = func.least(features.first_purchased, new.first_purchased)
+        last = func.greatest(features.last_purchased, new.last_purchased)
+
+        statement = statement.on_conflict_do_update(
+            index_elements=[features.household_id, features.item_code],
+            set_={
+                "item_name": new.item_name,
+                "purchase_count": features.purchase_count + 1,
+                "avg_quantity": (
+                    features.avg_quantity * features.purchase_count + new.avg_quantity
+                )
+                / (features.purchase_count + 1),
+                "first_purchased": first,
+                "last_purchased": last,
+                "mean_interval_days": extract("epoch", last - first)
+                / SECONDS_PER_DAY
+                / features.purchase_count,
+                # A purchase older than the stored one (a backdated list)
+                # adds its own decayed weight instead of decaying the total
+                "recency_weight": case(
+                    (gap_seconds >= 0, features.recency_weight * decay + 1),
+                    else_=features.recency_weight + decay,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(statement)
+        return len(purchases)
+
+    def rebuild(self) -> int:
+        """Recompute every household's features from purchase events."""
+        purchases = (
+            self.db.query(
+                PurchaseEvent.household_id,
+                PurchaseEvent.item_code,
+                func.max(PurchaseEvent.item_name).label("item_name"),
+                func.sum(PurchaseEvent.quantity).label("quantity"),
+                PurchaseEvent.completed_at,
+            )
+            .filter(PurchaseEvent.item_code.isnot(None))
+            .group_by(
+                PurchaseEvent.household_id,
+                PurchaseEvent.item_code,
+                PurchaseEvent.history_id,
+                PurchaseEvent.completed_at,
+            )
+            .order_by(PurchaseEvent.completed_at, PurchaseEvent.history_id)
+            .yield_per(5000)
+        )
+
+        half_life = _half_life_seconds()
+        rows: Dict[tuple, dict] = {}
+        for purchase in purchases:
+            key = (purchase.household_id, purchase.item_code)
+            row = rows.get(key)
+            if row is None:
+                rows[key] = {
+                    "household_id": purchase.household_id,
+                    "item_code": purchase.item_code,
+                    "item_name": purchase.item_name,
+                    "purchase_count": 1,
+                    "avg_quantity": purchase.quantity,
+                    "first_purchased": purchase.completed_at,
+                    "last_purchased": purchase.completed_at,
+                    "mean_interval_days": None,
+                    "recency_weight": 1.0,
+                }
+                continue
+
+            gap = (purchase.completed_at - row["last_purchased"]).total_seconds()
+            count = row["purchase_count"]
+            row["item_name"] = purchase.item_name
+            row["avg_quantity"] = (row["avg_quantity"] * count + purchase.quantity) / (
+                count + 1
+            )
+            row["purchase_count"] = count + 1
+            row["last_purchased"] = purchase.completed_at
+            row["mean_interval_days"] = (
+                (purchase.completed_at - row["first_purchased"]).total_seconds()
+                / SECONDS_PER_DAY
+                / count
+            )
+            row["recency_weight"] = row["recency_weight"] * 0.5 ** (gap / half_life) + 1
+
+        self.db.query(HouseholdItemFeatures).delete(synchronize_session=False)
+        values = list(rows.values())
+        for start in range(0, len(values), 5000):
+            self.db.execute(
+                sql_insert(HouseholdItemFeatures), values[start : start + 5000]
+            )
+        self.db.commit()
+        logger.info(f"Rebuilt {len(values)} household item features")
+        return len(values)
+
+    def load(
+        self, household_ids: List[int], item_codes: Optional[Iterable[str]] = None
+    ) -> ItemFeatureSet:
+        """Features of the households' items (or just ``item_codes``), in
+        one lookup on the household_id primary key prefix."""
+        features = HouseholdItemFeatures
+        now = datetime.now(UTC)
+        query = (
+            self.db.query(
+                features.item_code,
+                func.max(features.item_name).label("item_name"),
+                func.sum(features.purchase_count).label("purchase_count"),
+                (
+                    func.sum(features.avg_quantity * features.purchase_count)
+                    / func.sum(features.purchase_count)
+                ).label("avg_quantity"),
+                func.max(features.last_purchased).label("last_purchased"),
+                (
+                    func.sum(
+                        extract(
+                            "epoch", features.last_purchased - features.first_purchased
+                        )
+                    )
+                    / SECONDS_PER_DAY
+                    / func.nullif(func.sum(features.purchase_count - 1), 0)
+                ).label("mean_interval_days"),
+                func.sum(
+                    features.recency_weight
+                    * func.power(
+                        0.5,
+                        extract("epoch", now - features.last_purchased)
+                        / _half_life_seconds(),
+                    )
+                ).label("recency_weight"),
+            )
+            .filter(features.household_id.in_(household_ids))
+            .group_by(features.item_code)
+        )
+        if item_codes is not None:
+            query = query.filter(features.item_code.in_(list(item_codes)))
+        rows = query.all()
+
+        return ItemFeatureSet(
+            item_codes=[row.item_code for row in rows],
+            item_names=[row.item_name for row in rows],
+            purchase_count=np.array(
+                [row.purchase_count for row in rows], dtype=np.int64
+            ),
+            avg_quantity=np.array([row.avg_quantity for row in rows], dtype=float),
+            last_purchased=[row.last_purchased for row in rows],
+            days_since_last=np.array(
+                [
+                    (now - row.last_purchased).total_seconds() / SECONDS_PER_DAY
+                    for row in rows
+                ],
+                dtype=float,
+            ),
+            mean_interval_days=np.array(
+                [
+                    np.nan if row.mean_interval_days is None else row.mean_interval_days
+                    for row in rows
+                ],
+                dtype=float,
+            ),
+            recency_weight=np.array([row.recency_weight for row in rows], dtype=float),
+        )
@@ -0,0 +1,375 @@
+# backend/app/services/incremental_rules.py
+
+import json
+import logging
+import math
+from collections import Counter
+from datetime import date, timedelta
+from itertools import combinations, groupby
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert as sql_insert
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    AssociationRule,
+    HouseholdRuleState,
+    ItemsetCount,
+    PendingItemsetTransaction,
+    PurchaseEvent,
+)
+from app.services.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+# Same window the full rule generation reads
+WINDOW_DAYS = 90
+# Queued lists counted per batch, and counter rows per upsert
+PENDING_BATCH_SIZE = 1000
+UPSERT_BATCH_SIZE = 5000
+
+
+def transaction_itemsets(item_codes: Iterable[str]) -> List[Tuple[str, int]]:
+    """Every itemset of size 0-3 in one transaction, as (key, size).
+
+    Like the full miner (max_len=3), every triple of a list is counted,
+    however long the list.
+    """
+    codes = sorted(set(item_codes))
+    itemsets = [("", 0)]
+    for size in (1, 2, 3):
+        itemsets.extend(
+            (",".join(itemset), size) for itemset in combinations(codes, size)
+        )
+    return itemsets
+
+
+def count_itemsets(events: Iterable) -> Tuple[Counter, Set[int]]:
+    """Itemset counts per (household, day, itemset, size) of purchase events
+    ordered by history_id, and the households they belong to.
+
+    Lists are bucketed by the day they were completed; lists with fewer
+    than 2 coded items are not transactions.
+    """
+    counts: Counter = Counter()
+    households: Set[int] = set()
+    for _, list_events in groupby(events, key=attrgetter("history_id")):
+        list_events = list(list_events)
+        codes = sorted({event.item_code for event in list_events})
+        if len(codes) < 2:
+            continue
+        household_id = list_events[0].household_id
+        day = list_events[0].completed_at.date()
+        households.add(household_id)
+        for itemset, size in transaction_itemsets(codes):
+            counts[(household_id, day, itemset, size)] += 1
+    return counts, households
+
+
+class IncrementalRuleService:
+    """Keeps association rules current from incrementally counted itemsets.
+
+    Completing a list only queues it; the scheduler counts queued lists'
+    itemsets into the households' per-day counters in bulk and marks those
+    households dirty. Every new transaction changes the
+    support and lift of all the household's rules, so the scheduler
+    re-derives a dirty household's whole rule set, straight from the
+    counters; nothing re-reads shopping history. The global rules sum all
+    households' counters and are re-derived whenever any household was.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        thresholds = PredictionService(db)
+        self.min_support = thresholds.min_support
+        self.min_confidence = thresholds.min_confidence
+        self.min_lift = thresholds.min_lift
+
+    def record_transaction(self, history_id: int, household_id: int) -> None:
+        """Queue a completed list for counting. Runs in the caller's
+        transaction; refresh_dirty counts queued lists in bulk."""
+        self.db.execute(
+            insert(PendingItemsetTransaction)
+            .values(history_id=history_id, household_id=household_id)
+            .on_conflict_do_nothing()
+        )
+
+    def count_pending(self) -> int:
+        """Add the itemsets of queued lists to the counters and flag their
+        households, in batches. Returns the number of lists taken."""
+        taken = 0
+        while True:
+            # Rows another refresh is counting are skipped, not counted twice
+            history_ids = [
+                row.history_id
+                for row in self.db.query(PendingItemsetTransaction.history_id)
+                .order_by(PendingItemsetTransaction.history_id)
+                .limit(PENDING_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            ]
+            if not history_ids:
+                return taken
+
+            events = (
+                self.db.query(
+                    PurchaseEvent.history_id,
+                    PurchaseEvent.household_id,
+                    PurchaseEvent.completed_at,
+                    PurchaseEvent.item_code,
+                )
+                .filter(
+                    PurchaseEvent.history_id.in_(history_ids),
+                    PurchaseEvent.item_code.isnot(None),
+                )
+                .order_by(PurchaseEvent.history_id)
+            )
+            counts, households = count_itemsets(events)
+            self._add_counts(counts)
+            self.db.query(PendingItemsetTransaction).filter(
+                PendingItemsetTransaction.history_id.in_(history_ids)
+            ).delete(synchronize_session=False)
+            self.mark_dirty(households)
+            self.db.commit()
+            taken += len(history_ids)
+
+    def _add_counts(self, counts: Counter) -> None:
+        rows = [
+            {
+                "household_id": household_id,
+                "day": day,
+                "itemset": itemset,
+                "size": size,
+                "count": count,
+            }
+            for (household_id, day, itemset, size), count in counts.items()
+        ]
+        statement = insert(ItemsetCount)
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                ItemsetCount.household_id,
+                ItemsetCount.day,
+                ItemsetCount.itemset,
+            ],
+            set_={"count": ItemsetCount.count + statement.excluded.count},
+        )
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            self.db.execute(statement, rows[start : start + UPSERT_BATCH_SIZE])
+
+    def mark_dirty(self, household_ids: Iterable[int]) -> None:
+        """Flag households whose transaction counts changed."""
+        household_ids = sorted(set(household_ids))
+        if not household_ids:
+            return
+
+        statement = insert(HouseholdRuleState).values(
+            [
+                {
+                    "household_id": household_id,
+                    "dirty_version": 1,
+                    "dirty_since": func.now(),
+                }
+                for household_id in household_ids
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[HouseholdRuleState.household_id],
+            set_={
+                "dirty_version": HouseholdRuleState.dirty_version + 1,
+                "dirty_since": func.coalesce(
+                    HouseholdRuleState.dirty_since, statement.excluded.dirty_since
+                ),
+            },
+        )
+        self.db.execute(statement)
+
+    def expire_window(self) -> int:
+        """Drop day buckets that left the window; their households' rules
+        go stale."""
+        since = date.today() - timedelta(days=WINDOW_DAYS)
+        expired = (
+            self.db.query(ItemsetCount.household_id)
+            .filter(ItemsetCount.day < since, ItemsetCount.size == 0)
+            .distinct()
+            .all()
+        )
+        if not expired:
+            return 0
+
+        deleted = (
+            self.db.query(ItemsetCount)
+            .filter(ItemsetCount.day < since)
+            .delete(synchronize_session=False)
+        )
+        self.mark_dirty(row.household_id for row in expired)
+        self.db.commit()
+        return deleted
+
+    def rebuild_counts(self) -> int:
+        """Recount the whole window from purchase events (backfill).
+
+        Runs on one snapshot, so lists queued for counting are either in
+        that snapshot (counted here, and their queue rows dropped) or
+        completed later (left queued).
+        """
+        self.db.commit()
+        self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        since = date.today() - timedelta(days=WINDOW_DAYS)
+        events = (
+            self.db.query(
+                PurchaseEvent.history_id,
+                PurchaseEvent.household_id,
+                PurchaseEvent.completed_at,
+                PurchaseEvent.item_code,
+            )
+            .filter(
+                PurchaseEvent.completed_at >= since,
+                PurchaseEvent.item_code.isnot(None),
+            )
+            .order_by(PurchaseEvent.history_id)
+            .yield_per(5000)
+        )
+        counts, households = count_itemsets(events)
+
+        self.db.query(PendingItemsetTransaction).delete(synchronize_session=False)
+        self.db.query(ItemsetCount).delete(synchronize_session=False)
+        rows = [
+            {
+                "household_id": household_id,
+                "day": day,
+                "itemset": itemset,
+                "size": size,
+                "count": count,
+            }
+            for (household_id, day, itemset, size), count in counts.items()
+        ]
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            self.db.execute(
+                sql_insert(ItemsetCount), rows[start : start + UPSERT_BATCH_SIZE]
+            )
+
+        # Households that only have rules left get them cleared
+        rule_owners = (
+            self.db.query(AssociationRule.household_id)
+            .filter(AssociationRule.household_id.isnot(None))
+            .distinct()
+        )
+        households.update(row.household_id for row in rule_owners)
+        self.mark_dirty(households)
+        self.db.commit()
+        return len(rows)
+
+    def refresh_dirty(self, max_households: Optional[int] = None) -> Dict[str, int]:
+        """Re-derive the rules of dirty households, oldest first, then the
+        global rules if any household was refreshed. Queued lists are
+        counted first."""
+        self.count_pending()
+        query = (
+            self.db.query(
+                HouseholdRuleState.household_id, HouseholdRuleState.dirty_version
+            )
+            .filter(HouseholdRuleState.dirty_since.isnot(None))
+            .order_by(HouseholdRuleState.dirty_since)
+        )
+        if max_households:
+            query = query.limit(max_households)
+        states = query.all()
+
+        stats = {"households_refreshed": 0, "rules_written": 0}
+        for household_id, version in states:
+            stats["rules_written"] += self._rederive(household_id)
+            # Completions that arrived meanwhile keep the household dirty
+            self.db.query(HouseholdRuleState).filter(
+                HouseholdRuleState.household_id == household_id,
+                HouseholdRuleState.dirty_version == version,
+            ).update(
+                {
+                    HouseholdRuleState.dirty_since: None,
+                    HouseholdRuleState.rules_refreshed_at: func.now(),
+                },
+                synchronize_session=False,
+            )
+            self.db.commit()
+            stats["households_refreshed"] += 1
+
+        if states:
+            stats["rules_written"] += self._rederive(None)
+            self.db.commit()
+            logger.info(
+                f"Refreshed rules for {stats['households_refreshed']} households "
+                f"and the global set, {stats['rules_written']} rules written"
+            )
+        return stats
+
+    def _rederive(self, household_id: Optional[int]) -> int:
+        """Replace the household's rules (the global rules when None) with
+        rules derived from the windowed counts."""
+        since = date.today() - timedelta(days=WINDOW_DAYS)
+        in_window = [ItemsetCount.day >= since]
+        if household_id is not None:
+            in_window.append(ItemsetCount.household_id == household_id)
+        transactions = (
+            self.db.query(func.sum(ItemsetCount.count))
+            .filter(*in_window, ItemsetCount.size == 0)
+            .scalar()
+            or 0
+        )
+
+        rules = []
+        if transactions:
+            min_count = max(math.ceil(self.min_support * transactions - 1e-9), 1)
+            total = func.sum(ItemsetCount.count)
+            counts = {
+                tuple(row.itemset.split(",")): row.count
+                for row in self.db.query(ItemsetCount.itemset, total.label("count"))
+                .filter(*in_window, ItemsetCount.size > 0)
+                .group_by(ItemsetCount.itemset)
+                .having(total >= min_count)
+            }
+            rules = self._derive_rules(counts, transactions)
+
+        if household_id is None:
+            owned = AssociationRule.household_id.is_(None)
+        else:
+            owned = AssociationRule.household_id == household_id
+        self.db.query(AssociationRule).filter(owned).delete(synchronize_session=False)
+        if rules:
+            self.db.execute(
+                sql_insert(AssociationRule),
+                [dict(rule, household_id=household_id) for rule in rules],
+            )
+        return len(rules)
+
+    def _derive_rules(
+        self, counts: Dict[Tuple[str, ...], int], transactions: int
+    ) -> List[dict]:
+        """Rules from frequent itemset counts, as mlxtend's association_rules
+        would produce them."""
+        rules = []
+        for itemset, count in counts.items():
+            if len(itemset) < 2:
+                continue
+
+            for antecedent_size in range(1, len(itemset)):
+                for antecedent in combinations(itemset, antecedent_size):
+                    consequent = tuple(
+                        code for code in itemset if code not in antecedent
+                    )
+                    confidence = count / counts[antecedent]
+                    if confidence < self.min_confidence:
+                        continue
+                    lift = confidence / (counts[consequent] / transactions)
+                    if lift < self.min_lift:
+                        continue
+                    rules.append(
+                        {
+                            "antecedent": json.dumps(list(antecedent)),
+                            "consequent": json.dumps(list(consequent)),
+                            "support": count / transactions,
+                            "confidence": confidence,
+                            "lift": lift,
+                        }
+                    )
+        return rules
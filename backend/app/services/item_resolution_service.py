@@ -0,0 +1,113 @@
+# backend/app/services/item_resolution_service.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.models import Item
+from app.services.search_service import (
+    catalog_match_clause,
+    catalog_rank_expression,
+    normalize_search_text,
+)
+
+MAX_CANDIDATES = 5
+MEMO_SIZE = 10_000
+
+
+class ResolutionCandidate(NamedTuple):
+    item_code: str
+    name: str
+    score: float
+
+
+class ResolutionMemo:
+    """Process-wide LRU of normalized name -> ranked catalog candidates.
+
+    Cleared after every price import, since new items can change the ranking.
+    """
+
+    def __init__(self, max_size: int = MEMO_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, List[ResolutionCandidate]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[ResolutionCandidate]]:
+        with self._lock:
+            candidates = self._entries.get(key)
+            if candidates is not None:
+                self._entries.move_to_end(key)
+            return candidates
+
+    def put(self, key: str, candidates: List[ResolutionCandidate]) -> None:
+        with self._lock:
+            self._entries[key] = candidates
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ItemResolutionService:
+    """Maps free-text shopping item names to ranked catalog items.
+
+    Matching runs on the trigram-indexed ``items.search_text`` column with the
+    same ranking as catalog search, once per distinct normalized name.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def candidates(
+        self, name: str, limit: int = MAX_CANDIDATES
+    ) -> List[ResolutionCandidate]:
+        """Best catalog matches for a name, most relevant first."""
+        key = normalize_search_text(name)
+        if not key:
+            return []
+
+        candidates = resolution_memo.get(key)
+        if candidates is None:
+            candidates = self._lookup(key)
+            resolution_memo.put(key, candidates)
+        return candidates[:limit]
+
+    def resolve_codes(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Best item code for each name (``None`` when nothing matches).
+
+        Meant to be called once per request with every uncoded name.
+        """
+        resolved = {}
+        for name in set(names):
+            matches = self.candidates(name, limit=1)
+            resolved[name] = matches[0].item_code if matches else None
+        return resolved
+
+    def _lookup(self, normalized_name: str) -> List[ResolutionCandidate]:
+        rank = catalog_rank_expression(normalized_name)
+        # Among equally relevant items prefer the closest whole name, so
+        # "milk 1" resolves to "milk 1" rather than "milk 10"
+        closeness = func.similarity(Item.normalized_name, normalized_name)
+        rows = (
+            self.db.query(Item.item_code, Item.name, rank.label("score"))
+            .filter(catalog_match_clause(normalized_name))
+            .order_by(desc(rank), desc(closeness), Item.id)
+            .limit(MAX_CANDIDATES)
+            .all()
+        )
+        return [
+            ResolutionCandidate(
+                item_code=row.item_code, name=row.name, score=float(row.score)
+            )
+            for row in rows
+        ]
+
+
+# Global instance
+resolution_memo = ResolutionMemo()
@@ -1,21 +1,73 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_, or_, text
+from sqlalchemy import func, desc, and_, or_, text, insert
 from datetime import datetime, timedelta, UTC
-from typing import List, Optional, Dict, Set
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import groupby
+from operator import attrgetter
+from typing import List, Optional, Dict, Set, Tuple
 import json
+import logging
 import math
-from mlxtend.frequent_patterns import apriori, association_rules
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import numpy as np
+from mlxtend.frequent_patterns import association_rules
 import pandas as pd
 
 from app.models import (
-    ShoppingListHistory,
+    PurchaseEvent,
     User,
-    ItemPrice,
-    Store,
-    Chain,
     AssociationRule,
 )
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.schemas import ItemPrediction, PredictionReason, PredictionsResponse
+from app.services.background_job import BackgroundJob
+from app.services.best_price_service import BestPriceService
+from app.services.household_features import (
+    HouseholdFeatureService,
+    ItemFeatureSet,
+)
+from app.services.replenishment import replenishment_scores
+from app.services.result_cache import ResultCache
+from app.services.rule_index import RuleIndex, merged_matching
+from app.services.transaction_matrix import build_transaction_matrix
+from app.services.rule_mining import mine_frequent_itemsets
+
+logger = logging.getLogger(__name__)
+
+# Decoded rule indexes keyed by owner (a household, or None for the global
+# rules) and a version of the owner's stored rules
+rule_index_cache = ResultCache("association rule index", settings.RULE_INDEX_CACHE_SIZE)
+
+
+@dataclass
+class MinedRules:
+    """Association rules as parallel arrays, cheap to pickle between
+    processes; antecedents and consequents are already JSON-encoded."""
+
+    antecedents: List[str]
+    consequents: List[str]
+    support: np.ndarray
+    confidence: np.ndarray
+    lift: np.ndarray
+
+    @classmethod
+    def from_frame(cls, rules: pd.DataFrame) -> "MinedRules":
+        return cls(
+            antecedents=[json.dumps(list(items)) for items in rules["antecedents"]],
+            consequents=[json.dumps(list(items)) for items in rules["consequents"]],
+            support=rules["support"].to_numpy(dtype=float),
+            confidence=rules["confidence"].to_numpy(dtype=float),
+            lift=rules["lift"].to_numpy(dtype=float),
+        )
+
+    def __len__(self) -> int:
+        return len(self.antecedents)
 
 
 class PredictionService:
@@ -26,7 +78,12 @@ class PredictionService:
         self.min_lift = 1.0  # Only rules with positive correlation
 
     def get_predictions(
-        self, user: User, shopping_list_id: Optional[int] = None, limit: int = 10
+        self,
+        user: User,
+        shopping_list_id: Optional[int] = None,
+        limit: int = 10,
+        user_lat: Optional[float] = None,
+        user_lon: Optional[float] = None,
     ) -> PredictionsResponse:
         """Generate item predictions using Apriori algorithm"""
 
@@ -51,27 +108,68 @@ class PredictionService:
             household_ids, existing_items, limit
         )
 
-        # If not enough predictions, generate rules on-the-fly
-        if len(predictions) < limit:
-            self._generate_association_rules(household_ids)
-            predictions = self._get_predictions_from_rules(
-                household_ids, existing_items, limit
-            )
+        # If not enough predictions, serve what exists and refresh the rules
+        # in the background; the next request picks them up
+        rules_refreshing = False
+        if len(predictions) < limit and household_ids:
+            rules_refreshing = rule_regeneration_queue.enqueue(household_ids)
 
-        # Add price information
-        for prediction in predictions:
-            if prediction.item_code:
-                price_info = self._get_best_price(prediction.item_code)
-                if price_info:
-                    prediction.current_price = price_info["price"]
-                    prediction.store_name = price_info["store_name"]
-                    prediction.chain_name = price_info["chain_name"]
+        predictions = predictions[:limit]
+        self._enrich_predictions(predictions, household_ids, user_lat, user_lon)
 
         return PredictionsResponse(
             shopping_list_id=shopping_list_id,
-            predictions=predictions[:limit],
+            predictions=predictions,
             generated_at=datetime.now(UTC),
+            rules_refreshing=rules_refreshing,
+        )
+
+    def _enrich_predictions(
+        self,
+        predictions: List[ItemPrediction],
+        household_ids: List[int],
+        user_lat: Optional[float],
+        user_lon: Optional[float],
+    ) -> None:
+        """Attach purchase history and best prices to the final predictions.
+
+        Runs one history aggregate and one best-price query however many
+        predictions there are. Predictions that already carry their history
+        (frequent items, counted by the query that found them) keep it.
+        """
+        item_infos = self._get_item_info_by_codes(
+            [
+                prediction.item_code
+                for prediction in predictions
+                if prediction.item_code and prediction.last_purchased is None
+            ],
+            household_ids,
         )
+        for prediction in predictions:
+            item_info = item_infos.get(prediction.item_code)
+            if item_info:
+                prediction.last_purchased = item_info["last_purchased"]
+                prediction.purchase_count = item_info["purchase_count"]
+                prediction.avg_quantity = item_info["avg_quantity"]
+                prediction.suggested_quantity = item_info["suggested_quantity"]
+
+        # Add price information, nearby stores first when a location is known
+        best_prices = BestPriceService(self.db).cheapest(
+            (
+                prediction.item_code
+                for prediction in predictions
+                if prediction.item_code
+            ),
+            user_lat,
+            user_lon,
+        )
+        for prediction in predictions:
+            best = best_prices.get(prediction.item_code)
+            if best:
+                prediction.current_price = best.price
+                prediction.store_name = best.store_name
+                prediction.chain_name = best.chain_name
+                prediction.store_distance_km = best.distance_km
 
     def _get_predictions_from_rules(
         self, household_ids: List[int], existing_items: Set[str], limit: int
@@ -101,126 +199,150 @@ class PredictionService:
                 item.item_code for item in items_with_codes if item.item_code
             }
 
-        # Get recent rules for these households - prioritize household-specific rules
+        # Only recent rules count - prioritize the most confident ones
         cutoff_date = datetime.now(UTC) - timedelta(days=7)
 
-        rules = (
-            self.db.query(AssociationRule)
-            .filter(
-                and_(
-                    or_(
-                        AssociationRule.household_id.in_(household_ids),
-                        AssociationRule.household_id.is_(None),  # Global rules
-                    ),
-                    AssociationRule.created_at >= cutoff_date,
-                    AssociationRule.confidence >= self.min_confidence,
+        # First matching rule (the most confident) per consequent item
+        candidates: Dict[str, Tuple[RuleIndex, int]] = {}
+        if existing_item_codes:
+            indexes = self._get_rule_indexes(household_ids)
+            for index, position in merged_matching(
+                indexes, existing_item_codes, cutoff_date
+            ):
+                for item_code in index.consequents[position]:
+                    if item_code not in existing_item_codes:
+                        candidates.setdefault(item_code, (index, position))
+
+        if candidates:
+            antecedent_codes = {
+                item_code
+                for index, position in candidates.values()
+                for item_code in index.antecedents[position]
+            }
+            names = self._get_item_names_by_code(set(candidates) | antecedent_codes)
+
+            # Only items still in the catalog are suggested
+            selected = [
+                (item_code, index, position)
+                for item_code, (index, position) in candidates.items()
+                if item_code in names
+            ][:limit]
+
+            for item_code, index, position in selected:
+                seen_item_codes.add(item_code)  # Mark as processed
+
+                # Names of antecedent items for display
+                antecedent_names = [
+                    names.get(code, code)
+                    for code in sorted(index.antecedents[position])
+                ]
+
+                predictions.append(
+                    ItemPrediction(
+                        item_code=item_code,
+                        item_name=names[item_code],
+                        confidence_score=index.confidence[position],
+                        reason=PredictionReason.APRIORI_ASSOCIATION,
+                        reason_detail=f"Frequently bought with {', '.join(antecedent_names)}",
+                        # Purchase history is attached by _enrich_predictions
+                        last_purchased=None,
+                        purchase_count=0,
+                        avg_quantity=1.0,
+                        suggested_quantity=1,
+                        current_price=None,
+                        store_name=None,
+                        chain_name=None,
+                    )
                 )
+
+        # Items due for a restock compete with rule predictions on confidence
+        features = HouseholdFeatureService(self.db).load(household_ids)
+        predictions.extend(
+            self._get_replenishment_predictions(
+                features, existing_items | existing_item_codes | seen_item_codes, limit
             )
-            .order_by(
-                # Prioritize household-specific rules over global rules
-                desc(AssociationRule.confidence),
-                desc(AssociationRule.lift),
-            )
-            .all()
         )
-
-        for rule in rules:
-            antecedent = set(json.loads(rule.antecedent))
-            consequent = set(json.loads(rule.consequent))
-
-            # Check if antecedent items are in current basket (by item code)
-            if existing_item_codes and antecedent.issubset(existing_item_codes):
-                for item_code in consequent:
-                    # Skip if already processed or in existing basket
-                    if (
-                        item_code not in existing_item_codes
-                        and item_code not in seen_item_codes
-                    ):
-                        # Get item details from catalog
-                        from app.models import Item
-
-                        catalog_item = (
-                            self.db.query(Item)
-                            .filter(Item.item_code == item_code)
-                            .first()
-                        )
-
-                        if catalog_item:
-                            seen_item_codes.add(item_code)  # Mark as processed
-
-                            # Get purchase history
-                            item_info = self._get_item_info_by_code(
-                                item_code, household_ids
-                            )
-
-                            # Get names of antecedent items for display
-                            antecedent_names = self._get_item_names(antecedent)
-
-                            predictions.append(
-                                ItemPrediction(
-                                    item_code=item_code,
-                                    item_name=catalog_item.name,
-                                    confidence_score=rule.confidence,
-                                    reason=PredictionReason.APRIORI_ASSOCIATION,
-                                    reason_detail=f"Frequently bought with {', '.join(antecedent_names)}",
-                                    last_purchased=item_info.get("last_purchased"),
-                                    purchase_count=item_info.get("purchase_count", 0),
-                                    avg_quantity=item_info.get("avg_quantity", 1.0),
-                                    suggested_quantity=item_info.get(
-                                        "suggested_quantity", 1
-                                    ),
-                                    current_price=None,
-                                    store_name=None,
-                                    chain_name=None,
-                                )
-                            )
+        predictions.sort(key=lambda prediction: -prediction.confidence_score)
+        predictions = predictions[:limit]
+        seen_item_codes = {prediction.item_code for prediction in predictions}
 
         # If no items in basket or not enough predictions, use most frequent items
         if len(predictions) < limit:
             frequent_predictions = self._get_frequent_items_predictions(
-                household_ids,
-                existing_items.union(seen_item_codes),
+                features,
+                existing_items | existing_item_codes | seen_item_codes,
                 limit - len(predictions),
             )
             predictions.extend(frequent_predictions)
 
         return predictions
 
+    def _rule_scope(self, household_ids: List[int]):
+        """Rules that apply to these households: their own and global ones"""
+        return and_(
+            or_(
+                AssociationRule.household_id.in_(household_ids),
+                AssociationRule.household_id.is_(None),  # Global rules
+            ),
+            AssociationRule.confidence >= self.min_confidence,
+        )
+
+    def _get_rule_indexes(self, household_ids: List[int]) -> List[RuleIndex]:
+        """Decoded rule indexes of the global rules and of each household,
+        each rebuilt only when its own rules change.
+
+        The global index is shared by every household. Rules are only ever
+        replaced by deleting and inserting rows, so the row count and the
+        highest id of an owner's rules move on every change.
+        """
+        versions = (
+            self.db.query(
+                AssociationRule.household_id,
+                func.count(AssociationRule.id),
+                func.max(AssociationRule.id),
+            )
+            .filter(self._rule_scope(household_ids))
+            .group_by(AssociationRule.household_id)
+            .all()
+        )
+        return [
+            rule_index_cache.get_or_compute(
+                (household_id, self.min_confidence, rule_count, last_rule_id),
+                lambda household_id=household_id: self._build_rule_index(household_id),
+            )
+            for household_id, rule_count, last_rule_id in versions
+        ]
+
+    def _build_rule_index(self, household_id: Optional[int]) -> RuleIndex:
+        owner = (
+            AssociationRule.household_id == household_id
+            if household_id is not None
+            else AssociationRule.household_id.is_(None)
+        )
+        return RuleIndex(
+            self.db.query(
+                AssociationRule.antecedent,
+                AssociationRule.consequent,
+                AssociationRule.confidence,
+                AssociationRule.lift,
+                AssociationRule.created_at,
+            )
+            .filter(owner, AssociationRule.confidence >= self.min_confidence)
+            .order_by(desc(AssociationRule.confidence), desc(AssociationRule.lift))
+            .yield_per(5000)
+        )
+
     def _generate_association_rules(self, household_ids: List[int]) -> None:
-        """Generate and store association rules using Apriori algorithm"""
+        """Generate and store association rules from frequent itemsets"""
 
         # Get transaction data from shopping list history
         transactions = self._get_transactions(household_ids)
 
-        # Convert to binary matrix for mlxtend
-        df = self._create_transaction_matrix(transactions)
-
-        if df.empty:
-            return
-
         try:
-            # Generate frequent itemsets
-            frequent_itemsets = apriori(
-                df,
-                min_support=self.min_support,
-                use_colnames=True,
-                max_len=3,  # Limit to 3-item sets for performance
-            )
-
-            if frequent_itemsets.empty:
+            rules = self._mine_rules(transactions)
+            if rules is None:
                 return
 
-            # Generate association rules
-            rules = association_rules(
-                frequent_itemsets,
-                metric="confidence",
-                min_threshold=self.min_confidence,
-                support_only=False,
-            )
-
-            # Filter by lift
-            rules = rules[rules["lift"] >= self.min_lift]
-
             # Store rules in database
             self._store_rules(
                 rules, household_ids[0] if len(household_ids) == 1 else None
@@ -230,32 +352,66 @@ class PredictionService:
             # Log error but don't fail
             print(f"Error generating association rules: {e}")
 
+    def _mine_rules(self, transactions: List[List[str]]) -> Optional["MinedRules"]:
+        """Mine association rules from transactions (no database access).
+
+        Returns None when there is nothing frequent enough to mine, so
+        existing rules are kept.
+        """
+        # Encode as a sparse binary matrix; items below min_support cannot
+        # appear in any frequent itemset
+        encoded = build_transaction_matrix(transactions).prune(self.min_support)
+
+        if encoded.empty:
+            return None
+
+        # Generate frequent itemsets with the configured engine
+        frequent_itemsets = mine_frequent_itemsets(
+            encoded,
+            min_support=self.min_support,
+            max_len=3,  # Limit to 3-item sets for performance
+            engine=settings.ASSOCIATION_MINING_ENGINE,
+        )
+
+        if frequent_itemsets.empty:
+            return None
+
+        # Generate association rules
+        rules = association_rules(
+            frequent_itemsets,
+            metric="confidence",
+            min_threshold=self.min_confidence,
+            support_only=False,
+        )
+
+        # Filter by lift
+        rules = rules[rules["lift"] >= self.min_lift]
+
+        return MinedRules.from_frame(rules)
+
     def _get_transactions(self, household_ids: List[int]) -> List[List[str]]:
-        """Get transaction data from shopping list history using item codes"""
+        """Get transaction data from purchase events using item codes"""
 
         # Get completed shopping lists from last 90 days
         since_date = datetime.now(UTC) - timedelta(days=90)
 
-        history_items = (
-            self.db.query(ShoppingListHistory)
+        events = (
+            self.db.query(PurchaseEvent.history_id, PurchaseEvent.item_code)
             .filter(
                 and_(
-                    ShoppingListHistory.household_id.in_(household_ids),
-                    ShoppingListHistory.completed_at >= since_date,
+                    PurchaseEvent.household_id.in_(household_ids),
+                    PurchaseEvent.completed_at >= since_date,
+                    PurchaseEvent.item_code.isnot(None),
                 )
             )
+            .order_by(PurchaseEvent.history_id)
             .all()
         )
 
         transactions = []
-        for history in history_items:
-            items_data = json.loads(history.items_data)
-            # Extract item codes from the history (only for items with codes)
-            transaction = [
-                item["item_code"]
-                for item in items_data
-                if item.get("is_purchased", True) and item.get("item_code")
-            ]
+        # One transaction per completed list (only items with codes)
+        for _, list_events in groupby(events, key=attrgetter("history_id")):
+            transaction = [event.item_code for event in list_events]
             if (
                 len(transaction) >= 2
             ):  # Only use transactions with at least 2 items with codes
@@ -263,24 +419,13 @@ class PredictionService:
 
         return transactions
 
-    def _create_transaction_matrix(self, transactions: List[List[str]]) -> pd.DataFrame:
-        """Convert transactions to binary matrix for Apriori"""
-
-        # Get all unique items
-        all_items = set()
-        for transaction in transactions:
-            all_items.update(transaction)
-
-        # Create binary matrix
-        data = []
-        for transaction in transactions:
-            row = {item: (item in transaction) for item in all_items}
-            data.append(row)
-
-        return pd.DataFrame(data).fillna(False)
-
-    def _store_rules(self, rules: pd.DataFrame, household_id: Optional[int]) -> None:
+    def _store_rules(self, rules: "MinedRules", household_id: Optional[int]) -> None:
         """Store association rules in database"""
+        self._replace_rules(rules, household_id)
+        self.db.commit()
+
+    def _replace_rules(self, rules: "MinedRules", household_id: Optional[int]) -> None:
+        """Swap a household's (or the global) rules, in the current transaction"""
 
         # Delete old rules for this household
         if household_id:
@@ -294,155 +439,128 @@ class PredictionService:
             ).delete()
 
         # Store new rules
-        for _, rule in rules.iterrows():
-            antecedent = list(rule["antecedents"])
-            consequent = list(rule["consequents"])
-
-            new_rule = AssociationRule(
-                antecedent=json.dumps(antecedent),
-                consequent=json.dumps(consequent),
-                support=float(rule["support"]),
-                confidence=float(rule["confidence"]),
-                lift=float(rule["lift"]),
-                household_id=household_id,
+        if len(rules):
+            self.db.execute(
+                insert(AssociationRule),
+                [
+                    {
+                        "antecedent": antecedent,
+                        "consequent": consequent,
+                        "support": support,
+                        "confidence": confidence,
+                        "lift": lift,
+                        "household_id": household_id,
+                    }
+                    for antecedent, consequent, support, confidence, lift in zip(
+                        rules.antecedents,
+                        rules.consequents,
+                        rules.support.tolist(),
+                        rules.confidence.tolist(),
+                        rules.lift.tolist(),
+                    )
+                ],
             )
-            self.db.add(new_rule)
-
-        self.db.commit()
 
-    def _get_frequent_items_predictions(
-        self, household_ids: List[int], existing_items: Set[str], limit: int
+    def _get_replenishment_predictions(
+        self, features: ItemFeatureSet, existing_items: Set[str], limit: int
     ) -> List[ItemPrediction]:
-        """Get predictions based on most frequently purchased items with item codes"""
+        """Get predictions for items the household's purchase cycle says are
+        running out"""
 
-        since_date = datetime.now(UTC) - timedelta(days=30)
-
-        # Query frequent items with item codes from history
-        frequent_items = self.db.execute(
-            text("""
-                SELECT 
-                    item->>'item_code' as item_code,
-                    item->>'name' as item_name,
-                    COUNT(*) as purchase_count,
-                    AVG(CAST(item->>'quantity' AS FLOAT)) as avg_quantity,
-                    MAX(completed_at) as last_purchased
-                FROM shopping_list_history,
-                    jsonb_array_elements(items_data::jsonb) as item
-                WHERE household_id IN :household_ids
-                AND completed_at >= :since_date
-                AND (item->>'is_purchased')::boolean = true
-                AND item->>'item_code' IS NOT NULL
-                GROUP BY item->>'item_code', item->>'name'
-                ORDER BY purchase_count DESC
-                LIMIT :limit
-            """),
-            {
-                "household_ids": tuple(household_ids),
-                "since_date": since_date,
-                "limit": limit * 2,
-            },
-        ).fetchall()
+        scores = replenishment_scores(features)
+        order = np.argsort(-scores, kind="stable")
 
         predictions = []
-        seen_item_codes = set()  # Track processed item codes for this method too
-
-        for row in frequent_items:
-            item_code = row[0]
-            item_name = row[1]
-
-            # Skip if item is already in basket or already processed
-            if (
-                item_name.lower() not in existing_items
-                and item_code not in seen_item_codes
-            ):
-                seen_item_codes.add(item_code)
-
-                # Base confidence on frequency
-                confidence = min(0.7, 0.3 + (row[2] * 0.05))  # row[2] is purchase_count
-
-                predictions.append(
-                    ItemPrediction(
-                        item_code=item_code,
-                        item_name=item_name,
-                        confidence_score=confidence,
-                        reason=PredictionReason.APRIORI_ASSOCIATION,
-                        reason_detail=f"Frequently purchased item (bought {row[2]} times recently)",
-                        last_purchased=row[4],  # last_purchased
-                        purchase_count=row[2],  # purchase_count
-                        avg_quantity=float(row[3]) if row[3] else 1.0,  # avg_quantity
-                        suggested_quantity=math.ceil(row[3]) if row[3] else 1,
-                        current_price=None,
-                        store_name=None,
-                        chain_name=None,
-                    )
+        for position in order:
+            score = float(scores[position])
+            if score <= 0:
+                break
+
+            item_code = features.item_codes[position]
+            item_name = features.item_names[position]
+
+            # Skip if item is already in basket
+            if item_name.lower() in existing_items or item_code in existing_items:
+                continue
+
+            cycle_days = features.mean_interval_days[position]
+            days_since = features.days_since_last[position]
+            avg_quantity = float(features.avg_quantity[position])
+            predictions.append(
+                ItemPrediction(
+                    item_code=item_code,
+                    item_name=item_name,
+                    confidence_score=score,
+                    reason=PredictionReason.REPLENISHMENT_CYCLE,
+                    reason_detail=f"Usually bought every {cycle_days:.0f} days, last bought {days_since:.0f} days ago",
+                    last_purchased=features.last_purchased[position],
+                    purchase_count=int(features.purchase_count[position]),
+                    avg_quantity=avg_quantity,
+                    suggested_quantity=max(math.ceil(avg_quantity), 1),
+                    current_price=None,
+                    store_name=None,
+                    chain_name=None,
                 )
+            )
 
-                if len(predictions) >= limit:
-                    break
+            if len(predictions) >= limit:
+                break
 
         return predictions
 
-    def _get_item_info(self, item_name: str, household_ids: List[int]) -> Dict:
-        """Get purchase history info for an item"""
-
-        result = self.db.execute(
-            text("""
-                SELECT 
-                    item->>'item_code' as item_code,
-                    COUNT(*) as purchase_count,
-                    AVG(CAST(item->>'quantity' AS FLOAT)) as avg_quantity,
-                    MAX(completed_at) as last_purchased
-                FROM shopping_list_history,
-                     jsonb_array_elements(items_data::jsonb) as item
-                WHERE household_id IN :household_ids
-                  AND LOWER(item->>'name') = :item_name
-                  AND (item->>'is_purchased')::boolean = true
-                GROUP BY item->>'item_code'
-                LIMIT 1
-            """),
-            {"household_ids": tuple(household_ids), "item_name": item_name.lower()},
-        ).first()
-
-        if result:
-            return {
-                "item_code": result.item_code,
-                "purchase_count": result.purchase_count,
-                "avg_quantity": float(result.avg_quantity)
-                if result.avg_quantity
-                else 1.0,
-                "suggested_quantity": math.ceil(result.avg_quantity)
-                if result.avg_quantity
-                else 1,
-                "last_purchased": result.last_purchased,
-            }
+    def _get_frequent_items_predictions(
+        self, features: ItemFeatureSet, existing_items: Set[str], limit: int
+    ) -> List[ItemPrediction]:
+        """Get predictions based on the most frequently and recently purchased
+        items with item codes"""
 
-        return {"purchase_count": 0, "avg_quantity": 1.0, "suggested_quantity": 1}
+        # Rank the households' items by recency-weighted purchase frequency
+        order = np.argsort(-features.recency_weight, kind="stable")
 
-    def _get_best_price(self, item_code: str) -> Optional[dict]:
-        """Get the best current price for an item"""
-        best_price = (
-            self.db.query(
-                ItemPrice.price,
-                Store.name.label("store_name"),
-                Chain.name.label("chain_name"),
+        predictions = []
+        for position in order:
+            item_code = features.item_codes[position]
+            item_name = features.item_names[position]
+
+            # Skip if item is already in basket
+            if item_name.lower() in existing_items or item_code in existing_items:
+                continue
+
+            # Base confidence on recent frequency
+            recency_weight = float(features.recency_weight[position])
+            purchase_count = int(features.purchase_count[position])
+            avg_quantity = float(features.avg_quantity[position])
+            predictions.append(
+                ItemPrediction(
+                    item_code=item_code,
+                    item_name=item_name,
+                    confidence_score=min(0.7, 0.3 + recency_weight * 0.05),
+                    reason=PredictionReason.APRIORI_ASSOCIATION,
+                    reason_detail=f"Frequently purchased item (bought {purchase_count} times)",
+                    last_purchased=features.last_purchased[position],
+                    purchase_count=purchase_count,
+                    avg_quantity=avg_quantity,
+                    suggested_quantity=max(math.ceil(avg_quantity), 1),
+                    current_price=None,
+                    store_name=None,
+                    chain_name=None,
+                )
             )
-            .join(Store, ItemPrice.store_id == Store.id)
-            .join(Chain, Store.chain_id == Chain.chain_id)
-            .filter(and_(ItemPrice.item_code == item_code, ItemPrice.item_status == 1))
-            .order_by(ItemPrice.price.asc())
-            .first()
-        )
 
-        if best_price:
-            return {
-                "price": best_price.price,
-                "store_name": best_price.store_name,
-                "chain_name": best_price.chain_name,
-            }
-        return None
+            if len(predictions) >= limit:
+                break
+
+        return predictions
 
     def generate_all_rules(self) -> Dict[str, int]:
-        """Generate association rules for all households - called by API endpoint"""
+        """Generate association rules for all households - called by API endpoint
+
+        Households are mined in parallel worker processes, each within
+        RULE_GENERATION_HOUSEHOLD_BUDGET_SECONDS; this process is the only
+        writer. The global pass runs in the pool alongside them within
+        RULE_GENERATION_GLOBAL_BUDGET_SECONDS, and its outcome is reported
+        apart from the households'.
+        """
 
         # Get all households
         households = self.db.execute(
@@ -455,63 +573,207 @@ class PredictionService:
             {"since_date": datetime.now(UTC) - timedelta(days=90)},
         ).fetchall()
 
-        total_rules = 0
-        households_processed = 0
-
-        for household in households:
-            self._generate_association_rules([household.household_id])
-            households_processed += 1
+        household_ids = [h.household_id for h in households]
+        stats = {
+            "households_processed": 0,
+            "households_failed": 0,
+            "households_timed_out": 0,
+            "global_failed": False,
+            "global_timed_out": False,
+            "total_rules_generated": 0,
+        }
+        if not household_ids:
+            return stats
+
+        workers = settings.RULE_GENERATION_WORKERS or os.cpu_count() or 1
+        budget = settings.RULE_GENERATION_HOUSEHOLD_BUDGET_SECONDS
+        global_budget = settings.RULE_GENERATION_GLOBAL_BUDGET_SECONDS
+        started = time.monotonic()
+        logger.info(
+            f"Generating rules for {len(household_ids)} households "
+            f"with {workers} workers"
+        )
 
-        # Also generate global rules using all data
-        all_household_ids = [h.household_id for h in households]
-        if all_household_ids:
-            self._generate_association_rules(all_household_ids)
+        # Workers come from a fork server rather than forking this process:
+        # a fork would copy the API's threads' locks and pooled connections
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_mining_context()
+        ) as pool:
+            # Global rules use all data, so start them first
+            futures = {
+                pool.submit(_mine_household_rules, household_ids, global_budget): None
+            }
+            for household_id in household_ids:
+                future = pool.submit(_mine_household_rules, [household_id], budget)
+                futures[future] = household_id
+
+            done = 0
+            for future in as_completed(futures):
+                household_id = futures[future]
+                done += 1
+                try:
+                    rules = future.result()
+                except TimeoutError:
+                    if household_id is None:
+                        stats["global_timed_out"] = True
+                        logger.warning(f"Global rule mining exceeded {global_budget}s")
+                    else:
+                        stats["households_timed_out"] += 1
+                        logger.warning(
+                            f"Rule mining for household {household_id} "
+                            f"exceeded {budget}s"
+                        )
+                    continue
+                except Exception as e:
+                    if household_id is None:
+                        stats["global_failed"] = True
+                        logger.error(f"Global rule mining failed: {e}")
+                    else:
+                        stats["households_failed"] += 1
+                        logger.error(
+                            f"Rule mining for household {household_id} failed: {e}"
+                        )
+                    continue
+
+                if rules is not None:
+                    self._replace_rules(rules, household_id)
+                    self.db.commit()
+                if household_id is not None:
+                    stats["households_processed"] += 1
+
+                if done % 100 == 0 or done == len(futures):
+                    logger.info(
+                        f"Rule generation progress: {done}/{len(futures)} "
+                        f"in {time.monotonic() - started:.1f}s"
+                    )
 
         # Count total rules generated
-        total_rules = self.db.query(func.count(AssociationRule.id)).scalar()
+        stats["total_rules_generated"] = self.db.query(
+            func.count(AssociationRule.id)
+        ).scalar()
 
-        return {
-            "households_processed": households_processed,
-            "total_rules_generated": total_rules,
-        }
+        return stats
 
-    def _get_item_info_by_code(self, item_code: str, household_ids: List[int]) -> Dict:
-        """Get purchase history info for an item by code"""
+    def _get_item_info_by_codes(
+        self, item_codes: List[str], household_ids: List[int]
+    ) -> Dict[str, Dict]:
+        """Get purchase history info for several items by code, in one lookup"""
+        if not item_codes or not household_ids:
+            return {}
 
-        result = self.db.execute(
-            text("""
-                SELECT 
-                    COUNT(*) as purchase_count,
-                    AVG(CAST(item->>'quantity' AS FLOAT)) as avg_quantity,
-                    MAX(completed_at) as last_purchased
-                FROM shopping_list_history,
-                    jsonb_array_elements(items_data::jsonb) as item
-                WHERE household_id IN :household_ids
-                AND item->>'item_code' = :item_code
-                AND (item->>'is_purchased')::boolean = true
-                GROUP BY item->>'item_code'
-                LIMIT 1
-            """),
-            {"household_ids": tuple(household_ids), "item_code": item_code},
-        ).first()
-
-        if result:
-            return {
-                "purchase_count": result.purchase_count,
-                "avg_quantity": float(result.avg_quantity)
-                if result.avg_quantity
-                else 1.0,
-                "suggested_quantity": math.ceil(result.avg_quantity)
-                if result.avg_quantity
-                else 1,
-                "last_purchased": result.last_purchased,
+        features = HouseholdFeatureService(self.db).load(household_ids, item_codes)
+        return {
+            item_code: {
+                "purchase_count": int(features.purchase_count[position]),
+                "avg_quantity": float(features.avg_quantity[position]),
+                "suggested_quantity": max(
+                    math.ceil(features.avg_quantity[position]), 1
+                ),
+                "last_purchased": features.last_purchased[position],
             }
+            for position, item_code in enumerate(features.item_codes)
+        }
 
-        return {"purchase_count": 0, "avg_quantity": 1.0, "suggested_quantity": 1}
-
-    def _get_item_names(self, item_codes: Set[str]) -> List[str]:
-        """Get item names for a set of item codes"""
+    def _get_item_names_by_code(self, item_codes: Set[str]) -> Dict[str, str]:
+        """Catalog names of the given item codes; unknown codes are left out"""
         from app.models import Item
 
-        items = self.db.query(Item.name).filter(Item.item_code.in_(item_codes)).all()
-        return [item.name for item in items] if items else list(item_codes)
+        if not item_codes:
+            return {}
+        items = (
+            self.db.query(Item.item_code, Item.name)
+            .filter(Item.item_code.in_(item_codes))
+            .all()
+        )
+        return {item.item_code: item.name for item in items}
+
+
+def _mining_context() -> multiprocessing.context.BaseContext:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError()
+
+
+def _mine_household_rules(
+    household_ids: List[int], budget_seconds: Optional[float]
+) -> Optional[MinedRules]:
+    """Worker: load the households' transactions and mine them.
+
+    Raises TimeoutError when mining takes longer than ``budget_seconds``
+    (where the platform has SIGALRM).
+    """
+    timed = budget_seconds and hasattr(signal, "SIGALRM")
+    if timed:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, budget_seconds)
+
+    db = SessionLocal()
+    try:
+        service = PredictionService(db)
+        return service._mine_rules(service._get_transactions(household_ids))
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        db.close()
+
+
+class RuleRegenerationQueue:
+    """Regenerates household association rules off the request path.
+
+    Households are queued one by one, so each gets its own rules and the
+    global rule set is never written here. Each household is queued at most
+    once: requests arriving while it is pending or running share that run,
+    and a household that was just regenerated is not queued again until
+    the cooldown has passed.
+    """
+
+    def __init__(self, cooldown_minutes: int):
+        self.cooldown_seconds = cooldown_minutes * 60
+        self._lock = threading.Lock()
+        self._finished_at: Dict[int, float] = {}
+        self._job = BackgroundJob("rule-regeneration", self._regenerate)
+
+    def enqueue(self, household_ids: List[int]) -> bool:
+        """Queue a regeneration of each household; returns whether any is
+        pending or running."""
+        refreshing = False
+        for household_id in sorted(set(household_ids)):
+            if self._job.is_scheduled(household_id):
+                refreshing = True
+                continue
+
+            with self._lock:
+                finished_at = self._finished_at.get(household_id)
+                if (
+                    finished_at is not None
+                    and time.monotonic() - finished_at < self.cooldown_seconds
+                ):
+                    continue
+
+            self._job.schedule(household_id)
+            refreshing = True
+        return refreshing
+
+    def _regenerate(self, db: Session, household_id: int) -> None:
+        try:
+            PredictionService(db)._generate_association_rules([household_id])
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                # Households past their cooldown need no entry
+                self._finished_at = {
+                    other: finished_at
+                    for other, finished_at in self._finished_at.items()
+                    if now - finished_at < self.cooldown_seconds
+                }
+                self._finished_at[household_id] = now
+
+
+# Global instance
+rule_regeneration_queue = RuleRegenerationQueue(
+    settings.PREDICTION_RULES_REFRESH_COOLDOWN_MINUTES
+)
@@ -0,0 +1,195 @@
+# backend/app/services/price_index_service.py
+
+import logging
+import threading
+from datetime import date
+from typing import List, Optional
+
+import pandas as pd
+from sqlalchemy import desc, distinct, func, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Chain, ChainBasketIndex, ItemPrice, Store
+from app.schemas import ChainBasketIndexEntry
+from app.services.background_job import BackgroundJob
+from app.services.current_prices import latest_active_prices
+
+logger = logging.getLogger(__name__)
+
+# The default basket is chosen once per process: ranking every item by store
+# coverage scans all of item_prices, and a fixed basket keeps the daily index
+# values comparable. Rebuilding the index on demand re-selects it.
+_default_basket: Optional[List[str]] = None
+_default_basket_lock = threading.Lock()
+
+
+class PriceIndexService:
+    """Computes and reads the chain x city basket price index."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def basket_item_codes(self, refresh: bool = False) -> List[str]:
+        """The configured basket, or the most widely stocked items."""
+        if settings.PRICE_INDEX_BASKET_ITEM_CODES:
+            return sorted(set(settings.PRICE_INDEX_BASKET_ITEM_CODES))
+
+        global _default_basket
+        with _default_basket_lock:
+            if _default_basket is None or refresh:
+                _default_basket = self._most_stocked_item_codes()
+            return _default_basket
+
+    def _most_stocked_item_codes(self) -> List[str]:
+        store_count = func.count(distinct(ItemPrice.store_id))
+        rows = (
+            self.db.query(ItemPrice.item_code)
+            .filter(ItemPrice.item_status == 1)
+            .group_by(ItemPrice.item_code)
+            .order_by(desc(store_count), ItemPrice.item_code)
+            .limit(settings.PRICE_INDEX_DEFAULT_BASKET_SIZE)
+            .all()
+        )
+        return sorted(row.item_code for row in rows)
+
+    def build(self, day: Optional[date] = None, refresh_basket: bool = False) -> int:
+        """Recompute the index for ``day`` (today) from current prices.
+
+        One query loads the latest active price of every basket item at
+        every store; all aggregation happens in pandas.
+        """
+        day = day or date.today()
+        basket = self.basket_item_codes(refresh_basket)
+
+        self.db.query(ChainBasketIndex).filter(ChainBasketIndex.day == day).delete(
+            synchronize_session=False
+        )
+        if not basket:
+            self.db.commit()
+            return 0
+
+        rows = latest_active_prices(
+            self.db.query(
+                ItemPrice.item_code,
+                ItemPrice.store_id,
+                ItemPrice.price,
+                Store.chain_id,
+                Store.city,
+            )
+            .join(Store, Store.id == ItemPrice.store_id)
+            .filter(ItemPrice.item_code.in_(basket))
+        ).all()
+        if not rows:
+            self.db.commit()
+            return 0
+
+        prices = pd.DataFrame(
+            rows, columns=["item_code", "store_id", "price", "chain_id", "city"]
+        )
+        prices["city"] = prices["city"].fillna("").str.strip()
+
+        group = ["chain_id", "city"]
+        per_item = (
+            prices.groupby(group + ["item_code"])["price"]
+            .agg(["mean", "min"])
+            .reset_index()
+        )
+        index = per_item.groupby(group).agg(
+            items_priced=("item_code", "size"),
+            basket_cost=("mean", "sum"),
+            min_basket_cost=("min", "sum"),
+        )
+        index["store_count"] = prices.groupby(group)["store_id"].nunique()
+        index = index.reset_index()
+        index["basket_size"] = len(basket)
+        index["coverage"] = (index["items_priced"] / len(basket)).round(4)
+        index["basket_cost"] = index["basket_cost"].round(2)
+        index["min_basket_cost"] = index["min_basket_cost"].round(2)
+        index["day"] = day
+
+        records = index[
+            [
+                "day",
+                "chain_id",
+                "city",
+                "store_count",
+                "basket_size",
+                "items_priced",
+                "coverage",
+                "basket_cost",
+                "min_basket_cost",
+            ]
+        ].to_dict("records")
+        self.db.execute(insert(ChainBasketIndex), records)
+        self.db.commit()
+
+        logger.info(
+            f"Built price index for {day}: {len(records)} chain/city groups, "
+            f"basket of {len(basket)} items"
+        )
+        return len(records)
+
+    def get_index(
+        self,
+        day: Optional[date] = None,
+        chain_id: Optional[str] = None,
+        city: Optional[str] = None,
+        min_coverage: float = 0.0,
+    ) -> List[ChainBasketIndexEntry]:
+        """Stored index rows for ``day`` (latest computed day by default),
+        cheapest basket first.
+
+        Groups are ranked on their cost scaled to the whole basket, so a
+        group pricing only a few basket items does not look cheapest.
+        """
+        if day is None:
+            day = self.db.query(func.max(ChainBasketIndex.day)).scalar()
+            if day is None:
+                return []
+
+        full_basket_cost = (
+            ChainBasketIndex.basket_cost
+            * ChainBasketIndex.basket_size
+            / ChainBasketIndex.items_priced
+        ).label("full_basket_cost")
+        query = (
+            self.db.query(ChainBasketIndex, Chain.name, full_basket_cost)
+            .join(Chain, Chain.chain_id == ChainBasketIndex.chain_id)
+            .filter(
+                ChainBasketIndex.day == day,
+                ChainBasketIndex.coverage >= min_coverage,
+            )
+        )
+        if chain_id:
+            query = query.filter(ChainBasketIndex.chain_id == chain_id)
+        if city is not None:
+            query = query.filter(ChainBasketIndex.city == city.strip())
+
+        rows = query.order_by(full_basket_cost, ChainBasketIndex.chain_id).all()
+
+        return [
+            ChainBasketIndexEntry(
+                day=entry.day,
+                chain_id=entry.chain_id,
+                chain_name=chain_name,
+                city=entry.city or None,
+                store_count=entry.store_count,
+                basket_size=entry.basket_size,
+                items_priced=entry.items_priced,
+                coverage=entry.coverage,
+                basket_cost=entry.basket_cost,
+                min_basket_cost=entry.min_basket_cost,
+                full_basket_cost=round(full_cost, 2),
+            )
+            for entry, chain_name, full_cost in rows
+        ]
+
+
+def _build_price_index(db: Session, _key) -> None:
+    PriceIndexService(db).build()
+
+
+# Global instance: runs the index build in the background after imports;
+# imports that finish while a build is running trigger exactly one more
+price_index_job = BackgroundJob("price-index", _build_price_index)
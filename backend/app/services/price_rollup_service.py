@@ -0,0 +1,307 @@
+# backend/app/services/price_rollup_service.py
+
+from datetime import date, timedelta
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import Chain, ChainPriceDaily, ItemPrice, ItemPriceDaily, Store
+from app.schemas import ChainPriceTrend, PriceHistoryPoint
+
+DAY = "day"
+WEEK = "week"
+
+NO_GROUPING = "none"
+BY_CHAIN = "chain"
+BY_STORE = "store"
+
+ROLLUP_COLUMNS = ["day", "min_price", "max_price", "price_sum", "price_count"]
+
+
+class PriceRollupService:
+    """Maintains and queries the daily price rollup tables.
+
+    item_price_daily is built from item_prices, chain_price_daily from
+    item_price_daily; both are refreshed incrementally by the importer.
+
+    A price row is in effect from its price_update_date until the next row
+    of the same item and store, so every day it spans is rolled up, not just
+    the day it changed. Rows are carried forward to the day of the store's
+    latest import.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh_import(self, store: Store, changes: Iterable[Tuple[str, date]]) -> None:
+        """Bring both rollup levels up to date after a store's price file.
+
+        ``changes`` are the (item_code, price_update_date day) of the price
+        rows the file added or modified. Those items are recomputed from
+        their earliest change; every item of the store is carried forward
+        from the last rolled-up day to today. Runs in the caller's
+        transaction.
+        """
+        changes = list(changes)
+        changed_items = sorted({item_code for item_code, _ in changes})
+        changed_since = min((day for _, day in changes), default=None)
+
+        self.db.flush()
+        rolled_through = (
+            self.db.query(func.max(ItemPriceDaily.day))
+            .filter(ItemPriceDaily.store_id == store.id)
+            .scalar()
+        )
+        if rolled_through is None:
+            since = None
+        elif changed_since is None:
+            since = rolled_through + timedelta(days=1)
+        else:
+            since = min(changed_since, rolled_through + timedelta(days=1))
+
+        def window(rollup):
+            # The rows this import has to recompute
+            if rolled_through is None:
+                return literal(True)
+            stale = rollup.day > rolled_through
+            if changed_items:
+                stale |= rollup.item_code.in_(changed_items) & (
+                    rollup.day >= changed_since
+                )
+            return stale
+
+        self.db.query(ItemPriceDaily).filter(
+            ItemPriceDaily.store_id == store.id, window(ItemPriceDaily)
+        ).delete(synchronize_session=False)
+        self._insert_store_daily(ItemPrice.store_id == store.id, since, window)
+
+        self.db.query(ChainPriceDaily).filter(
+            ChainPriceDaily.chain_id == store.chain_id, window(ChainPriceDaily)
+        ).delete(synchronize_session=False)
+        self._insert_chain_daily(
+            (Store.chain_id == store.chain_id) & window(ItemPriceDaily)
+        )
+
+    def rebuild(self) -> int:
+        """Rebuild every rollup row from item_prices."""
+        self.db.query(ChainPriceDaily).delete(synchronize_session=False)
+        self.db.query(ItemPriceDaily).delete(synchronize_session=False)
+        inserted = self._insert_store_daily(literal(True))
+        self._insert_chain_daily(literal(True))
+        self.db.commit()
+        return inserted
+
+    def _insert_store_daily(
+        self,
+        condition,
+        since: Optional[date] = None,
+        window: Optional[Callable] = None,
+    ) -> int:
+        """Roll up, per (item, store, day), the active prices in effect that
+        day, for the price rows matching ``condition``.
+
+        Days before ``since`` are not generated; ``window`` further limits
+        which generated (item, day) rows are written.
+        """
+        next_change = func.lead(ItemPrice.price_update_date).over(
+            partition_by=(ItemPrice.item_code, ItemPrice.store_id),
+            order_by=ItemPrice.price_update_date,
+        )
+        periods = (
+            select(
+                ItemPrice.item_code,
+                ItemPrice.store_id,
+                ItemPrice.price,
+                ItemPrice.item_status,
+                cast(ItemPrice.price_update_date, Date).label("first_day"),
+                # A row replaced later the same day still counts for that day
+                cast(next_change - timedelta(microseconds=1), Date).label("last_day"),
+            )
+            .where(condition)
+            .subquery()
+        )
+
+        first_day = periods.c.first_day
+        if since is not None:
+            first_day = func.greatest(first_day, since)
+        last_day = func.coalesce(periods.c.last_day, date.today())
+        days = (
+            select(
+                periods.c.item_code,
+                periods.c.store_id,
+                periods.c.price,
+                cast(
+                    func.generate_series(first_day, last_day, timedelta(days=1)),
+                    Date,
+                ).label("day"),
+            )
+            .where(periods.c.item_status == 1)
+            .subquery()
+        )
+
+        aggregate = select(
+            days.c.item_code,
+            days.c.store_id,
+            days.c.day,
+            func.min(days.c.price),
+            func.max(days.c.price),
+            func.sum(days.c.price),
+            func.count(),
+        ).group_by(days.c.item_code, days.c.store_id, days.c.day)
+        if window is not None:
+            aggregate = aggregate.where(window(days.c))
+        statement = insert(ItemPriceDaily).from_select(
+            ["item_code", "store_id", *ROLLUP_COLUMNS], aggregate
+        )
+        return self.db.execute(statement).rowcount
+
+    def _insert_chain_daily(self, condition) -> int:
+        aggregate = (
+            select(
+                ItemPriceDaily.item_code,
+                Store.chain_id,
+                ItemPriceDaily.day,
+                func.min(ItemPriceDaily.min_price),
+                func.max(ItemPriceDaily.max_price),
+                func.sum(ItemPriceDaily.price_sum),
+                func.sum(ItemPriceDaily.price_count),
+            )
+            .join(Store, Store.id == ItemPriceDaily.store_id)
+            .where(condition)
+            .group_by(ItemPriceDaily.item_code, Store.chain_id, ItemPriceDaily.day)
+        )
+        statement = insert(ChainPriceDaily).from_select(
+            ["item_code", "chain_id", *ROLLUP_COLUMNS], aggregate
+        )
+        return self.db.execute(statement).rowcount
+
+    def item_history(
+        self,
+        item_code: str,
+        start: date,
+        end: date,
+        bucket: str = DAY,
+        group_by: str = NO_GROUPING,
+        chain_id: Optional[str] = None,
+        store_id: Optional[int] = None,
+    ) -> List[PriceHistoryPoint]:
+        """Min/avg/max price of an item per day or week, overall or per
+        chain / store.
+
+        Reads the chain-level rollup unless store detail is asked for.
+        """
+        if group_by == BY_STORE or store_id:
+            rollup = ItemPriceDaily
+        else:
+            rollup = ChainPriceDaily
+
+        if bucket == WEEK:
+            bucket_start = cast(func.date_trunc("week", rollup.day), Date)
+        else:
+            bucket_start = rollup.day
+
+        columns = [bucket_start.label("bucket_start")]
+        group_columns = [bucket_start]
+        if group_by == BY_CHAIN:
+            columns += [
+                Chain.chain_id.label("group_id"),
+                Chain.name.label("group_name"),
+            ]
+            group_columns += [Chain.chain_id, Chain.name]
+        elif group_by == BY_STORE:
+            columns += [
+                ItemPriceDaily.store_id.label("group_id"),
+                Store.name.label("group_name"),
+            ]
+            group_columns += [ItemPriceDaily.store_id, Store.name]
+
+        query = self.db.query(
+            *columns,
+            func.min(rollup.min_price).label("min_price"),
+            (func.sum(rollup.price_sum) / func.sum(rollup.price_count)).label(
+                "avg_price"
+            ),
+            func.max(rollup.max_price).label("max_price"),
+            func.sum(rollup.price_count).label("samples"),
+        )
+        if rollup is ItemPriceDaily:
+            query = query.join(Store, Store.id == ItemPriceDaily.store_id).join(
+                Chain, Chain.chain_id == Store.chain_id
+            )
+        else:
+            query = query.join(Chain, Chain.chain_id == ChainPriceDaily.chain_id)
+
+        query = query.filter(
+            rollup.item_code == item_code, rollup.day >= start, rollup.day <= end
+        )
+        if chain_id:
+            query = query.filter(Chain.chain_id == chain_id)
+        if store_id:
+            query = query.filter(ItemPriceDaily.store_id == store_id)
+
+        rows = query.group_by(*group_columns).order_by(*group_columns).all()
+
+        return [
+            PriceHistoryPoint(
+                bucket_start=row.bucket_start,
+                group_id=str(row.group_id) if group_by != NO_GROUPING else None,
+                group_name=row.group_name if group_by != NO_GROUPING else None,
+                min_price=row.min_price,
+                avg_price=round(float(row.avg_price), 2),
+                max_price=row.max_price,
+                samples=row.samples,
+            )
+            for row in rows
+        ]
+
+    def chain_trends(self, item_code: str, days: int = 90) -> List[ChainPriceTrend]:
+        """Per chain: average, range and how the daily average of the prices
+        in effect moved between the first and last day of the window on
+        which the chain had a price."""
+        since = date.today() - timedelta(days=days)
+        rows = (
+            self.db.query(ChainPriceDaily, Chain.name)
+            .join(Chain, Chain.chain_id == ChainPriceDaily.chain_id)
+            .filter(
+                ChainPriceDaily.item_code == item_code, ChainPriceDaily.day >= since
+            )
+            .order_by(ChainPriceDaily.chain_id, ChainPriceDaily.day)
+            .all()
+        )
+
+        by_chain = {}
+        for rollup, chain_name in rows:
+            by_chain.setdefault((rollup.chain_id, chain_name), []).append(rollup)
+
+        trends = []
+        for (chain_id, chain_name), chain_rows in by_chain.items():
+            first, last = chain_rows[0], chain_rows[-1]
+            first_avg = first.price_sum / first.price_count
+            last_avg = last.price_sum / last.price_count
+            trends.append(
+                ChainPriceTrend(
+                    chain_id=chain_id,
+                    chain_name=chain_name,
+                    avg_price=round(
+                        sum(row.price_sum for row in chain_rows)
+                        / sum(row.price_count for row in chain_rows),
+                        2,
+                    ),
+                    min_price=min(row.min_price for row in chain_rows),
+                    max_price=max(row.max_price for row in chain_rows),
+                    first_day=first.day,
+                    first_avg_price=round(first_avg, 2),
+                    last_day=last.day,
+                    last_avg_price=round(last_avg, 2),
+                    change_pct=(
+                        round((last_avg - first_avg) / first_avg * 100, 2)
+                        if first_avg
+                        else None
+                    ),
+                    days_observed=len(chain_rows),
+                )
+            )
+
+        trends.sort(key=lambda trend: trend.avg_price)
+        return trends
@@ -1,21 +1,83 @@
 # backend/app/services/price_service.py
 
+import hashlib
+import heapq
+import json
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
-
-from app.models import Chain, Store, Item, ItemPrice, ShoppingList
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+import numpy as np
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, desc
+
+from app.core.config import settings
+from app.models import Chain, Store, StorePriceStats, Item, ItemPrice, ShoppingList
+from app.services.basket_optimizer import AUTO, BasketSplitOptimizer
+from app.services.autocomplete_service import autocomplete_service
+from app.services.search_service import (
+    SearchService,
+    build_item_search_text,
+    normalize_search_text,
+)
+from app.services.result_cache import ResultCache
+from app.services.geo import haversine_km
+from app.services.price_rollup_service import PriceRollupService
+from app.services.price_index_service import price_index_job
+from app.services.best_price_service import BestPriceService
+from app.services.current_prices import latest_active_prices
+from app.services.store_stats_service import StoreStatsService
+from app.services.unit_price import normalize_unit_prices
+from app.services.item_resolution_service import (
+    ItemResolutionService,
+    resolution_memo,
+)
 from app.schemas import (
     ItemSearchParams,
     ItemWithPrice,
     PriceComparisonResponse,
+    BulkPriceLookupResponse,
     ShoppingListPriceComparison,
     ItemPriceBreakdown,
     StoreComparison,
+    BasketSplitResponse,
+    BasketSplitStore,
+    UnitPriceEquivalent,
 )
 
+# Similar-name items considered when ranking unit-price equivalents
+EQUIVALENT_CANDIDATES = 200
+
+# Shopping-list comparisons keyed by list contents, price snapshot and location
+comparison_cache = ResultCache(
+    "shopping-list comparison", settings.COMPARISON_CACHE_SIZE
+)
+# Location-independent per-store basket totals, keyed by list contents and
+# price snapshot; radius and position changes only re-filter these
+store_totals_cache = ResultCache(
+    "shopping-list store totals", settings.STORE_TOTALS_CACHE_SIZE
+)
+
+
+@dataclass
+class StoreBasketTotals:
+    """A list priced at every store that has active prices.
+
+    Rows of every array line up with ``stores``; columns of ``unit_prices``
+    line up with the list's items. Per-item breakdowns are only built for the
+    stores that are actually returned.
+    """
+
+    stores: List[Dict[str, Any]]
+    latitudes: np.ndarray  # nan when unknown
+    longitudes: np.ndarray
+    unit_prices: np.ndarray  # stores x items, nan where not sold
+    item_names: List[str]
+    quantities: np.ndarray
+    fallback_prices: np.ndarray  # the list item's own price, nan if none
+    total_prices: np.ndarray
+    available_counts: np.ndarray
+
 
 class PriceService:
     def __init__(self, db: Session):
@@ -115,6 +177,7 @@ class PriceService:
     ) -> Dict[str, int]:
         """Update database with data from government XML."""
         parsed_data = self.parse_xml_data(xml_content)
+        normalize_unit_prices(parsed_data["items"])
 
         # Create or update chain
         self._create_or_update_chain(
@@ -131,6 +194,7 @@ class PriceService:
         # Process items and prices
         items_created = 0
         prices_updated = 0
+        price_changes = []
 
         for item_data in parsed_data["items"]:
             # Create or update item
@@ -141,9 +205,23 @@ class PriceService:
                 # Update price
                 if self._update_item_price(item.item_code, store.id, item_data):
                     prices_updated += 1
+                    price_changes.append(
+                        (item.item_code, item_data["price_update_date"].date())
+                    )
 
+        StoreStatsService(self.db).refresh([store.id])
+        PriceRollupService(self.db).refresh_import(store, price_changes)
+        BestPriceService(self.db).refresh_store_items(
+            store, (item_code for item_code, _ in price_changes)
+        )
         self.db.commit()
 
+        # Pick up new items and popularity changes in type-ahead and
+        # name resolution
+        autocomplete_service.schedule_reload()
+        resolution_memo.clear()
+        price_index_job.schedule()
+
         return {
             "chains_processed": 1,
             "stores_processed": 1,
@@ -190,6 +268,11 @@ class PriceService:
 
     def _create_or_update_item(self, item_data: Dict[str, Any]) -> Optional[Item]:
         """Create or update item record."""
+        search_text = build_item_search_text(
+            item_data["name"],
+            item_data["manufacturer_name"],
+            item_data["manufacturer_description"],
+        )
         item = (
             self.db.query(Item).filter(Item.item_code == item_data["item_code"]).first()
         )
@@ -208,6 +291,8 @@ class PriceService:
                 is_weighted=item_data["is_weighted"],
                 qty_in_package=item_data["qty_in_package"],
                 allow_discount=item_data["allow_discount"],
+                normalized_name=normalize_search_text(item_data["name"]),
+                search_text=search_text,
             )
             self.db.add(item)
             self.db.flush()
@@ -223,6 +308,8 @@ class PriceService:
             item.is_weighted = item_data["is_weighted"]
             item.qty_in_package = item_data["qty_in_package"]
             item.allow_discount = item_data["allow_discount"]
+            item.normalized_name = normalize_search_text(item_data["name"])
+            item.search_text = search_text
             item.updated_at = func.now()
 
         return item
@@ -230,7 +317,10 @@ class PriceService:
     def _update_item_price(
         self, item_code: str, store_id: int, item_data: Dict[str, Any]
     ) -> bool:
-        """Update item price for specific store."""
+        """Update item price for specific store.
+
+        Returns whether a price row was added or any of its values changed.
+        """
         # Check if price already exists for this date
         existing_price = (
             self.db.query(ItemPrice)
@@ -245,9 +335,20 @@ class PriceService:
         )
 
         if existing_price:
+            if (
+                existing_price.price == item_data["price"]
+                and existing_price.unit_price == item_data["unit_price"]
+                and existing_price.normalized_unit == item_data.get("normalized_unit")
+                and existing_price.price_per_unit == item_data.get("price_per_unit")
+                and existing_price.item_status == item_data["item_status"]
+            ):
+                return False
+
             # Update existing price
             existing_price.price = item_data["price"]
             existing_price.unit_price = item_data["unit_price"]
+            existing_price.normalized_unit = item_data.get("normalized_unit")
+            existing_price.price_per_unit = item_data.get("price_per_unit")
             existing_price.item_status = item_data["item_status"]
             existing_price.updated_at = func.now()
             return True
@@ -258,84 +359,124 @@ class PriceService:
                 store_id=store_id,
                 price=item_data["price"],
                 unit_price=item_data["unit_price"],
+                normalized_unit=item_data.get("normalized_unit"),
+                price_per_unit=item_data.get("price_per_unit"),
                 item_status=item_data["item_status"],
                 price_update_date=item_data["price_update_date"],
             )
             self.db.add(new_price)
             return True
 
-    def search_items(self, params: ItemSearchParams) -> List[ItemWithPrice]:
-        """Search items with current prices, sorted by number of price entries (per item_code)."""
-
-        # Build query: join Item and ItemPrice so we can count price entries
-        query = (
-            self.db.query(Item, func.count(ItemPrice.id).label("price_count"))
-            .join(ItemPrice, Item.item_code == ItemPrice.item_code)
-            .filter(ItemPrice.item_status == 1)  # only active prices
-            .group_by(Item.id)
-        )
+    def rebuild_unit_prices(self, batch_size: int = 5000) -> int:
+        """Backfill normalized unit prices for prices imported before they
+        were computed at import time."""
+        updated = 0
+        last_id = 0
+
+        while True:
+            rows = (
+                self.db.query(ItemPrice, Item)
+                .join(Item, Item.item_code == ItemPrice.item_code)
+                .filter(ItemPrice.id > last_id)
+                .order_by(ItemPrice.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            batch = [
+                {
+                    "unit_qty": item.unit_qty,
+                    "unit_of_measure": item.unit_of_measure,
+                    "quantity": item.quantity,
+                    "qty_in_package": item.qty_in_package,
+                    "price": price.price,
+                }
+                for price, item in rows
+            ]
+            normalize_unit_prices(batch)
+            for (price, _), normalized in zip(rows, batch):
+                price.normalized_unit = normalized["normalized_unit"]
+                price.price_per_unit = normalized["price_per_unit"]
+
+            updated += len(rows)
+            last_id = rows[-1][0].id
+            self.db.commit()
+
+        return updated
+
+    def get_unit_price_equivalents(
+        self, item_code: str, limit: int = 10, chain_id: Optional[str] = None
+    ) -> Optional[List[UnitPriceEquivalent]]:
+        """Products similar to ``item_code`` sold in the same standard unit,
+        cheapest per kg / liter / unit first."""
+        item = self.db.query(Item).filter(Item.item_code == item_code).first()
+        if not item:
+            return None
 
-        # Apply filters
-        if params.query:
-            search_term = f"%{params.query}%"
-            query = query.filter(
-                or_(
-                    Item.name.ilike(search_term),
-                    Item.manufacturer_description.ilike(search_term),
-                    Item.manufacturer_name.ilike(search_term),
-                )
+        # Similar names via the trigram index; the item itself is included
+        # so callers can see where it ranks
+        similarity = func.similarity(Item.normalized_name, item.normalized_name)
+        candidates = (
+            self.db.query(Item)
+            .filter(
+                (Item.item_code == item_code)
+                | Item.search_text.op("%")(item.normalized_name)
             )
-        if params.chain_id:
-            query = query.filter(ItemPrice.chain_id == params.chain_id)
-        if params.store_id:
-            query = query.filter(ItemPrice.store_id == params.store_id)
-        if params.min_price is not None:
-            query = query.filter(ItemPrice.price >= params.min_price)
-        if params.max_price is not None:
-            query = query.filter(ItemPrice.price <= params.max_price)
-
-        # Sort by number of price entries (highest first)
-        query = query.order_by(func.count(ItemPrice.id).desc())
-
-        # Pagination
-        results = query.offset(params.offset).limit(params.limit).all()
-
-        result = []
-        for item, _ in results:
-            # Get latest price for each item
-            latest_price = (
-                self.db.query(ItemPrice)
-                .filter(
-                    ItemPrice.item_code == item.item_code, ItemPrice.item_status == 1
+            .order_by(desc(similarity))
+            .limit(EQUIVALENT_CANDIDATES)
+            .all()
+        )
+        candidate_codes = [candidate.item_code for candidate in candidates]
+
+        store_ids = None
+        if chain_id:
+            store_ids = [
+                store_id
+                for (store_id,) in self.db.query(Store.id).filter(
+                    Store.chain_id == chain_id
                 )
-                .order_by(desc(ItemPrice.price_update_date))
-                .first()
+            ]
+
+        best_prices: Dict[str, Any] = {}
+        store_counts: Dict[str, int] = {}
+        for row in self._get_current_prices(candidate_codes, store_ids):
+            if row.price_per_unit is None:
+                continue
+            store_counts[row.item_code] = store_counts.get(row.item_code, 0) + 1
+            best = best_prices.get(row.item_code)
+            if best is None or row.price_per_unit < best.price_per_unit:
+                best_prices[row.item_code] = row
+
+        # Only compare like with like: the unit the item itself is sold in
+        reference = best_prices.get(item_code)
+        if reference is None:
+            return []
+
+        equivalents = [
+            UnitPriceEquivalent(
+                item_code=candidate.item_code,
+                name=candidate.name,
+                manufacturer_name=candidate.manufacturer_name,
+                normalized_unit=best_prices[candidate.item_code].normalized_unit,
+                price_per_unit=best_prices[candidate.item_code].price_per_unit,
+                price=best_prices[candidate.item_code].price,
+                store_id=best_prices[candidate.item_code].store_id,
+                store_count=store_counts[candidate.item_code],
+                is_reference=candidate.item_code == item_code,
             )
+            for candidate in candidates
+            if candidate.item_code in best_prices
+            and best_prices[candidate.item_code].normalized_unit
+            == reference.normalized_unit
+        ]
+        equivalents.sort(key=lambda equivalent: equivalent.price_per_unit)
+        return equivalents[:limit]
 
-            item_with_price = ItemWithPrice(
-                id=item.id,
-                item_code=item.item_code,
-                item_type=item.item_type,
-                name=item.name,
-                manufacturer_name=item.manufacturer_name,
-                manufacture_country=item.manufacture_country,
-                manufacturer_description=item.manufacturer_description,
-                unit_qty=item.unit_qty,
-                quantity=item.quantity,
-                unit_of_measure=item.unit_of_measure,
-                is_weighted=item.is_weighted,
-                qty_in_package=item.qty_in_package,
-                allow_discount=item.allow_discount,
-                created_at=item.created_at,
-                updated_at=item.updated_at,
-                current_price=latest_price.price if latest_price else None,
-                price_update_date=latest_price.price_update_date
-                if latest_price
-                else None,
-            )
-            result.append(item_with_price)
-
-        return result
+    def search_items(self, params: ItemSearchParams) -> List[ItemWithPrice]:
+        """Search items with current prices, ranked by relevance then popularity."""
+        return SearchService(self.db).search_items(params)
 
     def get_price_comparison(self, item_code: str) -> Optional[PriceComparisonResponse]:
         """Get price comparison across all stores for an item."""
@@ -357,12 +498,45 @@ class PriceService:
 
         return PriceComparisonResponse(item=item, prices=prices, stores=stores)
 
+    def bulk_price_lookup(
+        self,
+        item_codes: List[str],
+        store_ids: Optional[List[int]] = None,
+        chain_ids: Optional[List[str]] = None,
+    ) -> BulkPriceLookupResponse:
+        """Latest active price of many items at many stores in one query."""
+        item_codes = list(dict.fromkeys(item_codes))
+        query = self.db.query(
+            ItemPrice.item_code,
+            ItemPrice.store_id,
+            ItemPrice.price,
+            ItemPrice.price_update_date,
+        ).filter(ItemPrice.item_code.in_(item_codes))
+        if store_ids:
+            query = query.filter(ItemPrice.store_id.in_(store_ids))
+        if chain_ids:
+            query = query.join(Store, Store.id == ItemPrice.store_id).filter(
+                Store.chain_id.in_(chain_ids)
+            )
+
+        rows = latest_active_prices(query).all()
+
+        found = {row.item_code for row in rows}
+        return BulkPriceLookupResponse(
+            item_codes=[row.item_code for row in rows],
+            store_ids=[row.store_id for row in rows],
+            prices=[row.price for row in rows],
+            price_update_dates=[row.price_update_date for row in rows],
+            missing_item_codes=[code for code in item_codes if code not in found],
+        )
+
     def compare_shopping_list_prices(
         self,
         shopping_list_id: int,
         user_lat: Optional[float] = None,
         user_lon: Optional[float] = None,
         radius_km: Optional[float] = None,
+        limit: int = 5,
     ) -> Optional[ShoppingListPriceComparison]:
         """Compare shopping list prices across all stores with optional location filtering"""
         # Get shopping list with items
@@ -375,180 +549,461 @@ class PriceService:
         if not shopping_list:
             return None
 
-        # Base query for stores with their chains
-        stores_query = self.db.query(Store).join(Chain)
+        # Nearby requests share a result; the comparison is computed for the
+        # rounded point so a cached entry is exact for its key
+        if user_lat is not None and user_lon is not None:
+            decimals = settings.COMPARISON_CACHE_LOCATION_DECIMALS
+            user_lat, user_lon = round(user_lat, decimals), round(user_lon, decimals)
+
+        key = (
+            shopping_list.id,
+            self._list_content_version(shopping_list),
+            self._price_snapshot_version(),
+            user_lat,
+            user_lon,
+            radius_km,
+            limit,
+        )
+        return comparison_cache.get_or_compute(
+            key,
+            lambda: self._compute_list_comparison(
+                shopping_list, user_lat, user_lon, radius_km, limit
+            ),
+        )
 
-        # Dictionary to store calculated distances
-        store_distances = {}
+    def stream_shopping_list_comparison(
+        self,
+        shopping_list_id: int,
+        user_lat: Optional[float] = None,
+        user_lon: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[Iterator[str]]:
+        """Comparison as NDJSON lines: a summary line, then one line per store,
+        best first.
+
+        The ranking only needs the precomputed per-store totals, so it is
+        settled before the first byte is sent; each store's breakdown is built
+        as its line is written.
+        """
+        shopping_list = (
+            self.db.query(ShoppingList)
+            .filter(ShoppingList.id == shopping_list_id)
+            .first()
+        )
 
-        # Apply location filtering if coordinates provided
-        if user_lat is not None and user_lon is not None and radius_km is not None:
-            # Haversine formula in SQL to calculate distance in kilometers
-            distance_formula = 6371 * func.acos(
-                func.sin(func.radians(user_lat))
-                * func.sin(func.radians(Store.latitude))
-                + func.cos(func.radians(user_lat))
-                * func.cos(func.radians(Store.latitude))
-                * func.cos(func.radians(Store.longitude) - func.radians(user_lon))
-            )
+        if not shopping_list:
+            return None
 
-            # Add distance as a column in the query
-            stores_query = (
-                stores_query.add_columns(distance_formula.label("distance"))
-                .filter(
-                    Store.latitude.isnot(None),
-                    Store.longitude.isnot(None),
-                    distance_formula <= radius_km,
-                )
-                .order_by(distance_formula)
-            )  # Sort by distance (closest first)
+        totals = self._get_store_totals(shopping_list)
+        ranked = self._rank_stores(totals, user_lat, user_lon, radius_km, limit)
+        summary = {
+            "type": "summary",
+            "shopping_list_id": shopping_list.id,
+            "shopping_list_name": shopping_list.name,
+            "total_items": len(shopping_list.items),
+            "compared_items": len(
+                [item for item in shopping_list.items if not item.is_purchased]
+            ),
+            "store_count": len(ranked),
+        }
 
-            # Execute query and extract stores with distances
-            stores_with_distance = stores_query.all()
-            stores = [store for store, distance in stores_with_distance]
+        def lines() -> Iterator[str]:
+            yield json.dumps(summary, ensure_ascii=False) + "\n"
+            for index, distance_km in ranked:
+                comparison = self._build_store_comparison(totals, index, distance_km)
+                yield (
+                    json.dumps(
+                        {"type": "store", **comparison.model_dump()},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
 
-            # Store distances for later use
-            for store, distance in stores_with_distance:
-                store_distances[store.id] = round(distance, 2)
-        else:
-            # No location filtering - get stores normally
-            stores = stores_query.all()
-
-        # Filter stores that have any price data
-        stores_with_prices = []
-        for store in stores:
-            price_count = (
-                self.db.query(ItemPrice)
-                .filter(ItemPrice.store_id == store.id, ItemPrice.item_status == 1)
-                .count()
+        return lines()
+
+    def _list_content_version(self, shopping_list: ShoppingList) -> str:
+        """Hash of everything about the list's items that affects pricing."""
+        content = sorted(
+            (
+                item.id,
+                item.item_code or "",
+                item.name,
+                item.quantity,
+                item.price,
+                item.is_purchased,
             )
-            if price_count > 0:
-                stores_with_prices.append(store)
-
-        store_comparisons = []
-
-        for store in stores_with_prices:
-            total_price = 0.0
-            available_items = 0
-            missing_items = []
-            items_breakdown = []
-
-            for item in shopping_list.items:
-                if item.item_code:
-                    # Try to find price by item code
-                    price_info = (
-                        self.db.query(ItemPrice)
-                        .filter(
-                            ItemPrice.item_code == item.item_code,
-                            ItemPrice.store_id == store.id,
-                            ItemPrice.item_status == 1,
-                        )
-                        .first()
-                    )
-                else:
-                    # Fallback to name search if no item code
-                    catalog_item = (
-                        self.db.query(Item)
-                        .filter(Item.name.ilike(f"%{item.name}%"))
-                        .first()
-                    )
+            for item in shopping_list.items
+        )
+        return hashlib.sha1(repr(content).encode("utf-8")).hexdigest()
+
+    def _price_snapshot_version(self) -> tuple:
+        """Changes whenever an import refreshes any store's price stats, or
+        a store directory import adds stores or updates their names and
+        locations."""
+        last_refresh, priced_stores = self.db.query(
+            func.max(StorePriceStats.updated_at), func.count(StorePriceStats.store_id)
+        ).one()
+        last_store_update, store_count = self.db.query(
+            func.max(Store.updated_at), func.count(Store.id)
+        ).one()
+        return (
+            last_refresh.isoformat() if last_refresh else None,
+            priced_stores,
+            last_store_update.isoformat() if last_store_update else None,
+            store_count,
+        )
 
-                    price_info = None
-                    if catalog_item:
-                        price_info = (
-                            self.db.query(ItemPrice)
-                            .filter(
-                                ItemPrice.item_code == catalog_item.item_code,
-                                ItemPrice.store_id == store.id,
-                                ItemPrice.item_status == 1,
-                            )
-                            .first()
-                        )
+    def _compute_list_comparison(
+        self,
+        shopping_list: ShoppingList,
+        user_lat: Optional[float],
+        user_lon: Optional[float],
+        radius_km: Optional[float],
+        limit: int,
+    ) -> ShoppingListPriceComparison:
+        totals = self._get_store_totals(shopping_list)
+        ranked = self._rank_stores(totals, user_lat, user_lon, radius_km, limit)
 
-                if price_info:
-                    item_total = price_info.price * item.quantity
-                    total_price += item_total
-                    available_items += 1
+        return ShoppingListPriceComparison(
+            shopping_list_id=shopping_list.id,
+            shopping_list_name=shopping_list.name,
+            total_items=len(shopping_list.items),
+            compared_items=len(
+                [item for item in shopping_list.items if not item.is_purchased]
+            ),
+            store_comparisons=[
+                self._build_store_comparison(totals, index, distance_km)
+                for index, distance_km in ranked
+            ],
+        )
+
+    def _get_store_totals(self, shopping_list: ShoppingList) -> StoreBasketTotals:
+        """Per-store totals don't depend on the user's position, so they are
+        cached per list version and price snapshot."""
+        key = (
+            shopping_list.id,
+            self._list_content_version(shopping_list),
+            self._price_snapshot_version(),
+        )
+        return store_totals_cache.get_or_compute(
+            key, lambda: self._compute_store_totals(shopping_list)
+        )
 
+    def _rank_stores(
+        self,
+        totals: StoreBasketTotals,
+        user_lat: Optional[float],
+        user_lon: Optional[float],
+        radius_km: Optional[float],
+        limit: Optional[int],
+    ) -> List[Tuple[int, Optional[float]]]:
+        """Filter stores by radius and order them best first.
+
+        Multi-criteria sorting:
+        1. Most available items (descending)
+        2. Lowest total price (ascending)
+        3. Closest distance (ascending, None values last)
+
+        Returns (store row, distance) pairs. With a ``limit`` only that many
+        winners are selected, through a bounded heap.
+        """
+        candidates = np.arange(len(totals.stores))
+        distances = np.full(len(totals.stores), np.inf)
+        located = False
+        if user_lat is not None and user_lon is not None and radius_km is not None:
+            # Stores without coordinates get nan and never pass the filter
+            distances = haversine_km(
+                user_lat, user_lon, totals.latitudes, totals.longitudes
+            )
+            candidates = np.flatnonzero(distances <= radius_km)
+            located = True
+
+        available = totals.available_counts
+        total_prices = totals.total_prices
+        if limit is not None and limit < len(candidates):
+            order = heapq.nsmallest(
+                limit,
+                candidates.tolist(),
+                key=lambda row: (-available[row], total_prices[row], distances[row]),
+            )
+        else:
+            order = candidates[
+                np.lexsort(
+                    (
+                        distances[candidates],
+                        total_prices[candidates],
+                        -available[candidates],
+                    )
+                )
+            ].tolist()
+
+        return [
+            (row, round(float(distances[row]), 2) if located else None) for row in order
+        ]
+
+    def _build_store_comparison(
+        self, totals: StoreBasketTotals, row: int, distance_km: Optional[float]
+    ) -> StoreComparison:
+        missing_items = []
+        items_breakdown = []
+
+        for column, item_name in enumerate(totals.item_names):
+            quantity = float(totals.quantities[column])
+            price = totals.unit_prices[row, column]
+            fallback_price = totals.fallback_prices[column]
+
+            if not np.isnan(price):
+                items_breakdown.append(
+                    ItemPriceBreakdown(
+                        item_name=item_name,
+                        quantity=quantity,
+                        unit_price=float(price),
+                        total_price=float(price) * quantity,
+                        is_available=True,
+                    )
+                )
+            else:
+                missing_items.append(item_name)
+                # Use item's stored price if available
+                if not np.isnan(fallback_price):
                     items_breakdown.append(
                         ItemPriceBreakdown(
-                            item_name=item.name,
-                            quantity=item.quantity,
-                            unit_price=price_info.price,
-                            total_price=item_total,
-                            is_available=True,
+                            item_name=item_name,
+                            quantity=quantity,
+                            unit_price=float(fallback_price),
+                            total_price=float(fallback_price) * quantity,
+                            is_available=False,
                         )
                     )
                 else:
-                    missing_items.append(item.name)
-                    # Use item's stored price if available
-                    if item.price:
-                        item_total = item.price * item.quantity
-                        total_price += item_total
-
-                        items_breakdown.append(
-                            ItemPriceBreakdown(
-                                item_name=item.name,
-                                quantity=item.quantity,
-                                unit_price=item.price,
-                                total_price=item_total,
-                                is_available=False,
-                            )
-                        )
-                    else:
-                        items_breakdown.append(
-                            ItemPriceBreakdown(
-                                item_name=item.name,
-                                quantity=item.quantity,
-                                unit_price=None,
-                                total_price=None,
-                                is_available=False,
-                            )
+                    items_breakdown.append(
+                        ItemPriceBreakdown(
+                            item_name=item_name,
+                            quantity=quantity,
+                            unit_price=None,
+                            total_price=None,
+                            is_available=False,
                         )
+                    )
 
-            # Get distance for this store (if available)
-            distance_km = store_distances.get(store.id)
+        return StoreComparison(
+            **totals.stores[row],
+            total_price=float(totals.total_prices[row]),
+            available_items=int(totals.available_counts[row]),
+            missing_items=missing_items,
+            items_breakdown=items_breakdown,
+            distance_km=distance_km,
+        )
 
-            store_comparisons.append(
-                StoreComparison(
+    def _compute_store_totals(self, shopping_list: ShoppingList) -> StoreBasketTotals:
+        """Price the whole list at every store that has active prices."""
+        stores = (
+            self.db.query(Store)
+            .options(joinedload(Store.chain))
+            .join(StorePriceStats)
+            .filter(StorePriceStats.active_item_count > 0)
+            .order_by(Store.id)
+            .all()
+        )
+        list_items = list(shopping_list.items)
+
+        # Uncoded items are matched against the catalog once, not per store
+        resolved_codes = ItemResolutionService(self.db).resolve_codes(
+            item.name for item in list_items if not item.item_code
+        )
+        line_codes = [
+            item.item_code or resolved_codes.get(item.name) for item in list_items
+        ]
+        item_codes = sorted({code for code in line_codes if code})
+
+        store_rows = {store.id: row for row, store in enumerate(stores)}
+        code_columns: Dict[str, List[int]] = {}
+        for column, code in enumerate(line_codes):
+            if code:
+                code_columns.setdefault(code, []).append(column)
+
+        unit_prices = np.full((len(stores), len(list_items)), np.nan)
+        for price_row in self._get_current_prices(item_codes) if item_codes else []:
+            store_row = store_rows.get(price_row.store_id)
+            if store_row is not None:
+                unit_prices[store_row, code_columns[price_row.item_code]] = (
+                    price_row.price
+                )
+
+        quantities = np.array([item.quantity for item in list_items], dtype=float)
+        fallback_prices = np.array(
+            [item.price if item.price else np.nan for item in list_items], dtype=float
+        )
+
+        # Missing items count at the list item's own price when it has one
+        available = ~np.isnan(unit_prices)
+        fallback_costs = np.nan_to_num(fallback_prices * quantities)
+        line_costs = np.where(available, unit_prices * quantities, fallback_costs)
+
+        return StoreBasketTotals(
+            stores=[
+                {
+                    "store_id": store.id,
+                    "store_name": store.name or f"Store {store.store_id}",
+                    "chain_name": store.chain.name,
+                    "city": store.city,
+                }
+                for store in stores
+            ],
+            latitudes=np.array([store.latitude for store in stores], dtype=float),
+            longitudes=np.array([store.longitude for store in stores], dtype=float),
+            unit_prices=unit_prices,
+            item_names=[item.name for item in list_items],
+            quantities=quantities,
+            fallback_prices=fallback_prices,
+            total_prices=line_costs.sum(axis=1),
+            available_counts=available.sum(axis=1),
+        )
+
+    def _get_current_prices(
+        self, item_codes: List[str], store_ids: Optional[List[int]] = None
+    ) -> List[Any]:
+        """Latest active price per (item_code, store) for the given items."""
+        query = self.db.query(
+            ItemPrice.item_code,
+            ItemPrice.store_id,
+            ItemPrice.price,
+            ItemPrice.normalized_unit,
+            ItemPrice.price_per_unit,
+        ).filter(ItemPrice.item_code.in_(item_codes))
+        if store_ids is not None:
+            query = query.filter(ItemPrice.store_id.in_(store_ids))
+
+        return latest_active_prices(query).all()
+
+    def optimize_basket_split(
+        self,
+        shopping_list_id: int,
+        max_stores: int = 2,
+        extra_store_penalty: float = 0.0,
+        user_lat: Optional[float] = None,
+        user_lon: Optional[float] = None,
+        max_distance_km: Optional[float] = None,
+        mode: str = AUTO,
+    ) -> Optional[BasketSplitResponse]:
+        """Find the cheapest way to buy a shopping list across up to
+        ``max_stores`` stores, optionally only within ``max_distance_km``."""
+        shopping_list = (
+            self.db.query(ShoppingList)
+            .filter(ShoppingList.id == shopping_list_id)
+            .first()
+        )
+
+        if not shopping_list:
+            return None
+
+        list_items = list(shopping_list.items)
+        resolved_codes = ItemResolutionService(self.db).resolve_codes(
+            item.name for item in list_items if not item.item_code
+        )
+        line_codes = [
+            item.item_code or resolved_codes.get(item.name) for item in list_items
+        ]
+        item_codes = sorted({code for code in line_codes if code})
+        price_rows = self._get_current_prices(item_codes) if item_codes else []
+
+        # Candidate stores: anything selling at least one list item
+        stores = (
+            self.db.query(Store)
+            .options(joinedload(Store.chain))
+            .filter(Store.id.in_({row.store_id for row in price_rows}))
+            .order_by(Store.id)
+            .all()
+        )
+
+        store_distances = {}
+        if user_lat is not None and user_lon is not None:
+            located = [
+                s for s in stores if s.latitude is not None and s.longitude is not None
+            ]
+            distances = haversine_km(
+                user_lat,
+                user_lon,
+                np.array([s.latitude for s in located], dtype=float),
+                np.array([s.longitude for s in located], dtype=float),
+            )
+            store_distances = {
+                store.id: round(float(distance), 2)
+                for store, distance in zip(located, distances)
+            }
+            if max_distance_km is not None:
+                stores = [
+                    store
+                    for store in located
+                    if store_distances[store.id] <= max_distance_km
+                ]
+
+        # Dense stores x list-items price matrix (nan = not sold there)
+        store_rows = {store.id: row for row, store in enumerate(stores)}
+        code_columns: Dict[str, List[int]] = {}
+        for column, code in enumerate(line_codes):
+            if code:
+                code_columns.setdefault(code, []).append(column)
+
+        prices = np.full((len(stores), len(list_items)), np.nan)
+        for row in price_rows:
+            store_row = store_rows.get(row.store_id)
+            if store_row is not None:
+                prices[store_row, code_columns[row.item_code]] = row.price
+        quantities = np.array([item.quantity for item in list_items], dtype=float)
+
+        optimizer = BasketSplitOptimizer(
+            prices, quantities, max_stores, extra_store_penalty
+        )
+        solution = optimizer.solve(
+            mode, time_budget_ms=settings.BASKET_SPLIT_TIME_BUDGET_MS
+        )
+
+        split_stores = []
+        for store_row in solution.stores:
+            store = stores[store_row]
+            breakdown = [
+                ItemPriceBreakdown(
+                    item_name=item.name,
+                    quantity=item.quantity,
+                    unit_price=float(prices[store_row, column]),
+                    total_price=float(prices[store_row, column]) * item.quantity,
+                    is_available=True,
+                )
+                for column, item in enumerate(list_items)
+                if solution.assignment[column] == store_row
+            ]
+            split_stores.append(
+                BasketSplitStore(
                     store_id=store.id,
                     store_name=store.name or f"Store {store.store_id}",
                     chain_name=store.chain.name,
                     city=store.city,
-                    total_price=total_price,
-                    available_items=available_items,
-                    missing_items=missing_items,
-                    items_breakdown=items_breakdown,
-                    distance_km=distance_km,  # Add distance to response
+                    distance_km=store_distances.get(store.id),
+                    subtotal=sum(line.total_price for line in breakdown),
+                    items=breakdown,
                 )
             )
 
-        # Multi-criteria sorting:
-        # 1. Most available items (descending)
-        # 2. Lowest total price (ascending)
-        # 3. Closest distance (ascending, None values last)
-        def sort_key(store_comparison):
-            return (
-                -store_comparison.available_items,  # Negative for descending (most items first)
-                store_comparison.total_price,  # Ascending (lowest price first)
-                store_comparison.distance_km
-                if store_comparison.distance_km is not None
-                else float("inf"),  # Ascending distance, None last
-            )
-
-        store_comparisons.sort(key=sort_key)
+        penalty_total = extra_store_penalty * max(len(split_stores) - 1, 0)
 
-        # Limit to top 5 stores after sorting
-        store_comparisons = store_comparisons[:5]
-
-        return ShoppingListPriceComparison(
+        return BasketSplitResponse(
             shopping_list_id=shopping_list.id,
             shopping_list_name=shopping_list.name,
-            total_items=len(shopping_list.items),
-            compared_items=len(
-                [item for item in shopping_list.items if not item.is_purchased]
-            ),
-            store_comparisons=store_comparisons,
+            mode=solution.mode,
+            is_optimal=solution.is_optimal,
+            total_price=solution.total_price,
+            extra_store_penalty=extra_store_penalty,
+            objective=solution.total_price + penalty_total,
+            stores=split_stores,
+            missing_items=[
+                item.name
+                for column, item in enumerate(list_items)
+                if solution.assignment[column] < 0
+            ],
+            candidate_stores=len(stores),
+            computation_ms=round(solution.elapsed_ms, 2),
         )
 
     def _create_or_update_store_with_location(
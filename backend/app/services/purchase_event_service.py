@@ -0,0 +1,95 @@
+# backend/app/services/purchase_event_service.py
+
+import json
+import logging
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import PurchaseEvent, ShoppingListHistory
+from app.services.household_features import HouseholdFeatureService
+from app.services.search_service import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 5000
+
+
+def purchase_event_rows(
+    history_id: int,
+    household_id: int,
+    completed_at: datetime,
+    items_data: List[dict],
+) -> List[dict]:
+    """Event rows for the purchased items of one completed list."""
+    return [
+        {
+            "history_id": history_id,
+            "household_id": household_id,
+            "item_code": item.get("item_code") or None,
+            "item_name": item["name"],
+            "normalized_name": normalize_search_text(item["name"]),
+            "quantity": item.get("quantity") or 1,
+            "price": item.get("price"),
+            "completed_at": completed_at,
+        }
+        for item in items_data
+        if item.get("is_purchased", True) and item.get("name")
+    ]
+
+
+class PurchaseEventService:
+    """Keeps purchase_events in step with shopping list history."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, history: ShoppingListHistory, items_data: List[dict]) -> int:
+        """Add the events of a flushed history record and fold them into the
+        household item features, in the caller's transaction."""
+        rows = purchase_event_rows(
+            history.id, history.household_id, history.completed_at, items_data
+        )
+        if rows:
+            self.db.execute(insert(PurchaseEvent), rows)
+            HouseholdFeatureService(self.db).record(rows)
+        return len(rows)
+
+    def backfill(self) -> int:
+        """Rebuild every event, and the features derived from them, from
+        shopping history."""
+        self.db.query(PurchaseEvent).delete(synchronize_session=False)
+
+        history = self.db.query(
+            ShoppingListHistory.id,
+            ShoppingListHistory.household_id,
+            ShoppingListHistory.completed_at,
+            ShoppingListHistory.items_data,
+        ).yield_per(1000)
+
+        written = 0
+        rows = []
+        for record in history:
+            rows.extend(
+                purchase_event_rows(
+                    record.id,
+                    record.household_id,
+                    record.completed_at,
+                    json.loads(record.items_data),
+                )
+            )
+            if len(rows) >= INSERT_BATCH_SIZE:
+                self.db.execute(insert(PurchaseEvent), rows)
+                written += len(rows)
+                rows = []
+        if rows:
+            self.db.execute(insert(PurchaseEvent), rows)
+            written += len(rows)
+
+        self.db.commit()
+        logger.info(f"Backfilled {written} purchase events")
+
+        HouseholdFeatureService(self.db).rebuild()
+        return written
@@ -0,0 +1,38 @@
+# backend/app/services/replenishment.py
+
+import numpy as np
+
+from app.services.household_features import ItemFeatureSet
+
+# A purchase cycle needs at least two intervals before it is trusted
+MIN_PURCHASES = 3
+# Items scoring below this are not suggested
+MIN_SCORE = 0.3
+
+
+def replenishment_scores(features: ItemFeatureSet) -> np.ndarray:
+    """Score every item by how due it is for repurchase, in [0, 1); items
+    that should not be suggested score 0.
+
+    ``due`` is the days since the last purchase over the item's mean
+    purchase interval. An item scores nothing before half its cycle, is
+    fully due at one cycle, and fades after two cycles (the household has
+    likely stopped buying it). Multiplying by n / (n + 2), n being the
+    number of intervals, discounts cycles estimated from few purchases.
+    """
+    cycle = features.mean_interval_days
+    known = (
+        (features.purchase_count >= MIN_PURCHASES) & np.isfinite(cycle) & (cycle > 0)
+    )
+    due = np.divide(
+        features.days_since_last, cycle, out=np.zeros(len(features)), where=known
+    )
+
+    readiness = np.clip((due - 0.5) / 0.5, 0.0, 1.0)
+    staleness = np.exp(-np.maximum(due - 2.0, 0.0))
+    intervals = features.purchase_count - 1
+    certainty = intervals / (intervals + 2.0)
+
+    scores = np.where(known, readiness * staleness * certainty, 0.0)
+    scores[scores < MIN_SCORE] = 0.0
+    return scores
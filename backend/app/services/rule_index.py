@@ -0,0 +1,97 @@
+# backend/app/services/rule_index.py
+
+import heapq
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class RuleIndex:
+    """Association rules of one household, or the global rules, decoded once
+    and indexed by antecedent item.
+
+    Every item that appears in an antecedent gets one bit; a rule's
+    antecedent is the OR of its items' bits. A rule applies to a basket when
+    its antecedent mask has no bit outside the basket mask, so matching is
+    an integer AND per candidate rule instead of JSON decoding and set
+    operations per stored rule. Only rules listed under a basket item are
+    candidates at all.
+    """
+
+    def __init__(self, rules: Iterable):
+        """``rules`` are AssociationRule rows in priority order (highest
+        confidence, then lift, first)."""
+        self.antecedents: List[Tuple[str, ...]] = []
+        self.consequents: List[Tuple[str, ...]] = []
+        self.confidence: List[float] = []
+        self.lift: List[float] = []
+        self.created_at: List[datetime] = []
+        self._masks: List[int] = []
+        self._bits: Dict[str, int] = {}
+        self._rules_by_item: Dict[int, List[int]] = defaultdict(list)
+
+        for position, rule in enumerate(rules):
+            antecedent = tuple(json.loads(rule.antecedent))
+            mask = 0
+            for item_code in antecedent:
+                bit = self._bits.setdefault(item_code, 1 << len(self._bits))
+                mask |= bit
+            for item_code in set(antecedent):
+                self._rules_by_item[self._bits[item_code]].append(position)
+
+            self.antecedents.append(antecedent)
+            self.consequents.append(tuple(json.loads(rule.consequent)))
+            self.confidence.append(rule.confidence)
+            self.lift.append(rule.lift)
+            self.created_at.append(rule.created_at)
+            self._masks.append(mask)
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def matching(
+        self, basket_item_codes: Iterable[str], since: datetime
+    ) -> Iterator[int]:
+        """Positions of rules created since ``since`` whose whole antecedent
+        is in the basket, in priority order."""
+        basket_bits = [
+            self._bits[item_code]
+            for item_code in set(basket_item_codes)
+            if item_code in self._bits
+        ]
+        basket_mask = sum(basket_bits)
+
+        candidates = set()
+        for bit in basket_bits:
+            candidates.update(self._rules_by_item[bit])
+
+        for position in sorted(candidates):
+            if self._masks[position] & ~basket_mask:
+                continue
+            created_at = self.created_at[position]
+            if created_at is not None and created_at < since:
+                continue
+            yield position
+
+
+def _tagged_matches(
+    index: RuleIndex, basket_item_codes: Set[str], since: datetime
+) -> Iterator[Tuple[RuleIndex, int]]:
+    for position in index.matching(basket_item_codes, since):
+        yield index, position
+
+
+def merged_matching(
+    indexes: Iterable[RuleIndex], basket_item_codes: Iterable[str], since: datetime
+) -> Iterator[Tuple[RuleIndex, int]]:
+    """Matching rules of several indexes as (index, position), in priority
+    order across all of them."""
+    basket_item_codes = set(basket_item_codes)
+    return heapq.merge(
+        *(_tagged_matches(index, basket_item_codes, since) for index in indexes),
+        key=lambda match: (
+            -match[0].confidence[match[1]],
+            -match[0].lift[match[1]],
+        ),
+    )
@@ -0,0 +1,117 @@
+# backend/app/services/rule_mining.py
+
+import math
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import apriori, fpgrowth
+
+from app.services.transaction_matrix import TransactionMatrix
+
+APRIORI = "apriori"
+FPGROWTH = "fpgrowth"
+ECLAT = "eclat"
+
+# Set bits in every byte value, for counting packed bitsets
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _mine_apriori(
+    encoded: TransactionMatrix, min_support: float, max_len: int
+) -> pd.DataFrame:
+    # Score candidates one at a time; on sparse input mlxtend otherwise
+    # builds a dense transactions x candidates block
+    return apriori(
+        encoded.to_frame(),
+        min_support=min_support,
+        use_colnames=True,
+        max_len=max_len,
+        low_memory=True,
+    )
+
+
+def _mine_fpgrowth(
+    encoded: TransactionMatrix, min_support: float, max_len: int
+) -> pd.DataFrame:
+    return fpgrowth(
+        encoded.to_frame(),
+        min_support=min_support,
+        use_colnames=True,
+        max_len=max_len,
+    )
+
+
+def _mine_eclat(
+    encoded: TransactionMatrix, min_support: float, max_len: int
+) -> pd.DataFrame:
+    """Depth-first Eclat over packed transaction bitsets.
+
+    Each item's transactions are one bit row; the support of an itemset is
+    the popcount of the AND of its rows. Extending a prefix intersects its
+    bitset with every remaining candidate in one vectorized step.
+    """
+    transactions, items = encoded.matrix.shape
+    min_count = max(math.ceil(min_support * transactions - 1e-9), 1)
+
+    columns = encoded.matrix.tocsc()
+    bits = np.empty((items, (transactions + 7) // 8), dtype=np.uint8)
+    for item in range(items):
+        column = np.zeros(transactions, dtype=bool)
+        column[columns.indices[columns.indptr[item] : columns.indptr[item + 1]]] = True
+        bits[item] = np.packbits(column)
+
+    itemsets: List[frozenset] = []
+    counts: List[int] = []
+
+    def extend(prefix, candidates, candidate_bits):
+        support = _POPCOUNT[candidate_bits].sum(axis=1, dtype=np.int64)
+        frequent = support >= min_count
+        candidates, candidate_bits = candidates[frequent], candidate_bits[frequent]
+        for item, count in zip(candidates, support[frequent]):
+            itemsets.append(frozenset(prefix + [encoded.item_codes[item]]))
+            counts.append(int(count))
+
+        if len(prefix) + 1 >= max_len:
+            return
+        for position in range(len(candidates) - 1):
+            extend(
+                prefix + [encoded.item_codes[candidates[position]]],
+                candidates[position + 1 :],
+                candidate_bits[position] & candidate_bits[position + 1 :],
+            )
+
+    extend([], np.arange(items), bits)
+
+    return pd.DataFrame(
+        {
+            "support": np.array(counts, dtype=float) / max(transactions, 1),
+            "itemsets": itemsets,
+        }
+    )
+
+
+MINING_ENGINES: Dict[str, Callable[[TransactionMatrix, float, int], pd.DataFrame]] = {
+    APRIORI: _mine_apriori,
+    FPGROWTH: _mine_fpgrowth,
+    ECLAT: _mine_eclat,
+}
+
+
+def mine_frequent_itemsets(
+    encoded: TransactionMatrix,
+    min_support: float,
+    max_len: int = 3,
+    engine: str = APRIORI,
+) -> pd.DataFrame:
+    """Frequent itemsets as mlxtend's ``support`` / ``itemsets`` frame, so
+    every engine feeds ``association_rules`` the same way."""
+    if engine not in MINING_ENGINES:
+        raise ValueError(
+            f"Unknown mining engine '{engine}', expected one of "
+            f"{', '.join(MINING_ENGINES)}"
+        )
+    if encoded.empty:
+        return pd.DataFrame(columns=["support", "itemsets"])
+
+    return MINING_ENGINES[engine](encoded, min_support, max_len)
@@ -0,0 +1,198 @@
+# backend/app/services/search_service.py
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, desc, func, literal, or_, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import Item, ItemPrice, Store
+from app.schemas import ItemSearchParams, ItemWithPrice
+
+# Hebrew cantillation marks and niqqud points (maqaf, paseq and sof pasuq
+# are punctuation and are handled by the separator rule below)
+_NIQQUD_RE = re.compile(r"[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+# Final letter forms are folded to their regular form
+_FINAL_LETTERS = str.maketrans(
+    "\u05da\u05dd\u05df\u05e3\u05e5", "\u05db\u05de\u05e0\u05e4\u05e6"
+)
+# Geresh / gershayim (and their ASCII stand-ins) are dropped without a gap,
+# so that e.g. 'מע"מ' and 'מעמ' normalize to the same token
+_GERESH_RE = re.compile(r"[\"'`\u05F3\u05F4]")
+# Everything else that isn't a letter or digit separates tokens
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """Normalize Hebrew/Latin text for catalog search and matching."""
+    if not value:
+        return ""
+
+    value = _NIQQUD_RE.sub("", value)
+    value = value.lower().translate(_FINAL_LETTERS)
+    value = _GERESH_RE.sub("", value)
+    value = _SEPARATOR_RE.sub(" ", value)
+    return " ".join(value.split())
+
+
+def build_item_search_text(
+    name: Optional[str],
+    manufacturer_name: Optional[str] = None,
+    manufacturer_description: Optional[str] = None,
+) -> str:
+    """Build the normalized text that the catalog trigram index is built on."""
+    parts = [name, manufacturer_name, manufacturer_description]
+    return " ".join(p for p in (normalize_search_text(part) for part in parts) if p)
+
+
+def catalog_match_clause(normalized_query: str):
+    """Every token must appear in the item text, or the whole query must be
+    a close fuzzy match. Both branches are served by the trigram GIN index."""
+    token_clauses = [
+        Item.search_text.like(f"%{token}%") for token in normalized_query.split()
+    ]
+    return or_(
+        and_(*token_clauses),
+        Item.search_text.op("%")(normalized_query),
+    )
+
+
+def catalog_rank_expression(normalized_query: str):
+    """Relevance: name prefix > word prefix in name > trigram word similarity."""
+    prefix_bonus = case(
+        (Item.normalized_name.like(f"{normalized_query}%"), 2.0),
+        (Item.normalized_name.like(f"% {normalized_query}%"), 1.0),
+        else_=0.0,
+    )
+    return prefix_bonus + func.word_similarity(normalized_query, Item.search_text)
+
+
+class SearchService:
+    """Catalog search over the normalized, trigram-indexed item columns."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_items(self, params: ItemSearchParams) -> List[ItemWithPrice]:
+        """Search items with current prices, ranked by relevance then popularity."""
+        items, _ = self.search_items_page(params)
+        return items
+
+    def search_items_page(
+        self, params: ItemSearchParams, after: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[ItemWithPrice], Dict[str, Any]]:
+        """Search one page of items.
+
+        With ``after`` (the sort key of the previous page's last row) the page
+        is selected by keyset instead of OFFSET, so deep pages cost the same
+        as the first one and don't shift while imports add prices. Returns the
+        items and the sort key of the last row on this page.
+        """
+        price_count = func.count(ItemPrice.id)
+
+        normalized_query = normalize_search_text(params.query)
+        if normalized_query:
+            rank = catalog_rank_expression(normalized_query)
+        else:
+            rank = literal(0.0)
+
+        query = (
+            self.db.query(Item, rank.label("rank"), price_count.label("price_count"))
+            .join(ItemPrice, Item.item_code == ItemPrice.item_code)
+            .filter(ItemPrice.item_status == 1)  # only active prices
+            .group_by(Item.id)
+        )
+
+        if normalized_query:
+            query = query.filter(catalog_match_clause(normalized_query))
+        if params.chain_id:
+            query = query.join(Store, ItemPrice.store_id == Store.id).filter(
+                Store.chain_id == params.chain_id
+            )
+        if params.store_id:
+            query = query.filter(ItemPrice.store_id == params.store_id)
+        if params.min_price is not None:
+            query = query.filter(ItemPrice.price >= params.min_price)
+        if params.max_price is not None:
+            query = query.filter(ItemPrice.price <= params.max_price)
+
+        if normalized_query:
+            query = query.order_by(desc(rank))
+        query = query.order_by(desc(price_count), desc(Item.id))
+
+        if after:
+            query = query.having(
+                tuple_(rank, price_count, Item.id)
+                < tuple_(after["rank"], after["price_count"], after["id"])
+            )
+        else:
+            query = query.offset(params.offset)
+
+        results = query.limit(params.limit).all()
+
+        last_key = {}
+        if results:
+            last_item, last_rank, last_count = results[-1]
+            last_key = {
+                "rank": float(last_rank),
+                "price_count": last_count,
+                "id": last_item.id,
+            }
+
+        return [self._to_item_with_price(item) for item, _, _ in results], last_key
+
+    def _to_item_with_price(self, item: Item) -> ItemWithPrice:
+        # Get latest price for the item
+        latest_price = (
+            self.db.query(ItemPrice)
+            .filter(ItemPrice.item_code == item.item_code, ItemPrice.item_status == 1)
+            .order_by(desc(ItemPrice.price_update_date))
+            .first()
+        )
+
+        return ItemWithPrice(
+            id=item.id,
+            item_code=item.item_code,
+            item_type=item.item_type,
+            name=item.name,
+            manufacturer_name=item.manufacturer_name,
+            manufacture_country=item.manufacture_country,
+            manufacturer_description=item.manufacturer_description,
+            unit_qty=item.unit_qty,
+            quantity=item.quantity,
+            unit_of_measure=item.unit_of_measure,
+            is_weighted=item.is_weighted,
+            qty_in_package=item.qty_in_package,
+            allow_discount=item.allow_discount,
+            created_at=item.created_at,
+            updated_at=item.updated_at,
+            current_price=latest_price.price if latest_price else None,
+            price_update_date=latest_price.price_update_date if latest_price else None,
+        )
+
+    def rebuild_search_index(self, batch_size: int = 5000) -> int:
+        """Backfill the normalized search columns for the whole catalog."""
+        updated = 0
+        last_id = 0
+
+        while True:
+            items = (
+                self.db.query(Item)
+                .filter(Item.id > last_id)
+                .order_by(Item.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not items:
+                break
+
+            for item in items:
+                item.normalized_name = normalize_search_text(item.name)
+                item.search_text = build_item_search_text(
+                    item.name, item.manufacturer_name, item.manufacturer_description
+                )
+            updated += len(items)
+            last_id = items[-1].id
+            self.db.commit()
+
+        return updated
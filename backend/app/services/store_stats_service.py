@@ -0,0 +1,75 @@
+# backend/app/services/store_stats_service.py
+
+from typing import List, Optional
+
+from sqlalchemy import distinct, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Item, ItemPrice, StorePriceStats
+
+
+class StoreStatsService:
+    """Maintains the store_price_stats summary table."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, store_ids: Optional[List[int]] = None) -> int:
+        """Recompute stats for the given stores (all stores when omitted).
+
+        Runs in the caller's transaction; the importer calls this right
+        before committing a price file so readers never see stale counts.
+        """
+        # The aggregate below is plain SQL and must see pending price rows
+        self.db.flush()
+        catalog_size = self.db.query(func.count(Item.id)).scalar() or 0
+
+        active_items = func.count(distinct(ItemPrice.item_code)).filter(
+            ItemPrice.item_status == 1
+        )
+        aggregate = select(
+            ItemPrice.store_id,
+            active_items,
+            func.max(ItemPrice.price_update_date),
+        ).group_by(ItemPrice.store_id)
+        if store_ids is not None:
+            aggregate = aggregate.where(ItemPrice.store_id.in_(store_ids))
+
+        statement = insert(StorePriceStats).from_select(
+            [
+                "store_id",
+                "active_item_count",
+                "last_price_update",
+            ],
+            aggregate,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[StorePriceStats.store_id],
+            set_={
+                "active_item_count": statement.excluded.active_item_count,
+                "last_price_update": statement.excluded.last_price_update,
+                "updated_at": func.now(),
+            },
+        )
+        refreshed = self.db.execute(statement).rowcount
+
+        # Stores whose price rows are all gone drop out of the aggregate;
+        # their old stats must not linger
+        orphaned = self.db.query(StorePriceStats).filter(
+            ~exists().where(ItemPrice.store_id == StorePriceStats.store_id)
+        )
+        if store_ids is not None:
+            orphaned = orphaned.filter(StorePriceStats.store_id.in_(store_ids))
+        orphaned.delete(synchronize_session=False)
+
+        # A new catalog item changes every store's coverage, not just these
+        self.db.query(StorePriceStats).update(
+            {
+                StorePriceStats.price_coverage: StorePriceStats.active_item_count
+                / float(max(catalog_size, 1))
+            },
+            synchronize_session=False,
+        )
+
+        return refreshed
@@ -0,0 +1,85 @@
+# backend/app/services/transaction_matrix.py
+
+import warnings
+from dataclasses import dataclass
+from itertools import chain
+from typing import List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+@dataclass
+class TransactionMatrix:
+    """One-hot encoded transactions.
+
+    ``matrix`` is a boolean CSR matrix of transactions x items whose column j
+    is ``item_codes[j]``.
+    """
+
+    matrix: sparse.csr_matrix
+    item_codes: np.ndarray
+
+    @property
+    def empty(self) -> bool:
+        return self.matrix.shape[0] == 0 or self.matrix.shape[1] == 0
+
+    def item_support(self) -> np.ndarray:
+        """Share of transactions containing each item."""
+        if self.matrix.shape[0] == 0:
+            return np.zeros(self.matrix.shape[1])
+        counts = np.asarray(self.matrix.sum(axis=0)).ravel()
+        return counts / self.matrix.shape[0]
+
+    def prune(self, min_support: float) -> "TransactionMatrix":
+        """Drop items below ``min_support``; no itemset containing them can
+        be frequent, so mining results are unchanged."""
+        keep = np.flatnonzero(self.item_support() >= min_support)
+        return TransactionMatrix(self.matrix[:, keep], self.item_codes[keep])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Sparse boolean DataFrame in the shape mlxtend expects."""
+        # pandas warns that from_spmatrix gives bool columns a 0 fill value;
+        # 0 and False are the same to mlxtend
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            return pd.DataFrame.sparse.from_spmatrix(
+                self.matrix, columns=[str(code) for code in self.item_codes]
+            )
+
+
+def build_transaction_matrix(transactions: List[List[str]]) -> TransactionMatrix:
+    """Encode transactions in one vectorized pass.
+
+    Item codes are mapped to integer ids with a single hash pass; memory
+    is proportional to the number of (transaction, item) pairs, not to
+    transactions x distinct items.
+    """
+    lengths = np.fromiter(
+        (len(transaction) for transaction in transactions),
+        dtype=np.int64,
+        count=len(transactions),
+    )
+    flat = np.fromiter(
+        chain.from_iterable(transactions), dtype=object, count=int(lengths.sum())
+    )
+    if flat.size == 0:
+        return TransactionMatrix(
+            sparse.csr_matrix((len(transactions), 0), dtype=bool),
+            np.array([], dtype=object),
+        )
+
+    columns, item_codes = pd.factorize(flat)
+    rows = np.repeat(np.arange(len(transactions)), lengths)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(flat.size, dtype=np.int32), (rows, columns)),
+        shape=(len(transactions), len(item_codes)),
+    )
+    # An item listed twice in one transaction still counts once
+    matrix.sum_duplicates()
+    matrix.data = np.ones_like(matrix.data, dtype=bool)
+    matrix = matrix.astype(bool)
+
+    return TransactionMatrix(matrix, np.asarray(item_codes, dtype=object))
@@ -0,0 +1,103 @@
+# backend/app/services/unit_price.py
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.search_service import normalize_search_text
+
+# Standard units prices are normalized to
+KILOGRAM = "kg"
+LITER = "l"
+UNIT = "unit"
+
+# Normalized unit text -> (standard unit, multiplier to get there). Keys are
+# in normalize_search_text form, so quotes are gone ('ק"ג' -> 'קג') and final
+# letters are folded ('גרם' -> 'גרמ')
+UNIT_ALIASES = {
+    **dict.fromkeys(
+        ["גרמ", "גרמימ", "גר", "ג", "g", "gr", "gram", "grams"], (KILOGRAM, 0.001)
+    ),
+    **dict.fromkeys(
+        ["קג", "קילו", "קילוגרמ", "קילוגרמימ", "kg", "kilo", "kilogram"],
+        (KILOGRAM, 1.0),
+    ),
+    **dict.fromkeys(
+        ["מל", "מיליליטר", "מיליליטרימ", "ml", "milliliter", "millilitre"],
+        (LITER, 0.001),
+    ),
+    **dict.fromkeys(["ליטר", "ליטרימ", "ל", "l", "liter", "litre"], (LITER, 1.0)),
+    **dict.fromkeys(
+        ["יחידה", "יחידות", "יח", "unit", "units", "pcs", "מארז"], (UNIT, 1.0)
+    ),
+}
+
+
+def _unit_key(value: Optional[str]) -> str:
+    """Unit text without amounts, e.g. '100 גרם' -> 'גרמ'."""
+    words = [
+        word for word in normalize_search_text(value).split() if not word.isdigit()
+    ]
+    return " ".join(words)
+
+
+def normalize_unit_prices(items: List[Dict[str, Any]]) -> None:
+    """Add ``normalized_unit`` and ``price_per_unit`` to parsed price rows.
+
+    Works on a whole price file at once. The package amount is ``quantity``
+    in the unit named by ``unit_qty`` (falling back to ``unit_of_measure``),
+    converted to kg, liters or units. Items with an unknown unit or no usable
+    amount get ``None`` for both.
+    """
+    if not items:
+        return
+
+    frame = pd.DataFrame(
+        {
+            "unit_qty": [item.get("unit_qty") for item in items],
+            "unit_of_measure": [item.get("unit_of_measure") for item in items],
+            "quantity": [item.get("quantity") for item in items],
+            "qty_in_package": [item.get("qty_in_package") for item in items],
+            "price": [item.get("price") for item in items],
+        }
+    )
+
+    # Unit texts repeat heavily within a file, so each distinct one is
+    # normalized once and mapped back
+    aliases = {}
+    for text in pd.unique(
+        pd.concat([frame["unit_qty"], frame["unit_of_measure"]]).dropna()
+    ):
+        aliases[text] = UNIT_ALIASES.get(_unit_key(text))
+
+    resolved = frame["unit_qty"].map(aliases)
+    resolved = resolved.where(resolved.notna(), frame["unit_of_measure"].map(aliases))
+    known = resolved.notna().to_numpy()
+
+    units = np.full(len(frame), None, dtype=object)
+    factors = np.full(len(frame), np.nan)
+    units[known] = [unit for unit, _ in resolved[known]]
+    factors[known] = [factor for _, factor in resolved[known]]
+
+    quantity = pd.to_numeric(frame["quantity"], errors="coerce").to_numpy(float)
+    pack = pd.to_numeric(frame["qty_in_package"], errors="coerce").to_numpy(float)
+    price = pd.to_numeric(frame["price"], errors="coerce").to_numpy(float)
+
+    # Counted items: a multi-pack is priced per piece, a missing count is one
+    is_unit = units == UNIT
+    quantity = np.where(is_unit & (pack > 1), pack, quantity)
+    quantity = np.where(is_unit & np.isnan(quantity), 1.0, quantity)
+
+    amount = quantity * factors
+    valid = known & (amount > 0) & (price >= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_unit = np.round(price / amount, 4)
+
+    for index, item in enumerate(items):
+        if valid[index]:
+            item["normalized_unit"] = units[index]
+            item["price_per_unit"] = float(per_unit[index])
+        else:
+            item["normalized_unit"] = None
+            item["price_per_unit"] = None
@@ -0,0 +1,64 @@
+"""Benchmark the in-memory autocomplete index (no database needed).
+
+python -m benchmarks.autocomplete_benchmark --items 100000
+"""
+
+import argparse
+import random
+import time
+
+from app.services.autocomplete_service import AutocompleteEntry, AutocompleteIndex
+from benchmarks.catalog_search_benchmark import MANUFACTURERS, WORDS
+
+
+def _entries(item_count: int):
+    return [
+        AutocompleteEntry(
+            item_code=str(7290000000000 + index),
+            name=" ".join(random.sample(WORDS, 3)) + f" {random.randint(1, 999)}",
+            manufacturer_name=random.choice(MANUFACTURERS),
+            popularity=random.randint(0, 500),
+        )
+        for index in range(item_count)
+    ]
+
+
+def _typed_prefixes(count: int):
+    """Simulate keystrokes: every prefix of random catalog words."""
+    prefixes = []
+    for _ in range(count):
+        word = random.choice(WORDS + MANUFACTURERS)
+        prefixes.extend(word[:length] for length in range(1, len(word) + 1))
+    return prefixes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    entries = _entries(args.items)
+
+    started = time.perf_counter()
+    index = AutocompleteIndex(entries)
+    print(f"build: {time.perf_counter() - started:.2f}s for {len(index)} items")
+
+    timings = []
+    for prefix in _typed_prefixes(args.queries):
+        started = time.perf_counter()
+        index.search(prefix, limit=10)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f"lookups: {len(timings)} p50={p50:.3f}ms p99={p99:.3f}ms "
+        f"max={timings[-1]:.3f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
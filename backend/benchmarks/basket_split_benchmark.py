@@ -0,0 +1,88 @@
+"""Benchmark the multi-store basket split solvers on synthetic price matrices.
+
+Reports latency of the exact branch-and-bound (capped by --budget-ms) and the
+greedy mode, and how far greedy lands from the best exact solution found.
+
+    python -m benchmarks.basket_split_benchmark
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.services.basket_optimizer import EXACT, GREEDY, BasketSplitOptimizer
+
+SCENARIOS = [
+    # (stores, items, max_stores)
+    (20, 15, 2),
+    (50, 25, 3),
+    (100, 30, 3),
+    (200, 40, 3),
+    (500, 40, 4),
+]
+
+
+def _price_matrix(rng, stores: int, items: int, coverage: float) -> np.ndarray:
+    """Chain-like price levels with per-item noise and partial assortments."""
+    base = rng.uniform(5, 40, size=items)
+    store_level = rng.normal(1.0, 0.08, size=(stores, 1))
+    noise = rng.normal(1.0, 0.12, size=(stores, items))
+    prices = np.round(base * store_level * noise, 2)
+    prices[rng.random((stores, items)) > coverage] = np.nan
+    return prices
+
+
+def _run(prices, quantities, max_stores, penalty, mode, budget_ms):
+    optimizer = BasketSplitOptimizer(prices, quantities, max_stores, penalty)
+    started = time.perf_counter()
+    solution = optimizer.solve(mode, time_budget_ms=budget_ms)
+    elapsed = (time.perf_counter() - started) * 1000
+    objective = solution.total_price + penalty * max(len(solution.stores) - 1, 0)
+    return elapsed, objective, solution
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--penalty", type=float, default=5.0)
+    parser.add_argument("--coverage", type=float, default=0.8)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(
+        f"{'stores':>6} {'items':>5} {'K':>2} | {'exact p50':>9} {'exact max':>9} "
+        f"{'optimal':>7} | {'greedy p50':>10} {'gap avg':>8} {'gap max':>8}"
+    )
+
+    for stores, items, max_stores in SCENARIOS:
+        exact_ms, greedy_ms, gaps, optimal = [], [], [], 0
+        for _ in range(args.repeats):
+            prices = _price_matrix(rng, stores, items, args.coverage)
+            quantities = rng.integers(1, 4, size=items).astype(float)
+
+            elapsed, exact_objective, solution = _run(
+                prices, quantities, max_stores, args.penalty, EXACT, args.budget_ms
+            )
+            exact_ms.append(elapsed)
+            optimal += solution.is_optimal
+
+            elapsed, greedy_objective, _ = _run(
+                prices, quantities, max_stores, args.penalty, GREEDY, None
+            )
+            greedy_ms.append(elapsed)
+            gaps.append((greedy_objective - exact_objective) / exact_objective * 100)
+
+        print(
+            f"{stores:>6} {items:>5} {max_stores:>2} | "
+            f"{statistics.median(exact_ms):>7.2f}ms {max(exact_ms):>7.2f}ms "
+            f"{optimal:>3}/{args.repeats:<3} | "
+            f"{statistics.median(greedy_ms):>8.2f}ms "
+            f"{statistics.mean(gaps):>7.2f}% {max(gaps):>7.2f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
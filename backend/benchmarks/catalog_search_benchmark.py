@@ -0,0 +1,197 @@
+"""Benchmark catalog search: legacy ILIKE scan vs. normalized trigram search.
+
+Builds a synthetic catalog in a scratch table (the real ``items`` table is not
+touched), then times both query shapes for a set of typical type-ahead inputs.
+
+    python -m benchmarks.catalog_search_benchmark --items 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.services.search_service import build_item_search_text, normalize_search_text
+
+WORDS = [
+    "חלב",
+    "גבינה",
+    "לחם",
+    "שוקולד",
+    "קפה",
+    "תה",
+    "אורז",
+    "פסטה",
+    "שמן",
+    "זית",
+    "עגבניות",
+    "מלפפון",
+    "ביצים",
+    "יוגורט",
+    "קמח",
+    "סוכר",
+    "מלח",
+    "טחינה",
+    "חומוס",
+    "במבה",
+]
+MANUFACTURERS = ["תנובה", "שטראוס", "אסם", "עלית", "תלמה", "ויסוצקי", "יטבתה"]
+QUERIES = ["חל", "חלב", "גבינה צה", "שוקולד עלית", "טחינה", "במבה אסם", "קפה"]
+
+
+def _random_item(index: int) -> dict:
+    name = " ".join(random.sample(WORDS, 3)) + f" {random.randint(1, 999)}"
+    manufacturer = random.choice(MANUFACTURERS)
+    return {
+        "id": index,
+        "name": name,
+        "manufacturer_name": manufacturer,
+        "manufacturer_description": manufacturer,
+        "normalized_name": normalize_search_text(name),
+        "search_text": build_item_search_text(name, manufacturer, manufacturer),
+    }
+
+
+def _setup(conn, item_count: int) -> None:
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text("DROP TABLE IF EXISTS bench_catalog_items"))
+    conn.execute(
+        text(
+            """
+            CREATE TABLE bench_catalog_items (
+                id INTEGER PRIMARY KEY,
+                name VARCHAR(255),
+                manufacturer_name VARCHAR(255),
+                manufacturer_description TEXT,
+                normalized_name VARCHAR(255),
+                search_text TEXT
+            )
+        """
+        )
+    )
+
+    batch = []
+    for index in range(1, item_count + 1):
+        batch.append(_random_item(index))
+        if len(batch) == 5000 or index == item_count:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO bench_catalog_items VALUES
+                    (:id, :name, :manufacturer_name, :manufacturer_description,
+                     :normalized_name, :search_text)
+                """
+                ),
+                batch,
+            )
+            batch = []
+
+    conn.execute(
+        text(
+            "CREATE INDEX bench_items_trgm ON bench_catalog_items "
+            "USING gin (search_text gin_trgm_ops)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX bench_items_prefix ON bench_catalog_items "
+            "(normalized_name text_pattern_ops)"
+        )
+    )
+    conn.execute(text("ANALYZE bench_catalog_items"))
+
+
+def _legacy_query(conn, query: str) -> None:
+    conn.execute(
+        text(
+            """
+            SELECT id FROM bench_catalog_items
+            WHERE name ILIKE :term
+               OR manufacturer_description ILIKE :term
+               OR manufacturer_name ILIKE :term
+            LIMIT 50
+        """
+        ),
+        {"term": f"%{query}%"},
+    ).fetchall()
+
+
+def _trigram_query(conn, query: str) -> None:
+    normalized = normalize_search_text(query)
+    tokens = normalized.split()
+    token_clauses = " AND ".join(
+        f"search_text LIKE :token_{i}" for i in range(len(tokens))
+    )
+    params = {f"token_{i}": f"%{token}%" for i, token in enumerate(tokens)}
+    params.update(
+        {
+            "query": normalized,
+            "prefix": f"{normalized}%",
+            "word_prefix": f"% {normalized}%",
+        }
+    )
+    conn.execute(
+        text(
+            f"""
+            SELECT id FROM bench_catalog_items
+            WHERE ({token_clauses}) OR search_text % :query
+            ORDER BY CASE
+                         WHEN normalized_name LIKE :prefix THEN 2.0
+                         WHEN normalized_name LIKE :word_prefix THEN 1.0
+                         ELSE 0.0
+                     END + word_similarity(:query, search_text) DESC
+            LIMIT 50
+        """
+        ),
+        params,
+    ).fetchall()
+
+
+def _time(conn, fn, repeats: int) -> list:
+    timings = []
+    for _ in range(repeats):
+        for query in QUERIES:
+            started = time.perf_counter()
+            fn(conn, query)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<10} p50={statistics.median(timings):8.2f}ms "
+        f"p95={p95:8.2f}ms max={timings[-1]:8.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--database-url", default=settings.SQLALCHEMY_DATABASE_URL)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    args = parser.parse_args()
+
+    random.seed(42)
+    engine = create_engine(args.database_url)
+
+    with engine.begin() as conn:
+        print(f"Building synthetic catalog with {args.items} items...")
+        _setup(conn, args.items)
+
+    with engine.connect() as conn:
+        _report("ILIKE", _time(conn, _legacy_query, args.repeats))
+        _report("trigram", _time(conn, _trigram_query, args.repeats))
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS bench_catalog_items"))
+
+
+if __name__ == "__main__":
+    main()
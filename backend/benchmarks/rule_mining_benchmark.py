@@ -0,0 +1,59 @@
+"""Benchmark the frequent itemset engines side by side (no database needed).
+
+For each dataset size, runs apriori, fpgrowth and eclat on the same encoded
+baskets and reports runtime, peak traced memory and the itemset count, which
+must agree across engines.
+
+    python -m benchmarks.rule_mining_benchmark --sizes 10000 50000 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.rule_mining import MINING_ENGINES, mine_frequent_itemsets
+from app.services.transaction_matrix import build_transaction_matrix
+from benchmarks.transaction_matrix_benchmark import _transactions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000]
+    )
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--min-support", type=float, default=0.01)
+    parser.add_argument("--max-len", type=int, default=3)
+    parser.add_argument("--engines", nargs="+", default=list(MINING_ENGINES))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(
+        f"{'transactions':>12} {'engine':>9} | {'time':>9} {'peak':>9} {'itemsets':>8}"
+    )
+
+    for size in args.sizes:
+        encoded = build_transaction_matrix(_transactions(rng, size, args.items)).prune(
+            args.min_support
+        )
+
+        for engine in args.engines:
+            tracemalloc.start()
+            started = time.perf_counter()
+            itemsets = mine_frequent_itemsets(
+                encoded, args.min_support, args.max_len, engine
+            )
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{size:>12} {engine:>9} | {elapsed * 1000:>7.1f}ms "
+                f"{peak / 2**20:>7.1f}MB {len(itemsets):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
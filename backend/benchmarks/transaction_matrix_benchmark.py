@@ -0,0 +1,98 @@
+"""Benchmark Apriori input encoding on synthetic shopping baskets (no database).
+
+Compares the sparse CSR encoder with the previous dict-per-row dense
+DataFrame (run on a sample, since it grows with transactions x items), then
+mines frequent itemsets from the sparse matrix.
+
+    python -m benchmarks.transaction_matrix_benchmark --transactions 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import apriori
+
+from app.services.transaction_matrix import build_transaction_matrix
+
+
+def _transactions(rng, count: int, items: int):
+    """Baskets of 2-25 draws with Zipf-like item popularity (a popular item
+    can be drawn twice, as on real lists)."""
+    popularity = 1.0 / np.arange(1, items + 1) ** 0.9
+    popularity /= popularity.sum()
+    codes = np.array([str(7290000000000 + index) for index in range(items)])
+    sizes = rng.integers(2, 26, size=count)
+    drawn = codes[rng.choice(items, size=int(sizes.sum()), p=popularity)]
+    return [list(basket) for basket in np.split(drawn, np.cumsum(sizes)[:-1])]
+
+
+def _dense_matrix(transactions):
+    """The encoder PredictionService used before the CSR builder."""
+    all_items = set()
+    for transaction in transactions:
+        all_items.update(transaction)
+    data = []
+    for transaction in transactions:
+        data.append({item: (item in transaction) for item in all_items})
+    return pd.DataFrame(data).fillna(False)
+
+
+def _measure(function, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--dense-sample", type=int, default=2_000)
+    parser.add_argument("--min-support", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    transactions = _transactions(rng, args.transactions, args.items)
+    pairs = sum(len(transaction) for transaction in transactions)
+    print(f"{len(transactions)} transactions, {pairs} (transaction, item) pairs")
+
+    encoded, elapsed, peak = _measure(build_transaction_matrix, transactions)
+    print(
+        f"sparse encode      {elapsed * 1000:>9.1f}ms  peak {peak:>8.1f}MB  "
+        f"shape {encoded.matrix.shape}"
+    )
+
+    sample = transactions[: args.dense_sample]
+    _, elapsed, peak = _measure(_dense_matrix, sample)
+    scale = len(transactions) / len(sample)
+    print(
+        f"dense encode       {elapsed * 1000:>9.1f}ms  peak {peak:>8.1f}MB  "
+        f"on {len(sample)} rows (~{elapsed * scale:.0f}s at full size)"
+    )
+
+    pruned = encoded.prune(args.min_support)
+    frame = pruned.to_frame()
+    itemsets, elapsed, peak = _measure(
+        lambda: apriori(
+            frame,
+            min_support=args.min_support,
+            use_colnames=True,
+            max_len=3,
+            low_memory=True,
+        )
+    )
+    print(
+        f"apriori (sparse)   {elapsed * 1000:>9.1f}ms  peak {peak:>8.1f}MB  "
+        f"{len(pruned.item_codes)} items kept, {len(itemsets)} itemsets"
+    )
+
+
+if __name__ == "__main__":
+    main()
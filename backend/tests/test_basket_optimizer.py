@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from app.services.basket_optimizer import EXACT, GREEDY, BasketSplitOptimizer
+
+nan = np.nan
+
+
+@pytest.mark.parametrize("mode", [EXACT, GREEDY])
+def test_items_the_chosen_stores_do_not_sell_are_missing(mode):
+    # Every store sells a single item; one store can't cover the basket
+    prices = np.array([[1, nan, nan], [nan, 2, nan], [nan, nan, 3]], dtype=float)
+
+    solution = BasketSplitOptimizer(prices, np.ones(3), max_stores=1).solve(mode)
+
+    assert len(solution.stores) == 1
+    store = solution.stores[0]
+    covered = np.flatnonzero(solution.assignment >= 0)
+    assert covered.tolist() == [store]
+    assert solution.missing.tolist() == [column != store for column in range(3)]
+    assert solution.total_price == prices[store, store]
+
+
+def test_covered_basket_has_no_missing_items():
+    prices = np.array([[1, 5, nan], [4, 2, 3]], dtype=float)
+
+    solution = BasketSplitOptimizer(prices, np.array([1.0, 2.0, 1.0]), 2).solve(EXACT)
+
+    assert solution.assignment.tolist() == [0, 1, 1]
+    assert not solution.missing.any()
+    assert solution.total_price == 1 + 2 * 2 + 3
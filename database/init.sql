@@ -1,5 +1,8 @@
 -- Initialize database for the Shopping List Management System
 
+-- Trigram matching for catalog search (items.search_text GIN index)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Users Table
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
@@ -94,21 +97,10 @@ CREATE TABLE IF NOT EXISTS item_prices (
     CONSTRAINT fk_prices_store FOREIGN KEY (store_id) REFERENCES stores(id) ON DELETE CASCADE
 );
 
--- Purchase History Table
-CREATE TABLE IF NOT EXISTS purchase_history (
-    id SERIAL PRIMARY KEY,
-    household_id INTEGER NOT NULL,
-    item_name VARCHAR(100) NOT NULL,
-    purchase_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    frequency INTEGER DEFAULT 1,
-    CONSTRAINT fk_purchase_household FOREIGN KEY (household_id) REFERENCES households(id) ON DELETE CASCADE
-);
-
 -- Create indexes for better performance
 CREATE INDEX idx_invitations_invited_user ON household_invitations(invited_user_id);
 CREATE INDEX idx_invitations_status ON household_invitations(status);
 CREATE INDEX idx_shopping_items_name ON shopping_items(name);
-CREATE INDEX idx_purchase_history_item_name ON purchase_history(item_name);
 CREATE INDEX idx_shopping_lists_household ON shopping_lists(household_id);
 CREATE INDEX idx_shopping_items_list ON shopping_items(shopping_list_id);
 CREATE INDEX idx_history_list ON shopping_list_history(shopping_list_id);
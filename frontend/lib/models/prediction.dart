@@ -1,12 +1,15 @@
 import 'package:intl/intl.dart';
 
 enum PredictionReason {
-  aprioriAssociation;
+  aprioriAssociation,
+  replenishmentCycle;
 
   String get displayName {
     switch (this) {
       case PredictionReason.aprioriAssociation:
         return 'Smart Suggestion';
+      case PredictionReason.replenishmentCycle:
+        return 'Time to Restock';
     }
   }
 
@@ -14,6 +17,8 @@ enum PredictionReason {
     switch (value) {
       case 'apriori_association':
         return PredictionReason.aprioriAssociation;
+      case 'replenishment_cycle':
+        return PredictionReason.replenishmentCycle;
       default:
         return PredictionReason.aprioriAssociation;
     }
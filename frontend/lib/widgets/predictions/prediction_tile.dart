@@ -173,6 +173,8 @@ class PredictionTile extends StatelessWidget {
       case PredictionReason.aprioriAssociation:
         return Icons
             .auto_awesome; // Or Icons.psychology or Icons.lightbulb_outline
+      case PredictionReason.replenishmentCycle:
+        return Icons.autorenew;
     }
   }
 